@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from pathlib import Path
 import sys
 
@@ -13,7 +12,11 @@ if 'user_settings' not in st.session_state:
     st.session_state.user_settings = {
         'default_encoding': 'utf-8',
         'default_delimiter': ',',
-        'preview_rows': 5
+        'preview_rows': 5,
+        'optimize_memory': False,
+        'arrow_dtypes': False,
+        'category_ratio': 0.5,
+        'trace_memory': False,
     }
 
 # Page configuration
@@ -57,6 +60,19 @@ if st.session_state.conversion_history:
     st.sidebar.subheader("📈 Conversion History")
     for i, conv in enumerate(reversed(st.session_state.conversion_history[-5:]), 1):
         st.sidebar.markdown(f"**{i}.** {conv['input']} → {conv['output']} ({conv.get('rows', 0)} rows)")
+        if conv.get('stages'):
+            with st.sidebar.expander(f"⏱️ {conv['seconds']:.2f} s by stage"):
+                import pandas as pd
+
+                stages = pd.DataFrame(conv['stages'])
+                st.dataframe(pd.DataFrame({
+                    'Stage': stages['stage'],
+                    'Seconds': stages['seconds'].round(3),
+                    'Rows': stages['rows'],
+                    'MB in': (stages['bytes_in'] / 1024 / 1024).round(2),
+                    'MB out': (stages['bytes_out'] / 1024 / 1024).round(2),
+                    'Peak MB': (stages['peak_bytes'] / 1024 / 1024).round(2),
+                }), hide_index=True)
 
 # Navigation
 st.markdown("---")
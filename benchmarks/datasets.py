@@ -0,0 +1,135 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+class SyntheticData:
+    """Seeded synthetic datasets of different shapes, written out in every input format
+
+    Row counts are scaled per shape (rows * row_factor) so that every dataset
+    holds a similar number of cells.
+    """
+
+    SHAPES = {
+        'narrow': {'row_factor': 1.0, 'formats': ['csv', 'excel', 'json', 'jsonl', 'parquet', 'feather']},
+        'wide': {'row_factor': 0.05, 'formats': ['csv', 'excel', 'json', 'jsonl', 'parquet', 'feather']},
+        'strings': {'row_factor': 0.5, 'formats': ['csv', 'excel', 'json', 'jsonl', 'parquet', 'feather']},
+        'numeric': {'row_factor': 0.5, 'formats': ['csv', 'excel', 'json', 'jsonl', 'parquet', 'feather']},
+        'nested': {'row_factor': 0.5, 'formats': ['json', 'jsonl']},
+        'multisheet': {'row_factor': 1.0, 'formats': ['excel']},
+    }
+    EXTENSIONS = {
+        'csv': '.csv',
+        'excel': '.xlsx',
+        'json': '.json',
+        'jsonl': '.jsonl',
+        'parquet': '.parquet',
+        'feather': '.feather',
+    }
+    WIDE_COLUMNS = 100
+    SHEETS = 4
+
+    @staticmethod
+    def rows_for(shape, rows):
+        return max(int(rows * SyntheticData.SHAPES[shape]['row_factor']), 1)
+
+    @staticmethod
+    def _words(rng, n, vocabulary, length):
+        """n random strings of `length` words drawn from a vocabulary of that size"""
+        words = np.array([f"w{i:05d}" for i in range(vocabulary)])
+        picks = words[rng.integers(0, vocabulary, size=(n, length))]
+        return [' '.join(row) for row in picks]
+
+    @staticmethod
+    def frame(shape, rows, seed=0):
+        """DataFrame for one of the flat shapes, with exactly `rows` rows"""
+        rng = np.random.default_rng(seed)
+        if shape in ('narrow', 'multisheet'):
+            return pd.DataFrame({
+                'id': np.arange(rows, dtype='int64'),
+                'value': rng.normal(size=rows).round(6),
+                'flag': rng.integers(0, 2, size=rows).astype(bool),
+                'label': np.array(['alpha', 'beta', 'gamma', 'delta'])[rng.integers(0, 4, size=rows)],
+                'created': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 86400 * 365, size=rows), unit='s'),
+            })
+        if shape == 'wide':
+            data = {f"c{i:03d}": rng.normal(size=rows).round(4) for i in range(SyntheticData.WIDE_COLUMNS)}
+            return pd.DataFrame({'id': np.arange(rows, dtype='int64'), **data})
+        if shape == 'strings':
+            return pd.DataFrame({
+                'id': np.arange(rows, dtype='int64'),
+                'name': SyntheticData._words(rng, rows, 5000, 2),
+                'city': SyntheticData._words(rng, rows, 200, 1),
+                'comment': SyntheticData._words(rng, rows, 20000, 12),
+                'email': [f"user{i}@example.com" for i in rng.integers(0, rows * 10, size=rows)],
+                'quoted': [f'say "{w}", then stop' for w in SyntheticData._words(rng, rows, 1000, 1)],
+            })
+        if shape == 'numeric':
+            data = {}
+            for i in range(6):
+                data[f"int{i}"] = rng.integers(-10 ** (i + 2), 10 ** (i + 2), size=rows)
+                data[f"float{i}"] = rng.normal(scale=10 ** i, size=rows)
+            return pd.DataFrame(data)
+        raise ValueError(f"'{shape}' is not a flat shape")
+
+    @staticmethod
+    def records(rows, seed=0):
+        """Nested JSON records: sub-objects, lists and optional keys"""
+        rng = np.random.default_rng(seed)
+        values = rng.normal(size=rows).round(6).tolist()
+        counts = rng.integers(0, 5, size=rows).tolist()
+        records = []
+        for i in range(rows):
+            record = {
+                'id': i,
+                'user': {'name': f"user{i % 997}", 'address': {'city': f"city{i % 50}", 'zip': f"{i % 99999:05d}"}},
+                'score': values[i],
+                'tags': [f"t{(i + k) % 20}" for k in range(counts[i])],
+            }
+            if i % 3 == 0:
+                record['extra'] = {'note': f"note {i}"}
+            records.append(record)
+        return records
+
+    @staticmethod
+    def write(shape, rows, work_dir, seed=0):
+        """Write the dataset in each of its input formats; returns {format: path}"""
+        from utils.format_handlers import ExcelStreamWriter
+
+        work_dir = Path(work_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        rows = SyntheticData.rows_for(shape, rows)
+        paths = {
+            fmt: work_dir / f"{shape}_{rows}{SyntheticData.EXTENSIONS[fmt]}"
+            for fmt in SyntheticData.SHAPES[shape]['formats']
+        }
+
+        if shape == 'nested':
+            records = SyntheticData.records(rows, seed)
+            with open(paths['json'], 'w', encoding='utf-8') as f:
+                json.dump(records, f)
+            with open(paths['jsonl'], 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+            return paths
+
+        df = SyntheticData.frame(shape, rows, seed)
+        if shape == 'multisheet':
+            per_sheet = -(-rows // SyntheticData.SHEETS)
+            with pd.ExcelWriter(paths['excel'], engine='openpyxl') as writer:
+                for i in range(SyntheticData.SHEETS):
+                    df.iloc[i * per_sheet:(i + 1) * per_sheet].to_excel(writer, sheet_name=f"Sheet{i + 1}", index=False)
+            return paths
+
+        df.to_csv(paths['csv'], index=False)
+        writer = ExcelStreamWriter(paths['excel'])
+        try:
+            writer.write(df)
+        finally:
+            writer.close()
+        df.to_json(paths['json'], orient='records', date_format='iso')
+        df.to_json(paths['jsonl'], orient='records', lines=True, date_format='iso')
+        df.to_parquet(paths['parquet'], index=False)
+        df.to_feather(paths['feather'])
+        return paths
@@ -0,0 +1,363 @@
+"""Conversion benchmark suite
+
+Times every input x output pair of ConversionUtils.convert_format, each
+format handler's read/write, and the streaming converters on synthetic
+datasets, then writes the results to JSON and compares them to a baseline:
+
+    python -m benchmarks.suite --rows 50000 --output temp/benchmarks/results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --fail-on-regression
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.datasets import SyntheticData
+from utils.conversion_utils import ConversionUtils
+
+FLAT_SHAPES = ['narrow', 'wide', 'strings', 'numeric']
+CONVERT_OUTPUTS = ['csv', 'excel', 'json', 'parquet', 'feather']
+HANDLERS = {
+    'csv': ('CSVHandler', {}),
+    'excel': ('ExcelHandler', {}),
+    'json': ('JSONHandler', {'orient': 'records'}),
+    'jsonl': ('JSONHandler', {'lines': True}),
+    'parquet': ('ParquetHandler', {}),
+    'feather': ('FeatherHandler', {}),
+}
+WRITERS = {
+    'CSVHandler': 'csv',
+    'ExcelHandler': 'excel',
+    'JSONHandler': 'json',
+    'ParquetHandler': 'parquet',
+    'FeatherHandler': 'feather',
+    'ExcelStreamWriter': 'excel',
+}
+KINDS = ['convert', 'handler', 'stream']
+
+
+def _read_input(fmt, path):
+    import utils.format_handlers as handlers
+
+    name, options = HANDLERS[fmt]
+    return getattr(handlers, name).read(path, **options)
+
+
+def _writer(target, df, output_path):
+    import utils.format_handlers as handlers
+
+    if target == 'ExcelStreamWriter':
+        writer = handlers.ExcelStreamWriter(output_path)
+        try:
+            writer.write(df)
+        finally:
+            writer.close()
+    elif target == 'JSONHandler':
+        handlers.JSONHandler.write(df, output_path, orient='records')
+    else:
+        getattr(handlers, target).write(df, output_path)
+
+
+def _case_function(job):
+    """(timed callable returning the output size, input bytes) for a job
+
+    Input bytes are the input file's size, or the DataFrame's in-memory size
+    for writers.
+    """
+    kind, target, inputs = job['kind'], job['target'], job['inputs']
+    output_path = job['output_path']
+    bytes_in = os.path.getsize(inputs[job['input']]) if job['input'] else 0
+
+    if kind == 'convert':
+        def run():
+            df = _read_input(job['input'], inputs[job['input']])
+            output, error = ConversionUtils.convert_format(df, job['output'])
+            if error:
+                raise RuntimeError(error)
+            return len(output.getbuffer())
+        return run, bytes_in
+
+    if kind == 'handler' and target.endswith('.read'):
+        def run():
+            _read_input(job['input'], inputs[job['input']])
+            return 0
+        return run, bytes_in
+
+    if kind == 'handler':
+        df = _read_input('parquet', inputs['parquet'])
+
+        def run():
+            _writer(target.split('.')[0], df, output_path)
+            return os.path.getsize(output_path)
+        return run, int(df.memory_usage(deep=True).sum())
+
+    def checked(result):
+        stats, error = result
+        if error:
+            raise RuntimeError(error)
+        return os.path.getsize(output_path)
+
+    if target == 'convert_csv_file':
+        return lambda: checked(ConversionUtils.convert_csv_file(inputs['csv'], output_path, job['output'])), bytes_in
+    if target == 'ArrowCSVHandler.convert':
+        from utils.format_handlers import ArrowCSVHandler
+
+        def run():
+            ArrowCSVHandler.convert(inputs['csv'], output_path, job['output'])
+            return os.path.getsize(output_path)
+        return run, bytes_in
+    if target == 'JSONReader.iter_chunks':
+        from utils.json_reader import JSONReader
+
+        return lambda: checked(ConversionUtils.stream_convert_chunks(
+            JSONReader.iter_chunks(inputs[job['input']], lines=job['input'] == 'jsonl'),
+            output_path, job['output'],
+        )), bytes_in
+    if target == 'ExcelReader.merge_to':
+        from utils.excel_reader import ExcelReader
+
+        def run():
+            reader = ExcelReader(inputs['excel'], job['case'])
+            try:
+                reader.merge_to(reader.sheet_names, output_path, job['output'])
+            finally:
+                reader.close()
+            return os.path.getsize(output_path)
+        return run, bytes_in
+    if target == 'ColumnarReader.convert':
+        from utils.columnar_reader import ColumnarReader
+
+        def run():
+            ColumnarReader.convert(inputs['parquet'], 'parquet', output_path, job['output'])
+            return os.path.getsize(output_path)
+        return run, bytes_in
+    raise ValueError(f"Unknown benchmark target '{target}'")
+
+
+def run_case(job):
+    """Run one benchmark case; runs alone in a fresh worker process"""
+    from utils.codec_benchmark import _measure, _rss_bytes
+
+    result = {k: job[k] for k in ('case', 'kind', 'shape', 'target', 'input', 'output', 'rows')}
+    result['error'] = None
+    output_path = job['output_path']
+    try:
+        func, bytes_in = _case_function(job)
+        bytes_out = []
+        seconds, peak_delta = _measure(lambda: bytes_out.append(func()), job['repeat'])
+        result.update({
+            'seconds': seconds,
+            'bytes_in': bytes_in,
+            'bytes_out': bytes_out[-1],
+            'rows_per_s': job['rows'] / seconds if seconds else None,
+            'mb_per_s': bytes_in / 1024 / 1024 / seconds if seconds else None,
+            'peak_rss_delta_bytes': peak_delta,
+            'peak_rss_bytes': _rss_bytes('VmHWM'),
+        })
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+    return result
+
+
+class ConversionBenchmark:
+    """Build, run and compare the benchmark cases"""
+
+    DEFAULT_ROWS = 20_000
+    THRESHOLD = 0.10
+    # Ignore slowdowns below this many seconds / bytes; they are timer and allocator noise
+    MIN_SECONDS = 0.02
+    MIN_BYTES = 8 * 1024 * 1024
+
+    @staticmethod
+    def cases(shapes=None, kinds=None):
+        """(case id, job fields) for every benchmark, before input files exist"""
+        shapes = shapes or list(SyntheticData.SHAPES)
+        kinds = kinds or KINDS
+        cases = []
+
+        def add(kind, shape, target, input_fmt=None, output_fmt=None):
+            name = f"{kind}/{shape}/{target}"
+            if input_fmt:
+                name += f"[{input_fmt}]"
+            if output_fmt:
+                name += f"->{output_fmt}"
+            cases.append({'case': name, 'kind': kind, 'shape': shape, 'target': target,
+                          'input': input_fmt, 'output': output_fmt})
+
+        for shape in shapes:
+            formats = SyntheticData.SHAPES[shape]['formats']
+            if shape in FLAT_SHAPES:
+                if 'convert' in kinds:
+                    for input_fmt in formats:
+                        for output_fmt in CONVERT_OUTPUTS:
+                            add('convert', shape, 'convert_format', input_fmt, output_fmt)
+                if 'handler' in kinds:
+                    for input_fmt in formats:
+                        add('handler', shape, f"{HANDLERS[input_fmt][0]}.read", input_fmt)
+                    for target, output_fmt in WRITERS.items():
+                        add('handler', shape, f"{target}.write", None, output_fmt)
+                if 'stream' in kinds:
+                    for output_fmt in ConversionUtils.CHUNK_SINKS:
+                        add('stream', shape, 'convert_csv_file', 'csv', output_fmt)
+                    for output_fmt in ('parquet', 'feather'):
+                        add('stream', shape, 'ArrowCSVHandler.convert', 'csv', output_fmt)
+                    add('stream', shape, 'ColumnarReader.convert', 'parquet', 'feather')
+            if 'stream' in kinds and shape in ('narrow', 'nested'):
+                for input_fmt in ('json', 'jsonl'):
+                    for output_fmt in ('csv', 'parquet'):
+                        add('stream', shape, 'JSONReader.iter_chunks', input_fmt, output_fmt)
+            if 'stream' in kinds and shape == 'multisheet':
+                for output_fmt in ('csv', 'parquet'):
+                    add('stream', shape, 'ExcelReader.merge_to', 'excel', output_fmt)
+        return cases
+
+    @staticmethod
+    def run(rows=None, shapes=None, kinds=None, match=None, repeat=1, seed=0, work_dir=None,
+            progress_callback=None):
+        """Generate the datasets, run the selected cases and return the results document"""
+        import numpy
+        import pandas
+        import pyarrow
+        from utils.file_manager import FileManager
+
+        rows = rows or ConversionBenchmark.DEFAULT_ROWS
+        work_dir = Path(work_dir or FileManager.create_temp_directory() / "benchmarks")
+        cases = [c for c in ConversionBenchmark.cases(shapes, kinds) if not match or match in c['case']]
+
+        inputs = {}
+        for shape in dict.fromkeys(c['shape'] for c in cases):
+            inputs[shape] = {fmt: str(path) for fmt, path in SyntheticData.write(shape, rows, work_dir, seed).items()}
+
+        jobs = []
+        for i, case in enumerate(cases):
+            extension = SyntheticData.EXTENSIONS.get(case['output'] or 'csv')
+            jobs.append({
+                **case,
+                'rows': SyntheticData.rows_for(case['shape'], rows),
+                'inputs': inputs[case['shape']],
+                'output_path': str(work_dir / f"out_{os.getpid()}_{i}{extension}"),
+                'repeat': repeat,
+            })
+
+        results = []
+        # One case at a time, each in a fresh process, so peak RSS isn't skewed by earlier cases
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as executor:
+            for result in executor.map(run_case, jobs):
+                results.append(result)
+                if progress_callback:
+                    progress_callback(result, len(results), len(jobs))
+
+        return {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'rows': rows,
+                'seed': seed,
+                'repeat': repeat,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'pandas': pandas.__version__,
+                'numpy': numpy.__version__,
+                'pyarrow': pyarrow.__version__,
+            },
+            'results': results,
+        }
+
+    @staticmethod
+    def compare(results, baseline, threshold=None):
+        """Per-case comparison against a baseline document; status is regression/improved/ok/new"""
+        threshold = ConversionBenchmark.THRESHOLD if threshold is None else threshold
+        previous = {r['case']: r for r in baseline.get('results', []) if not r.get('error')}
+        rows = []
+        for r in results.get('results', []):
+            base = previous.get(r['case'])
+            row = {'case': r['case'], 'seconds': r.get('seconds'), 'baseline_seconds': None,
+                   'change': None, 'status': 'new', 'reasons': []}
+            if r.get('error'):
+                row.update(status='error', reasons=[r['error']])
+            elif base is not None:
+                row['baseline_seconds'] = base['seconds']
+                row['change'] = r['seconds'] / base['seconds'] - 1 if base['seconds'] else None
+                slower = r['seconds'] - base['seconds']
+                if slower > ConversionBenchmark.MIN_SECONDS and slower > base['seconds'] * threshold:
+                    row['reasons'].append(f"time +{row['change']:.0%}")
+                peak, base_peak = r.get('peak_rss_delta_bytes'), base.get('peak_rss_delta_bytes')
+                if peak is not None and base_peak is not None:
+                    grown = peak - base_peak
+                    if grown > ConversionBenchmark.MIN_BYTES and grown > base_peak * threshold:
+                        row['reasons'].append(f"peak RSS +{grown / 1024 / 1024:.0f} MB")
+                if row['reasons']:
+                    row['status'] = 'regression'
+                elif -slower > ConversionBenchmark.MIN_SECONDS and -slower > base['seconds'] * threshold:
+                    row['status'] = 'improved'
+                else:
+                    row['status'] = 'ok'
+            rows.append(row)
+        return rows
+
+
+def _print_progress(result, done, total):
+    if result['error']:
+        print(f"[{done}/{total}] {result['case']}: ERROR {result['error']}")
+    else:
+        print(f"[{done}/{total}] {result['case']}: {result['seconds']:.3f}s, "
+              f"{result['rows_per_s']:,.0f} rows/s, {result['mb_per_s']:.1f} MB/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=ConversionBenchmark.DEFAULT_ROWS,
+                        help='base row count; each shape scales it')
+    parser.add_argument('--shapes', nargs='+', choices=list(SyntheticData.SHAPES))
+    parser.add_argument('--kinds', nargs='+', choices=KINDS)
+    parser.add_argument('--match', help='only cases whose id contains this text')
+    parser.add_argument('--repeat', type=int, default=1, help='best-of-N timing')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='temp/benchmarks/results.json')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=ConversionBenchmark.THRESHOLD,
+                        help='relative slowdown / memory growth flagged as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--list', action='store_true', help='list the case ids and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for case in ConversionBenchmark.cases(args.shapes, args.kinds):
+            if not args.match or args.match in case['case']:
+                print(case['case'])
+        return 0
+
+    start = time.perf_counter()
+    results = ConversionBenchmark.run(
+        rows=args.rows, shapes=args.shapes, kinds=args.kinds, match=args.match,
+        repeat=args.repeat, seed=args.seed, progress_callback=_print_progress,
+    )
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"{len(results['results'])} cases in {time.perf_counter() - start:.0f}s -> {output}")
+
+    if not args.baseline:
+        return 0
+    baseline = json.loads(Path(args.baseline).read_text())
+    comparison = ConversionBenchmark.compare(results, baseline, args.threshold)
+    flagged = [row for row in comparison if row['status'] in ('regression', 'error')]
+    for row in comparison:
+        if row['status'] != 'ok':
+            print(f"{row['status'].upper():<10} {row['case']} {'; '.join(row['reasons'])}")
+    print(f"{len(flagged)} regression(s) against {args.baseline}")
+    return 1 if flagged and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,22 @@
 import streamlit as st
 import sys
+import shutil
+import uuid
 from pathlib import Path
-import pandas as pd
-from io import BytesIO
 
 # Add utils to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from utils.conversion_utils import ConversionUtils
+from utils.csv_sniffer import CSVSniffer
+from utils.encoding_detector import EncodingDetector
+from utils.file_manager import FileManager
+from utils.instrumentation import Instrumentation
+from utils.memory_optimizer import MemoryOptimizer
+from utils.parse_cache import parse_cache
+from utils.row_index import RowOffsetIndex
+from utils.upload_spool import UploadSpool
+
 st.title("📄 CSV/Text File Converter")
 st.markdown("**Advanced CSV/TSV/TXT conversion with custom delimiter support**")
 
@@ -14,8 +24,8 @@ st.markdown("**Advanced CSV/TSV/TXT conversion with custom delimiter support**")
 if "conversion_history" not in st.session_state:
     st.session_state.conversion_history = []
 
-if "file_bytes" not in st.session_state:
-    st.session_state.file_bytes = None
+if "upload" not in st.session_state:
+    st.session_state.upload = None
 
 if "current_df" not in st.session_state:
     st.session_state.current_df = None
@@ -33,20 +43,62 @@ uploaded_file = st.file_uploader(
     help="Supports CSV, TSV, delimited text files",
 )
 
-# Persist uploaded file bytes so reruns still have full content
+# Spool the upload to disk once; reruns reuse the same memory-mapped file
 if uploaded_file is not None:
-    st.session_state.file_bytes = uploaded_file.getvalue()
+    st.session_state.upload = UploadSpool.spool(
+        uploaded_file, previous=st.session_state.upload
+    )
     st.session_state.file_info["name"] = uploaded_file.name
+elif st.session_state.upload is not None and not st.session_state.upload.is_available():
+    # Evicted by the spool TTL; the user has to upload again
+    st.session_state.upload = None
 
-if st.session_state.file_bytes is not None:
-    # Recreate a file-like object from bytes for each read
-    file_buffer = BytesIO(st.session_state.file_bytes)
-    file_size = len(st.session_state.file_bytes)
+if st.session_state.upload is not None:
+    import pandas as pd
+
+    file_size = st.session_state.upload.size
     st.info(
         f"📁 File: **{st.session_state.file_info.get('name', 'uploaded_file')}** | "
         f"Size: **{file_size/1024:.1f} KB**"
     )
 
+    # Detect encoding once per upload from sampled blocks
+    if st.session_state.file_info.get("encoding_sha") != st.session_state.upload.sha256:
+        st.session_state.file_info["encoding_report"] = (
+            EncodingDetector.detect_encoding_report(st.session_state.upload.path)
+        )
+        st.session_state.file_info["encoding_sha"] = st.session_state.upload.sha256
+    encoding_report = st.session_state.file_info["encoding_report"]
+
+    # Sniff delimiter/header/dtypes from the first KB once per upload and
+    # pre-populate the widgets below with the result
+    try:
+        sniffed = CSVSniffer.sniff(
+            st.session_state.upload.path,
+            encoding=encoding_report["encoding"],
+            file_hash=st.session_state.upload.sha256,
+        )
+    except Exception:
+        sniffed = dict(CSVSniffer.DEFAULTS)
+    if st.session_state.file_info.get("sniff_sha") != st.session_state.upload.sha256:
+        common_delimiters = [",", "\t", ";", "|", ":", " ", "\\n"]
+        is_common = sniffed["delimiter"] in common_delimiters
+        st.session_state.delimiter_type = "Common" if is_common else "Custom"
+        st.session_state.delimiter_common = sniffed["delimiter"] if is_common else ","
+        st.session_state.delimiter_custom = "" if is_common else sniffed["delimiter"]
+        st.session_state.header_radio = (
+            "First row" if sniffed["header"] == 0 else "No header"
+        )
+        # Sampled dtypes are only shown: applying them to the whole file
+        # fails as soon as a later row doesn't fit (e.g. 3.5 in an int column)
+        st.session_state.dtype_str = ""
+        st.session_state.parse_dates_str = (
+            ", ".join(sniffed["parse_dates"]) if sniffed["header"] == 0 else ""
+        )
+        st.session_state.thousands_sep = sniffed["thousands"] or ""
+        st.session_state.decimal_sep = sniffed["decimal"]
+        st.session_state.file_info["sniff_sha"] = st.session_state.upload.sha256
+
     # =======================
     #  COMMON CONFIG WIDGETS
     # =======================
@@ -58,13 +110,14 @@ if st.session_state.file_bytes is not None:
             "Delimiter Type",
             ["Common", "Custom"],
             horizontal=True,
+            key="delimiter_type",
         )
 
         if delimiter_type == "Common":
             delimiter = st.selectbox(
                 "Select delimiter",
                 [",", "\t", ";", "|", ":", " ", "\\n"],
-                index=0,
+                key="delimiter_common",
                 format_func=lambda x: f"{x} ({'tab' if x == '\t' else x})",
             )
             if delimiter == "\\n":
@@ -76,14 +129,25 @@ if st.session_state.file_bytes is not None:
                 placeholder="e.g. ~, #, ^",
                 max_chars=1,
                 help="Enter exactly one character",
+                key="delimiter_custom",
             )
             delimiter = manual_delimiter if manual_delimiter else ","
 
     with col2:
+        encodings = ["utf-8", "latin-1", "iso-8859-1", "cp1252", "utf-16"]
+        detected_encoding = encoding_report["encoding"].lower()
+        if detected_encoding not in encodings:
+            encodings.append(detected_encoding)
         encoding = st.selectbox(
             "Encoding",
-            ["utf-8", "latin-1", "iso-8859-1", "cp1252", "utf-16"],
-            index=0,
+            encodings,
+            index=encodings.index(detected_encoding),
+        )
+        st.caption(
+            f"Detected **{detected_encoding}** "
+            f"({encoding_report['confidence']:.0%} confidence, "
+            f"scanned {encoding_report['bytes_scanned'] / 1024:.0f} KB "
+            f"in {encoding_report['seconds'] * 1000:.0f} ms)"
         )
 
         header_option = st.radio(
@@ -123,17 +187,36 @@ if st.session_state.file_bytes is not None:
         with col2_adv:
             dtype_str = st.text_area(
                 "Column data types (col:type)",
-                value="",
                 height=60,
                 placeholder="id:int64\ndate:datetime64[ns]",
                 help="Format: column_name:data_type",
+                key="dtype_str",
+            )
+            parse_dates_str = st.text_input(
+                "Parse as dates",
+                placeholder="created, updated",
+                help="Comma-separated column names; columns missing from the header are ignored",
+                key="parse_dates_str",
             )
 
         with col3_adv:
-            thousands_sep = st.checkbox("Thousands separator", value=False)
+            thousands_sep = st.text_input(
+                "Thousands separator", max_chars=1, key="thousands_sep"
+            )
             decimal_sep = st.text_input(
-                "Decimal separator", value=".", max_chars=1
+                "Decimal separator", max_chars=1, key="decimal_sep"
+            )
+
+        st.caption(
+            f"Auto-configured from the first {sniffed['sample_bytes'] / 1024:.0f} KB "
+            f"({sniffed['sample_rows']} rows)"
+            + (
+                "; sampled types: "
+                + ", ".join(f"{col} {dtype}" for col, dtype in sniffed["dtypes"].items())
+                if sniffed["dtypes"] and header == 0
+                else ""
             )
+        )
 
     # Convert advanced options to parameters
     try:
@@ -147,25 +230,52 @@ if st.session_state.file_bytes is not None:
     except Exception:
         dtype_dict = None
 
+    read_options = {
+        "sep": delimiter,
+        "encoding": encoding,
+        "header": header,
+        "skiprows": skip_rows,
+        "na_values": na_values,
+        "keep_default_na": False,
+        "dtype": dtype_dict or None,
+        "thousands": thousands_sep or None,
+        "decimal": decimal_sep or ".",
+        "quotechar": sniffed["quotechar"],
+    }
+    # Sniffed names go stale when the delimiter or skipped rows change
+    parse_dates = CSVSniffer.header_columns(
+        st.session_state.upload.path,
+        [c.strip() for c in parse_dates_str.split(",") if c.strip()],
+        read_options,
+    )
+    if parse_dates:
+        read_options["parse_dates"] = parse_dates
+
     # =======================
     #  PREVIEW SECTION
     # =======================
     if st.button("👁️ Preview Data", type="primary"):
         with st.spinner("Reading file for preview..."):
             try:
-                file_buffer.seek(0)
-                df_preview = pd.read_csv(
-                    file_buffer,
-                    sep=delimiter,
-                    encoding=encoding,
-                    header=header,
-                    skiprows=skip_rows,
-                    na_values=na_values,
-                    keep_default_na=False,
-                    dtype=dtype_dict or None,
-                    nrows=int(preview_rows) + 5,  # only for preview
-                    thousands="," if thousands_sep else None,
-                    decimal=decimal_sep,
+                optimize = MemoryOptimizer.from_settings(
+                    st.session_state.get("user_settings")
+                )
+                preview_options = {
+                    **read_options,
+                    **MemoryOptimizer.reader_options("read_csv", optimize),
+                    "nrows": int(preview_rows) + 5,
+                }
+                def read_preview():
+                    # Each read gets its own reader over the shared mapping (no copy)
+                    with st.session_state.upload.open() as file_buffer:
+                        return pd.read_csv(file_buffer, **preview_options)
+
+                df_preview = parse_cache.get_or_load(
+                    st.session_state.upload.sha256,
+                    "read_csv",
+                    preview_options,
+                    read_preview,
+                    optimize=optimize,
                 )
 
                 st.session_state.preview_df = df_preview
@@ -194,53 +304,184 @@ if st.session_state.file_bytes is not None:
                 )
                 col4_m.metric("Non-null", f"{df_preview.count().sum()}")
 
+                memory_report = MemoryOptimizer.report_frame(df_preview)
+                if memory_report is not None:
+                    with st.expander("🪶 Memory optimization (per column)"):
+                        st.dataframe(memory_report, use_container_width=True)
+
             except Exception as e:
                 st.error(f"❌ Error reading file: **{str(e)}**")
                 st.info(
                     "💡 Try different delimiter, encoding, or check advanced options"
                 )
 
+    # =======================
+    #  BROWSE ROWS
+    # =======================
+    with st.expander("🧭 Browse rows anywhere in the file", expanded=False):
+        st.caption(
+            "Indexes the byte offset of every row in one pass, then reads only "
+            "the requested rows"
+        )
+        if st.checkbox("Build row index", key="row_index_enabled"):
+            try:
+                with st.spinner("Indexing row offsets..."):
+                    row_index = RowOffsetIndex.for_upload(
+                        st.session_state.upload,
+                        quotechar=read_options["quotechar"],
+                        encoding=encoding,
+                    )
+                total_rows = row_index.data_rows(read_options)
+                st.write(f"**{total_rows:,}** data rows indexed")
+
+                col1_b, col2_b, col3_b = st.columns(3)
+                with col1_b:
+                    browse_mode = st.radio(
+                        "Show", ["Page", "Tail", "Random sample"], horizontal=True
+                    )
+                with col2_b:
+                    browse_rows = st.number_input(
+                        "Rows",
+                        min_value=1,
+                        max_value=RowOffsetIndex.MAX_ROWS,
+                        value=int(preview_rows),
+                    )
+                with col3_b:
+                    if browse_mode == "Page":
+                        start_row = st.number_input(
+                            "Start row", min_value=0, max_value=max(total_rows - 1, 0), value=0
+                        )
+                    elif browse_mode == "Random sample":
+                        sample_seed = st.number_input("Seed", min_value=0, value=0)
+
+                if browse_mode == "Page":
+                    df_rows = row_index.read_rows(
+                        start_row, start_row + browse_rows, read_options
+                    )
+                elif browse_mode == "Tail":
+                    df_rows = row_index.tail(browse_rows, read_options)
+                else:
+                    df_rows = row_index.sample(
+                        browse_rows, read_options, seed=int(sample_seed)
+                    )
+                st.dataframe(df_rows, use_container_width=True)
+            except Exception as e:
+                st.error(f"❌ Could not index rows: **{str(e)}**")
+
     # =======================
     #  CONVERT & DOWNLOAD
     # =======================
     st.markdown("---")
     st.subheader("📥 Convert & Download")
 
-    col1_conv, _ = st.columns([1, 2])
+    col1_conv, col2_conv, col3_conv = st.columns([1, 1, 1])
 
     with col1_conv:
         # default index=1 -> "excel"
         output_format = st.selectbox(
             "Output format",
-            ["csv", "excel", "json", "parquet"],
+            ["csv", "excel", "json", "jsonl", "parquet", "feather"],
             index=1,  # Excel by default
             help="Parquet requires pyarrow/fastparquet",
         )
 
+    with col2_conv:
+        chunk_size = st.number_input(
+            "Chunk size (rows)",
+            min_value=1_000,
+            max_value=5_000_000,
+            value=100_000,
+            step=10_000,
+            help="Outputs are streamed in chunks of this many rows",
+        )
+
+    sink_options = {}
+    with col3_conv:
+        if output_format in ("json", "jsonl"):
+            if output_format == "json":
+                sink_options["orient"] = st.selectbox(
+                    "JSON orient", ConversionUtils.JSON_ORIENTS
+                )
+            sink_options["backend"] = st.selectbox(
+                "JSON serializer",
+                ConversionUtils.json_backends(),
+                help="orjson keeps full float precision; pandas is faster for most data",
+            )
+
+    extensions = {
+        "csv": ".csv",
+        "excel": ".xlsx",
+        "json": ".json",
+        "jsonl": ".jsonl",
+        "parquet": ".parquet",
+        "feather": ".feather",
+    }
+
     if st.button("🚀 Convert & Download", type="primary", use_container_width=True):
+        # One directory per conversion so concurrent sessions never share an output path
+        output_dir = FileManager.create_temp_directory() / "outputs" / uuid.uuid4().hex
         try:
-            # Always read FULL dataset for conversion (no nrows)
-            full_buffer = BytesIO(st.session_state.file_bytes)
-            full_buffer.seek(0)
-
-            df_full = pd.read_csv(
-                full_buffer,
-                sep=delimiter,
-                encoding=encoding,
-                header=header,
-                skiprows=skip_rows,
-                na_values=na_values,
-                keep_default_na=False,
-                dtype=dtype_dict or None,
-                thousands="," if thousands_sep else None,
-                decimal=decimal_sep,
+            filename = (
+                st.session_state.file_info["name"].rsplit(".", 1)[0]
+                + "_converted"
+                + extensions[output_format]
+            )
+
+            output_dir.mkdir(parents=True)
+            output_path = output_dir / filename
+
+            # Stream chunks straight to disk so memory is bounded by chunk size
+            progress_text = st.empty()
+
+            # Parquet/Feather go through the pyarrow engine when the options allow
+            with Instrumentation.trace(
+                filename,
+                memory=(st.session_state.get("user_settings") or {}).get(
+                    "trace_memory", False
+                ),
+            ) as trace:
+                stats, error = ConversionUtils.convert_csv_file(
+                    st.session_state.upload.path,
+                    output_path,
+                    output_format,
+                    chunksize=int(chunk_size),
+                    read_options=read_options,
+                    preview_rows=int(preview_rows),
+                    progress_callback=lambda rows: progress_text.text(
+                        f"Converted {rows:,} rows..."
+                    ),
+                    sink_options=sink_options,
+                )
+                progress_text.empty()
+                if error:
+                    raise ValueError(error)
+
+                with Instrumentation.stage("prepare") as stage:
+                    with open(output_path, "rb") as output_file:
+                        st.download_button(
+                            label="📥 Download Converted File",
+                            data=output_file,
+                            file_name=filename,
+                            mime="application/octet-stream",
+                        )
+                    stage["bytes_out"] = stats["bytes_out"]
+
+            total_rows = stats["rows"]
+            total_cols = stats["columns"]
+            preview_df = stats["preview"]
+            st.session_state.current_df = None
+            memory_label = "Output size"
+            memory_value = f"{stats['bytes_out'] / 1024:.1f} KB"
+            non_null = "-"
+            st.caption(
+                f"Converted with the {stats['engine']} engine "
+                f"in {stats['seconds']:.2f} s"
             )
 
-            st.session_state.current_df = df_full
             st.session_state.file_info.update(
                 {
-                    "rows": len(df_full),
-                    "cols": len(df_full.columns),
+                    "rows": total_rows,
+                    "cols": total_cols,
                     "delimiter": delimiter,
                     "encoding": encoding,
                 }
@@ -248,77 +489,43 @@ if st.session_state.file_bytes is not None:
 
             # Preview in Convert section (same preview_rows, same advanced options)
             st.success(
-                f"✅ Full data loaded: {len(df_full)} rows × {len(df_full.columns)} columns"
-            )
-            st.markdown("**Preview of converted data:**")
-            st.dataframe(
-                df_full.head(int(preview_rows)), use_container_width=True
+                f"✅ Full data loaded: {total_rows} rows × {total_cols} columns"
             )
+            if preview_df is not None:
+                st.markdown("**Preview of converted data:**")
+                st.dataframe(preview_df, use_container_width=True)
 
             col1_c, col2_c, col3_c, col4_c = st.columns(4)
-            col1_c.metric("Total rows", len(df_full))
-            col2_c.metric("Columns", len(df_full.columns))
-            col3_c.metric(
-                "Memory",
-                f"{df_full.memory_usage(deep=True).sum() / 1024:.1f} KB",
-            )
-            col4_c.metric("Non-null", f"{df_full.count().sum()}")
-
-            # Build output for download
-            output = BytesIO()
-
-            if output_format == "csv":
-                df_full.to_csv(output, index=False)
-                filename = (
-                    st.session_state.file_info["name"].rsplit(".", 1)[0]
-                    + "_converted.csv"
-                )
-
-            elif output_format == "excel":
-                df_full.to_excel(output, index=False, engine="openpyxl")
-                filename = (
-                    st.session_state.file_info["name"].rsplit(".", 1)[0]
-                    + "_converted.xlsx"
-                )
-
-            elif output_format == "json":
-                df_full.to_json(output, orient="records", indent=2)
-                filename = (
-                    st.session_state.file_info["name"].rsplit(".", 1)[0]
-                    + "_converted.json"
-                )
+            col1_c.metric("Total rows", total_rows)
+            col2_c.metric("Columns", total_cols)
+            col3_c.metric(memory_label, memory_value)
+            col4_c.metric("Non-null", non_null)
 
-            elif output_format == "parquet":
-                df_full.to_parquet(output, index=False)
-                filename = (
-                    st.session_state.file_info["name"].rsplit(".", 1)[0]
-                    + "_converted.parquet"
-                )
-
-            output.seek(0)
-            st.download_button(
-                label="📥 Download Converted File",
-                data=output.getvalue(),
-                file_name=filename,
-                mime="application/octet-stream",
-            )
+            with st.expander("⏱️ Where the time went"):
+                st.dataframe(pd.DataFrame(trace.summary()), use_container_width=True)
 
             st.session_state.conversion_history.append(
                 {
                     "input": st.session_state.file_info["name"],
                     "output": filename,
-                    "rows": len(df_full),
+                    "rows": total_rows,
                     "timestamp": pd.Timestamp.now().strftime("%H:%M:%S"),
+                    "seconds": trace.seconds,
+                    "peak_bytes": trace.peak_bytes,
+                    "stages": trace.summary(),
                 }
             )
 
             st.success(
                 f"🎉 Converted **{st.session_state.file_info['name']}** "
-                f"→ **{filename}** with {len(df_full)} rows"
+                f"→ **{filename}** with {total_rows} rows"
             )
 
         except Exception as e:
             st.error(f"❌ Conversion error: **{str(e)}**")
+        finally:
+            # The download button holds its own copy of the bytes
+            shutil.rmtree(output_dir, ignore_errors=True)
 
     # Help tips
     with st.expander("💡 Common Issues & Solutions"):
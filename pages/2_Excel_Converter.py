@@ -1,4 +1,13 @@
 import streamlit as st
+import sys
+from pathlib import Path
+
+# Add utils to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.excel_reader import ExcelReader
+from utils.export_cache import export_cache
+from utils.upload_spool import UploadSpool
 
 st.title("📊 Excel File Converter")
 
@@ -15,42 +24,52 @@ uploaded_file = st.file_uploader("Upload Excel file", type=['xlsx', 'xls'])
 
 if uploaded_file:
     try:
-        import pandas as pd
-        
-        excel_file = pd.ExcelFile(uploaded_file)
+        upload = UploadSpool.spool(uploaded_file, previous=st.session_state.get("excel_upload"))
+        st.session_state.excel_upload = upload
+        # The workbook is opened once per file; sheets are parsed only when needed
+        reader = ExcelReader.open(upload.path, upload.sha256)
         
         st.subheader("📋 Sheet Selection")
-        sheets = st.multiselect("Select sheets", excel_file.sheet_names, default=excel_file.sheet_names[:1])
+        sheets = st.multiselect("Select sheets", reader.sheet_names, default=reader.sheet_names[:1])
         
         if sheets:
-            dfs = {sheet: pd.read_excel(uploaded_file, sheet_name=sheet, keep_default_na=False) for sheet in sheets}
-            
-            for sheet, df in dfs.items():
-                st.write(f"**{sheet}**: {len(df)} rows, {len(df.columns)} columns")
+            for sheet in sheets:
+                n_rows, n_cols = reader.dimensions(sheet)
+                n_rows = max(n_rows - 1, 0) if n_rows else '?'
+                st.write(f"**{sheet}**: {n_rows} rows, {n_cols or '?'} columns")
             
             st.subheader("📊 Data Preview")
             for sheet in sheets:
                 st.write(f"Sheet: {sheet}")
-                st.dataframe(dfs[sheet].head())
+                st.dataframe(reader.preview(sheet, nrows=5, keep_default_na=False))
             
             st.subheader("💾 Download Converted File")
-            col1, col2, col3 = st.columns(3)
+            formats = {'CSV': ('csv', '.csv'), 'JSON': ('json', '.json'), 'Parquet': ('parquet', '.parquet')}
+            col1, col2 = st.columns([1, 2])
             
             with col1:
-                merged_df = pd.concat(dfs.values(), ignore_index=True)
-                csv_data = merged_df.to_csv(index=False)
-                st.download_button("📥 CSV", csv_data, "output.csv")
+                output_label = st.selectbox("Output format", list(formats))
+            output_fmt, extension = formats[output_label]
+            
+            # Sheets are merged straight into the chosen format, one sheet at a time,
+            # and only when asked for
+            options = {'sheets': sheets, 'keep_default_na': False}
             
             with col2:
-                json_data = merged_df.to_json(orient='records')
-                st.download_button("📥 JSON", json_data, "output.json")
+                if st.button(f"⚙️ Prepare {output_label}"):
+                    with st.spinner(f"Merging {len(sheets)} sheet(s)..."):
+                        export_cache.prepare(
+                            upload.sha256, output_fmt,
+                            lambda path: reader.merge_to(sheets, path, output_fmt, keep_default_na=False),
+                            options,
+                        )
             
-            with col3:
-                try:
-                    parquet_data = merged_df.to_parquet()
-                    st.download_button("📥 Parquet", parquet_data, "output.parquet")
-                except:
-                    st.write("Parquet not available")
+            prepared = export_cache.get(upload.sha256, output_fmt, options)
+            if prepared:
+                stats = prepared['stats']
+                st.caption(f"{stats['rows']} rows × {stats['columns']} columns merged in {prepared['seconds']:.2f} s")
+                with open(prepared['path'], 'rb') as f:
+                    st.download_button(f"📥 {output_label}", f, "output" + extension)
     
     except Exception as e:
         st.error(f"Error: {str(e)}")
@@ -1,5 +1,17 @@
 import streamlit as st
-import json
+import sys
+from pathlib import Path
+
+# Add utils to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.conversion_utils import ConversionUtils
+from utils.export_cache import export_cache
+from utils.json_reader import JSONReader
+from utils.parse_cache import parse_cache
+from utils.upload_spool import UploadSpool
+
+PREVIEW_ROWS = 1000
 
 st.title("📋 JSON Converter")
 
@@ -8,43 +20,85 @@ Convert JSON files with multiple format options:
 - Records orientation
 - Split orientation
 - Index orientation
+- JSON Lines, streamed in chunks
 - Nested JSON flattening
 - Date parsing
 """)
 
-uploaded_file = st.file_uploader("Upload JSON file", type=['json', 'jsonl'])
+uploaded_file = st.file_uploader("Upload JSON file", type=['json', 'jsonl', 'ndjson'])
 
 if uploaded_file:
     try:
-        import pandas as pd
+        upload = UploadSpool.spool(uploaded_file, previous=st.session_state.get("json_upload"))
+        st.session_state.json_upload = upload
         
-        orient = st.selectbox("JSON Orientation", ['records', 'split', 'index', 'columns', 'values'])
+        detected = st.session_state.setdefault("json_lines_detected", {})
+        if upload.sha256 not in detected:
+            detected[upload.sha256] = JSONReader.is_lines(upload.path)
         
-        df = pd.read_json(uploaded_file,keep_default_na=False)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            lines = st.checkbox("JSON Lines (one record per line)", value=detected[upload.sha256],
+                                key=f"json_lines_{upload.sha256}")
+        with col2:
+            orient = st.selectbox("JSON Orientation", JSONReader.ORIENTS, disabled=lines)
+        with col3:
+            flatten = st.checkbox("Flatten nested objects", value=True)
+            sep = st.text_input("Nested key separator", value=".", disabled=not flatten) or "."
+        
+        read_options = {'orient': orient, 'lines': lines, 'flatten': flatten, 'sep': sep}
+        # JSON Lines and top-level arrays are read incrementally; only the preview is parsed here
+        df = parse_cache.get_or_load(
+            upload.sha256, 'json_reader', {**read_options, 'nrows': PREVIEW_ROWS},
+            lambda: JSONReader.read(upload.path, nrows=PREVIEW_ROWS, **read_options)
+        )
         
         st.subheader("📊 Data Preview")
         st.dataframe(df.head())
         
         st.subheader("📈 Data Info")
-        st.write(f"Rows: {len(df)}, Columns: {len(df.columns)}")
+        if len(df) < PREVIEW_ROWS:
+            st.write(f"Rows: {len(df)}, Columns: {len(df.columns)}")
+        else:
+            st.write(f"Columns: {len(df.columns)} (from the first {PREVIEW_ROWS:,} rows)")
         
         st.subheader("💾 Download Converted File")
-        col1, col2, col3 = st.columns(3)
+        formats = {'CSV': 'csv', 'Excel': 'excel', 'JSON Lines': 'jsonl', 'Parquet': 'parquet'}
+        col1, col2 = st.columns([1, 2])
         
         with col1:
-            csv_data = df.to_csv(index=False)
-            st.download_button("📥 CSV", csv_data, "output.csv")
+            output_label = st.selectbox("Output format", list(formats))
+        output_fmt = formats[output_label]
         
+        def write_output(path):
+            columns = None
+            if ConversionUtils.fixed_columns(output_fmt):
+                # CSV/Excel/Parquet fix their columns with the first chunk, so find every key first
+                columns = JSONReader.scan_columns(upload.path, **read_options)
+            stats, error = ConversionUtils.stream_convert_chunks(
+                JSONReader.iter_chunks(upload.path, **read_options), path, output_fmt, columns=columns
+            )
+            if stats is None:
+                raise ValueError(error or "Conversion failed")
+            return stats
+        
+        # Only the chosen format is written, chunk by chunk, and only once per file and options
         with col2:
-            excel_data = df.to_excel(index=False)
-            st.download_button("📥 Excel", excel_data, "output.xlsx")
+            if st.button(f"⚙️ Prepare {output_label}"):
+                with st.spinner(f"Writing {output_label}..."):
+                    export_cache.prepare(upload.sha256, output_fmt, write_output, read_options)
         
-        with col3:
-            try:
-                parquet_data = df.to_parquet()
-                st.download_button("📥 Parquet", parquet_data, "output.parquet")
-            except:
-                st.write("Parquet not available")
+        prepared = export_cache.get(upload.sha256, output_fmt, read_options)
+        if prepared:
+            stats = prepared['stats']
+            st.caption(f"{stats['rows']:,} rows × {stats['columns']} columns in {prepared['seconds']:.2f} s")
+            if stats['dropped_columns']:
+                st.warning(
+                    "Keys first seen after the first chunk were dropped: "
+                    + ", ".join(map(str, stats['dropped_columns']))
+                )
+            with open(prepared['path'], 'rb') as f:
+                st.download_button(f"📥 {output_label}", f, "output" + export_cache.EXTENSIONS[output_fmt])
     
     except Exception as e:
         st.error(f"Error: {str(e)}")
@@ -1,4 +1,18 @@
 import streamlit as st
+import sys
+from pathlib import Path
+
+# Add utils to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.codec_benchmark import CodecBenchmark
+from utils.columnar_reader import ColumnarReader
+from utils.conversion_utils import ConversionUtils
+from utils.export_cache import export_cache
+from utils.format_handlers import ParquetProfile
+from utils.memory_optimizer import MemoryOptimizer
+from utils.parse_cache import parse_cache
+from utils.upload_spool import UploadSpool
 
 st.title("⚡ Parquet/Feather Converter")
 
@@ -6,43 +20,228 @@ st.write("""
 Convert to high-performance columnar formats:
 - Parquet format (PyArrow/fastparquet)
 - Feather format
-- Compression options
+- Parquet/Feather input with column selection and row filters
+- Compression options and writer profiles
 - Performance metrics
 - File size comparison
 """)
 
-uploaded_file = st.file_uploader("Upload data file", type=['csv', 'xlsx', 'json', 'parquet'])
+uploaded_file = st.file_uploader("Upload data file", type=['csv', 'xlsx', 'json', 'parquet', 'feather'])
 
 if uploaded_file:
     try:
-        import pandas as pd
-        
-        df = pd.read_csv(uploaded_file,keep_default_na=False) if uploaded_file.name.endswith('.csv') else pd.read_excel(uploaded_file,keep_default_na=False) if uploaded_file.name.endswith(('.xlsx', '.xls')) else pd.read_json(uploaded_file,keep_default_na=False)
+        upload = UploadSpool.spool(uploaded_file, previous=st.session_state.get("parquet_upload"))
+        st.session_state.parquet_upload = upload
+        name = uploaded_file.name.lower()
+        is_csv = name.endswith('.csv')
+        input_fmt = ColumnarReader.input_format(name)
+        read_options = {}
         
-        compression = st.selectbox("Compression", ['snappy', 'gzip', 'brotli', 'none'])
+        if is_csv:
+            # CSV goes straight to Parquet/Feather through pyarrow; pandas only parses a preview
+            df = parse_cache.read(upload, 'read_csv', keep_default_na=False, nrows=1000)
+        elif input_fmt:
+            # Parquet/Feather: schema and row counts come from the footer; only the selected
+            # columns are read and filters are pushed down to row-group statistics
+            schema = parse_cache.get_or_load(
+                upload.sha256, 'columnar_schema', {'format': input_fmt},
+                lambda: ColumnarReader.schema(upload.path, input_fmt)
+            )
+            layout = parse_cache.get_or_load(
+                upload.sha256, 'columnar_metadata', {'format': input_fmt},
+                lambda: ColumnarReader.metadata(upload.path, input_fmt)
+            )
+            
+            st.subheader("🧮 Columns & Row Filters")
+            read_columns = st.multiselect("Columns to read", schema.names, default=schema.names) or schema.names
+            n_filters = st.number_input("Row filters", min_value=0, max_value=5, value=0)
+            conditions = []
+            for i in range(int(n_filters)):
+                col1, col2, col3 = st.columns([2, 1, 2])
+                with col1:
+                    column = st.selectbox("Column", schema.names, key=f"filter_column_{i}")
+                with col2:
+                    operator = st.selectbox("Operator", ColumnarReader.OPERATORS, key=f"filter_operator_{i}")
+                with col3:
+                    value = st.text_input("Value", key=f"filter_value_{i}",
+                                          disabled=operator in ('is null', 'is not null'),
+                                          help="Comma-separated list for 'in' / 'not in'")
+                if value or operator in ('is null', 'is not null'):
+                    conditions.append((column, operator, value))
+            
+            filter_expression = ColumnarReader.build_filter(schema, conditions)
+            read_options = {'columns': read_columns, 'filters': conditions}
+            plan = ColumnarReader.plan(upload.path, input_fmt, filter_expression)
+            if plan and conditions:
+                st.caption(f"Row-group statistics leave {plan['row_groups_read']} of {plan['row_groups']} row groups to read")
+            df = parse_cache.get_or_load(
+                upload.sha256, 'columnar_preview', read_options,
+                lambda: ColumnarReader.preview(upload.path, input_fmt, read_columns, filter_expression)
+            )
+        else:
+            optimize = MemoryOptimizer.from_settings(st.session_state.get('user_settings'))
+            df = parse_cache.read(upload, 'read_excel', optimize=optimize, keep_default_na=False) if uploaded_file.name.endswith(('.xlsx', '.xls')) else parse_cache.read(upload, 'read_json', optimize=optimize)
         
         st.subheader("📊 Data Preview")
         st.dataframe(df.head())
         
+        memory_report = MemoryOptimizer.report_frame(df)
+        if memory_report is not None:
+            with st.expander("🪶 Memory optimization (per column)"):
+                st.dataframe(memory_report, use_container_width=True)
+        
         st.subheader("📊 Data Info")
-        st.write(f"Shape: {df.shape[0]} rows × {df.shape[1]} columns")
+        if input_fmt:
+            st.write(f"Shape: {layout['rows']} rows × {layout['columns']} columns in "
+                     f"{layout['row_groups']} row group(s); reading {len(read_columns)} column(s)")
+        else:
+            st.write(f"Shape: {'≥ ' + str(len(df)) if is_csv and len(df) == 1000 else len(df)} rows × {df.shape[1]} columns")
         
-        st.subheader("💾 Download Converted File")
-        col1, col2 = st.columns(2)
+        st.subheader("⚙️ Parquet Writer Profile")
+        preset = st.selectbox(
+            "Profile", list(ParquetProfile.PRESETS),
+            help="fast write: LZ4, no dictionaries or statistics · small file: zstd level 9, "
+                 "large row groups · fast scan: smaller row groups and pages with a page index",
+        )
+        defaults = ParquetProfile.resolve(preset)
+        columns = [str(c) for c in df.columns]
+        with st.expander("Writer settings"):
+            # Keyed by preset so switching presets resets the fields to its values
+            col1, col2 = st.columns(2)
+            with col1:
+                codecs = ['snappy', 'zstd', 'lz4', 'gzip', 'brotli', 'none']
+                compression = st.selectbox("Compression", codecs, index=codecs.index(defaults['compression']),
+                                           key=f"pq_compression_{preset}")
+                compression_level = st.number_input(
+                    "Compression level (0 = codec default)", min_value=0, max_value=22,
+                    value=defaults['compression_level'] or 0, key=f"pq_level_{preset}",
+                    help="Used by zstd, gzip and brotli",
+                )
+                row_group_rows = st.number_input(
+                    "Rows per row group (0 = by size)", min_value=0, step=10_000,
+                    value=defaults['row_group_rows'] or 0, key=f"pq_row_group_{preset}",
+                )
+                data_page_kb = st.number_input(
+                    "Data page size (KB, 0 = 1 MB default)", min_value=0, step=64,
+                    value=(defaults['data_page_size'] or 0) // 1024, key=f"pq_page_{preset}",
+                )
+            with col2:
+                dictionary_columns = st.multiselect(
+                    "Dictionary-encoded columns", columns,
+                    default=columns if defaults['use_dictionary'] else [], key=f"pq_dictionary_{preset}",
+                )
+                write_statistics = st.checkbox("Write column statistics", value=defaults['write_statistics'],
+                                               key=f"pq_statistics_{preset}")
+                write_page_index = st.checkbox("Write page index", value=defaults['write_page_index'],
+                                               key=f"pq_page_index_{preset}")
+                bloom_filter_columns = st.multiselect(
+                    "Bloom filter columns", columns, key=f"pq_bloom_{preset}",
+                    disabled=not ParquetProfile.supports('bloom_filter_options'),
+                    help="Speeds up equality lookups on high-cardinality columns",
+                )
         
-        with col1:
-            try:
-                parquet_data = df.to_parquet(compression=compression if compression != 'none' else None)
-                st.download_button("📥 Parquet", parquet_data, "output.parquet")
-            except:
-                st.write("Parquet not available")
+        profile = ParquetProfile.resolve(
+            preset,
+            compression=compression,
+            compression_level=compression_level or None,
+            row_group_rows=row_group_rows or None,
+            data_page_size=data_page_kb * 1024 or None,
+            use_dictionary=True if len(dictionary_columns) == len(columns) else dictionary_columns or False,
+            write_statistics=write_statistics,
+            write_page_index=write_page_index,
+            bloom_filter_columns=bloom_filter_columns,
+        )
         
+        def write_output(fmt):
+            """Writer for export_cache: CSV/Parquet/Feather are converted from disk, other inputs from the parsed frame"""
+            def writer(path):
+                if is_csv:
+                    stats, error = ConversionUtils.convert_csv_file(
+                        upload.path, path, fmt, {'keep_default_na': False},
+                        compression=profile['compression'] if fmt == 'parquet' else 'lz4',
+                        profile=profile if fmt == 'parquet' else None,
+                    )
+                    if error:
+                        raise ValueError(error)
+                    return stats
+                if input_fmt:
+                    return ColumnarReader.convert(
+                        upload.path, input_fmt, path, fmt, read_columns, filter_expression,
+                        compression=profile['compression'] if fmt == 'parquet' else 'lz4',
+                        profile=profile if fmt == 'parquet' else None,
+                    )
+                if fmt == 'parquet':
+                    return export_cache.write_frame(df, path, fmt, **ParquetProfile.write_table_options(profile))
+                return export_cache.write_frame(df, path, fmt, compression='lz4')
+            return writer
+        
+        st.subheader("💾 Download Converted File")
+        # Each format is written only when requested, then reused for this file and profile
+        download_columns = st.columns(2)
+        for column, (label, fmt) in zip(download_columns, [('Parquet', 'parquet'), ('Feather', 'feather')]):
+            options = {**(profile if fmt == 'parquet' else {'compression': 'lz4'}), **read_options}
+            with column:
+                try:
+                    if st.button(f"⚙️ Prepare {label}"):
+                        with st.spinner(f"Writing {label}..."):
+                            export_cache.prepare(upload.sha256, fmt, write_output(fmt), options)
+                    prepared = export_cache.get(upload.sha256, fmt, options)
+                    if prepared:
+                        with open(prepared['path'], 'rb') as f:
+                            st.download_button(f"📥 {label}", f, "output" + export_cache.EXTENSIONS[fmt])
+                        engine = prepared['stats'].get('engine', 'pandas')
+                        summary = f"{prepared['bytes'] / 1024:.1f} KB, {engine} engine, {prepared['seconds']:.2f} s"
+                        if fmt == 'parquet':
+                            layout = ParquetProfile.describe(prepared['path'])
+                            summary += f", {layout['row_groups']} row group(s), {'/'.join(layout['codecs'])}"
+                        st.caption(summary)
+                except Exception as e:
+                    st.write(f"{label} not available: {e}")
+    
+        st.subheader("📈 Performance Metrics & File Size Comparison")
+        # Real numbers for this data: every codec is written and read back in its own process
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            sample_rows = st.number_input("Rows to benchmark", min_value=1_000, step=100_000,
+                                          value=CodecBenchmark.DEFAULT_SAMPLE_ROWS, disabled=not (is_csv or input_fmt),
+                                          help="CSV, Parquet and Feather inputs are sampled; "
+                                               "other inputs use all loaded rows")
+            repeat = st.number_input("Runs per codec (best time kept)", min_value=1, max_value=5, value=1)
         with col2:
-            try:
-                feather_data = df.to_feather()
-                st.download_button("📥 Feather", feather_data, "output.feather")
-            except:
-                st.write("Feather not available")
+            target_labels = [f"{fmt} / {codec}" for fmt, codec in CodecBenchmark.TARGETS]
+            selected = st.multiselect("Codecs", target_labels, default=target_labels)
+        
+        benchmarks = st.session_state.setdefault("codec_benchmarks", {})
+        sampled = is_csv or input_fmt
+        benchmark_key = (upload.sha256, int(sample_rows) if sampled else None, int(repeat), tuple(selected),
+                         repr(read_options))
+        if st.button("⏱️ Run benchmark", disabled=not selected):
+            progress = st.progress(0.0)
+            if is_csv:
+                table = CodecBenchmark.load_csv_sample(upload.path, {'keep_default_na': False}, int(sample_rows))
+            elif input_fmt:
+                table = ColumnarReader.read(upload.path, input_fmt, read_columns, filter_expression,
+                                            max_rows=int(sample_rows))
+            else:
+                import pyarrow as pa
+                table = pa.Table.from_pandas(df, preserve_index=False)
+            targets = [CodecBenchmark.TARGETS[target_labels.index(label)] for label in selected]
+            results = CodecBenchmark.run(
+                table, targets, repeat=int(repeat),
+                progress_callback=lambda done, total: progress.progress(done / total, f"{done}/{total} codecs"),
+            )
+            benchmarks[benchmark_key] = (table.num_rows, table.nbytes, CodecBenchmark.summarize(results))
+            progress.empty()
+        
+        if benchmark_key in benchmarks:
+            n_rows, n_bytes, summary = benchmarks[benchmark_key]
+            st.caption(f"{n_rows:,} rows, {n_bytes / 1024 / 1024:.1f} MB in memory (Arrow). "
+                       "Peak memory is the process's RSS growth during the write or read.")
+            st.dataframe(summary, use_container_width=True)
+            if 'Size (MB)' in summary:
+                chart = summary.dropna(subset=['Size (MB)'])
+                chart = chart.set_index(chart['Format'] + ' / ' + chart['Codec'])
+                st.bar_chart(chart[['Size (MB)']])
     
     except Exception as e:
         st.error(f"Error: {str(e)}")
@@ -1,4 +1,16 @@
 import streamlit as st
+import sys
+from pathlib import Path
+
+# Add utils to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.conversion_utils import ConversionUtils
+from utils.json_reader import JSONReader
+from utils.memory_optimizer import MemoryOptimizer
+from utils.parse_cache import parse_cache
+from utils.sql_exporter import SQLExporter
+from utils.upload_spool import UploadSpool
 
 st.title("🗄️ SQL Database Converter")
 
@@ -15,31 +27,107 @@ db_type = st.selectbox("Database Type", ['SQLite', 'PostgreSQL', 'MySQL'])
 
 if db_type == 'SQLite':
     st.info("SQLite databases are file-based and perfect for local development.")
+else:
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        db_host = st.text_input("Host", "localhost")
+        db_port = st.number_input("Port", min_value=1, max_value=65535, value=5432 if db_type == 'PostgreSQL' else 3306)
+    with col2:
+        db_user = st.text_input("Username")
+        db_password = st.text_input("Password", type="password")
+    with col3:
+        db_name = st.text_input("Database")
 
-uploaded_file = st.file_uploader("Upload data file", type=['csv', 'xlsx', 'json'])
+uploaded_file = st.file_uploader("Upload data file", type=['csv', 'xlsx', 'json', 'jsonl'])
 
 if uploaded_file:
     try:
-        import pandas as pd
+        upload = UploadSpool.spool(uploaded_file, previous=st.session_state.get("sql_upload"))
+        st.session_state.sql_upload = upload
+        stream_format = 'csv' if uploaded_file.name.endswith('.csv') else 'jsonl' if uploaded_file.name.endswith('.jsonl') else None
+        streaming = stream_format is not None and st.checkbox(
+            "Stream into database (constant memory)",
+            value=stream_format == 'jsonl',
+            help="Load the file chunk by chunk instead of parsing it into one DataFrame first",
+        )
         
-        df = pd.read_csv(uploaded_file,keep_default_na=False) if uploaded_file.name.endswith('.csv') else pd.read_excel(uploaded_file,keep_default_na=False) if uploaded_file.name.endswith(('.xlsx', '.xls')) else pd.read_json(uploaded_file,keep_default_na=False)
+        if streaming:
+            # Only a preview is parsed up front; the load reads the file chunk by chunk
+            df = parse_cache.read(upload, 'read_csv', keep_default_na=False, nrows=100) if stream_format == 'csv' else parse_cache.read(upload, 'read_json', lines=True, nrows=100)
+        else:
+            optimize = MemoryOptimizer.from_settings(st.session_state.get('user_settings'))
+            df = parse_cache.read(upload, 'read_csv', optimize=optimize, keep_default_na=False) if uploaded_file.name.endswith('.csv') else parse_cache.read(upload, 'read_excel', optimize=optimize, keep_default_na=False) if uploaded_file.name.endswith(('.xlsx', '.xls')) else parse_cache.read(upload, 'read_json', optimize=optimize)
         
         st.subheader("📊 Data Preview")
         st.dataframe(df.head())
         
+        memory_report = MemoryOptimizer.report_frame(df)
+        if memory_report is not None:
+            with st.expander("🪶 Memory optimization (per column)"):
+                st.dataframe(memory_report, use_container_width=True)
+        
         table_name = st.text_input("Table Name", "data")
         
+        with st.expander("⚙️ Load Options", expanded=False):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if_exists = st.selectbox("If table exists", ['replace', 'append', 'fail'])
+            with col2:
+                method = st.selectbox(
+                    "Insert method",
+                    SQLExporter.METHODS,
+                    help="auto: executemany for SQLite, COPY for PostgreSQL, multi-row INSERT otherwise",
+                )
+            with col3:
+                chunksize = st.number_input("Rows per batch", min_value=100, max_value=1_000_000, value=SQLExporter.DEFAULT_CHUNKSIZE, step=1000)
+            if streaming:
+                index_columns = st.multiselect(
+                    "Index columns (created after the load)", [str(c) for c in df.columns]
+                )
+            else:
+                include_index = st.checkbox("Write DataFrame index as a column", value=False)
+        
         if st.button("Export to Database"):
             if db_type == 'SQLite':
-                try:
-                    import sqlite3
-                    db_file = f"{table_name}.db"
-                    conn = sqlite3.connect(db_file)
-                    df.to_sql(table_name, conn, if_exists='replace')
-                    conn.close()
-                    st.success(f"Data exported to {db_file}")
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
+                db_file = f"{table_name}.db"
+                url = SQLExporter.build_url(db_type, db_file)
+            else:
+                db_file = db_name
+                url = SQLExporter.build_url(db_type, db_name, db_host, db_port, db_user, db_password)
+            
+            progress_text = st.empty()
+            show_progress = lambda rows, rate: progress_text.text(f"Loaded {rows:,} rows ({rate:,.0f} rows/s)...")
+            if streaming:
+                if stream_format == 'csv':
+                    chunks = ConversionUtils.iter_chunks(upload.path, 'csv', int(chunksize), {'keep_default_na': False})
+                else:
+                    # Nested objects become dotted columns; SQL can't store dicts
+                    chunks = JSONReader.iter_chunks(upload.path, lines=True, chunksize=int(chunksize), flatten=True)
+                stats, error = SQLExporter.ingest_stream(
+                    chunks, url, table_name,
+                    if_exists=if_exists,
+                    method=method,
+                    chunksize=int(chunksize),
+                    index_columns=index_columns,
+                    progress_callback=show_progress,
+                )
+            else:
+                stats, error = SQLExporter.export(
+                    df, url, table_name,
+                    if_exists=if_exists,
+                    index=include_index,
+                    method=method,
+                    chunksize=int(chunksize),
+                    progress_callback=show_progress,
+                )
+            progress_text.empty()
+            if error:
+                st.error(f"Error: {error}")
+            else:
+                st.success(
+                    f"Data exported to {db_file}: {stats['rows']:,} rows in {stats['seconds']:.2f} s "
+                    f"({stats['rows_per_second']:,.0f} rows/s, {stats['method']})"
+                )
     
     except Exception as e:
         st.error(f"Error: {str(e)}")
@@ -1,4 +1,16 @@
 import streamlit as st
+import sys
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+# Add utils to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.batch_scheduler import BatchScheduler
+from utils.file_manager import FileManager
+from utils.upload_spool import UploadSpool
 
 st.title("🔄 Batch Conversion")
 
@@ -18,21 +30,70 @@ if uploaded_files:
     for file in uploaded_files:
         st.write(f"• {file.name}")
     
-    output_format = st.selectbox("Output Format", ['CSV', 'Excel', 'JSON', 'Parquet'])
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        output_format = st.selectbox("Output Format", ['CSV', 'Excel', 'JSON', 'Parquet'])
+    
+    with col2:
+        max_workers = st.number_input("Parallel workers", min_value=1, max_value=32, value=BatchScheduler.default_workers())
+    
+    with col3:
+        memory_limit_mb = st.number_input("Memory limit per file (MB, 0 = none)", min_value=0, value=0, step=256)
     
     if st.button("Convert All"):
+        output_dir = FileManager.create_temp_directory() / "batch" / uuid.uuid4().hex
+        output_dir.mkdir(parents=True)
+        
         try:
-            import pandas as pd
+            # Workers read spooled files from disk instead of receiving the bytes
+            leases = [UploadSpool.spool(file) for file in uploaded_files]
+            jobs = [
+                BatchScheduler.make_job(lease.path, lease.name, output_format, output_dir, {'keep_default_na': False})
+                for lease in leases
+            ]
+            
+            progress = st.progress(0.0, text="Starting workers...")
+            status = st.empty()
+            results = []
+            
+            scheduler = BatchScheduler(max_workers=int(max_workers), memory_limit_mb=memory_limit_mb or None)
+            zip_path = output_dir / "converted_files.zip"
+            start = time.perf_counter()
+            for result in scheduler.run_to_zip(jobs, zip_path):
+                results.append(result)
+                progress.progress(len(results) / len(jobs), text=f"Converted {len(results)}/{len(jobs)} files")
+                status.dataframe([
+                    {
+                        'File': r['name'],
+                        'Rows': r['rows'],
+                        'Input KB': round(r['bytes_in'] / 1024, 1),
+                        'Output KB': round(r['bytes_out'] / 1024, 1),
+                        'Seconds': round(r['seconds'], 2),
+                        'Error': r['error'] or '',
+                    }
+                    for r in results
+                ], use_container_width=True)
+            
+            summary = BatchScheduler.summarize(results, time.perf_counter() - start)
+            st.success(
+                f"Converted {summary['files'] - summary['failed']}/{summary['files']} files, "
+                f"{summary['rows']} rows, {summary['bytes_out'] / 1024:.1f} KB written "
+                f"in {summary['seconds']:.1f} s ({summary['rows_per_s'] or 0:,.0f} rows/s)"
+            )
+            if summary['failed']:
+                st.warning(f"{summary['failed']} file(s) failed, see the Error column above")
             
-            for file in uploaded_files:
-                df = pd.read_csv(file,keep_default_na=False) if file.name.endswith('.csv') else pd.read_excel(file,keep_default_na=False)
-                
-                if output_format == 'CSV':
-                    output = df.to_csv(index=False)
-                    st.download_button(f"📥 {file.name.split('.')[0]}.csv", output, f"{file.name.split('.')[0]}.csv")
-                elif output_format == 'JSON':
-                    output = df.to_json(orient='records')
-                    st.download_button(f"📥 {file.name.split('.')[0]}.json", output, f"{file.name.split('.')[0]}.json")
+            if summary['files'] > summary['failed']:
+                with open(zip_path, 'rb') as f:
+                    st.download_button(
+                        f"📥 Download all ({zip_path.stat().st_size / 1024:.1f} KB ZIP)",
+                        f,
+                        "converted_files.zip",
+                        mime="application/zip",
+                    )
         
         except Exception as e:
             st.error(f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
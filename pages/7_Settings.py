@@ -1,27 +1,119 @@
 import streamlit as st
+import sys
+from pathlib import Path
+
+# Add utils to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.parse_cache import parse_cache
+from utils.startup import DEFAULT_BUDGET, StartupProfiler
 
 st.title("⚙️ Settings & Preferences")
 
+user_settings = st.session_state.setdefault("user_settings", {})
+
 st.subheader("📊 Default Options")
 
 col1, col2, col3 = st.columns(3)
 
 with col1:
     encoding = st.selectbox("Default Encoding", ['utf-8', 'latin-1', 'iso-8859-1'])
-    st.session_state.user_settings['default_encoding'] = encoding
+    user_settings['default_encoding'] = encoding
 
 with col2:
     delimiter = st.selectbox("Default Delimiter", [',', '\t', '|', ';'])
-    st.session_state.user_settings['default_delimiter'] = delimiter
+    user_settings['default_delimiter'] = delimiter
 
 with col3:
     preview_rows = st.number_input("Preview Rows", min_value=1, max_value=100, value=5)
-    st.session_state.user_settings['preview_rows'] = preview_rows
+    user_settings['preview_rows'] = preview_rows
 
 st.subheader("📁 File Settings")
 
 max_size = st.slider("Max Upload Size (MB)", min_value=10, max_value=500, value=500)
 
+st.subheader("🧠 Parse Cache")
+
+cache_stats = parse_cache.stats()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Cached files", cache_stats['entries'])
+col2.metric("Memory", f"{cache_stats['total_bytes'] / (1024 * 1024):.1f} / {cache_stats['max_bytes'] / (1024 * 1024):.0f} MB")
+col3.metric("Hits / Misses", f"{cache_stats['hits']} / {cache_stats['misses']}")
+col4.metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+
+if st.button("Clear Parse Cache"):
+    parse_cache.clear()
+    st.success("Parse cache cleared!")
+
+st.subheader("🪶 Memory Optimization")
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    user_settings['optimize_memory'] = st.checkbox(
+        "Optimize loaded data",
+        value=user_settings.get('optimize_memory', False),
+        help="Downcast numeric columns and store repeated strings as categoricals",
+    )
+
+with col2:
+    user_settings['arrow_dtypes'] = st.checkbox(
+        "Arrow-backed dtypes",
+        value=user_settings.get('arrow_dtypes', False),
+        disabled=not user_settings['optimize_memory'],
+        help="Read with dtype_backend='pyarrow' and keep remaining text as Arrow strings",
+    )
+
+with col3:
+    user_settings['category_ratio'] = st.slider(
+        "Categorical threshold (unique / rows)",
+        min_value=0.0, max_value=1.0, step=0.05,
+        value=float(user_settings.get('category_ratio', 0.5)),
+        disabled=not user_settings['optimize_memory'],
+    )
+
+st.subheader("⏱️ Instrumentation")
+
+user_settings['trace_memory'] = st.checkbox(
+    "Track peak memory per conversion stage",
+    value=user_settings.get('trace_memory', False),
+    help="Uses tracemalloc; conversions run noticeably slower while it is on",
+)
+
+st.subheader("🚀 Startup")
+
+st.caption(
+    "Runs each script cold in a fresh interpreter with `-X importtime`, as a new pod would. "
+    f"Budget: {DEFAULT_BUDGET:.2f} s on top of a bare `import streamlit` (`python -m utils.startup --budget`)."
+)
+scripts = st.multiselect("Scripts", StartupProfiler.scripts(), default=["app.py"])
+if st.button("Measure cold start", disabled=not scripts):
+    with st.spinner("Profiling imports..."):
+        st.session_state.startup_baseline = StartupProfiler.baseline(repeat=2)
+        st.session_state.startup_report = [StartupProfiler.profile(script, repeat=2) for script in scripts]
+
+if "startup_baseline" in st.session_state:
+    st.write(f"`import streamlit` alone: {st.session_state.startup_baseline:.2f} s")
+for result in st.session_state.get("startup_report", []):
+    overhead = StartupProfiler.overhead(result, st.session_state.startup_baseline)
+    if overhead is not None:
+        label = f"{result['script']}: {result['seconds']:.2f} s ({overhead:+.2f} s)"
+    else:
+        label = f"{result['script']}: failed"
+    if StartupProfiler.over_budget([result], DEFAULT_BUDGET, st.session_state.startup_baseline):
+        label += " ⚠️ over budget"
+    with st.expander(label):
+        st.dataframe(
+            [{'Module': row['module'], 'Seconds': round(row['seconds'], 3)} for row in result['top']],
+            hide_index=True, use_container_width=True,
+        )
+        if result['heavy']:
+            st.write("Heavy libraries loaded at startup: " + ", ".join(
+                f"`{module}` (via `{via}`)" for module, via in result['heavy'].items()
+            ))
+        if result['error']:
+            st.warning(result['error'])
+
 st.subheader("🎨 Display Options")
 
 col1, col2 = st.columns(2)
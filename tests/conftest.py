@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import utils the way the pages do
+sys.path.append(str(Path(__file__).parent.parent))
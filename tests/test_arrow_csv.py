@@ -0,0 +1,65 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from utils.conversion_utils import ConversionUtils
+from utils.format_handlers import ArrowCSVHandler
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Type inference only sees the first block, so later rows surprise it
+    monkeypatch.setattr(ArrowCSVHandler, 'BLOCK_SIZE', 256)
+
+
+def test_columns_are_widened_when_a_later_block_does_not_fit(tmp_path, small_blocks):
+    source = tmp_path / 'late.csv'
+    source.write_text('id,price,code\n' + ''.join(f"{i},{i},{i}\n" for i in range(200)) + '200,2.5,X1\n')
+    output = tmp_path / 'out.parquet'
+
+    stats = ArrowCSVHandler.convert(source, output, 'parquet')
+    assert stats['engine'] == 'pyarrow' and stats['rows'] == 201
+    schema = pq.read_schema(output)
+    assert schema.field('id').type == pa.int64()
+    assert schema.field('price').type == pa.float64()
+    assert schema.field('code').type == pa.string()
+    assert pd.read_parquet(output)['code'].iloc[-1] == 'X1'
+
+
+def test_requested_types_are_not_widened(tmp_path, small_blocks):
+    source = tmp_path / 'late.csv'
+    source.write_text('price\n' + '1\n' * 200 + '2.5\n')
+
+    with pytest.raises(pa.ArrowInvalid, match='In CSV column #0'):
+        ArrowCSVHandler.convert(source, tmp_path / 'out.parquet', 'parquet', {'dtype': {'price': 'int64'}})
+
+
+@pytest.mark.parametrize('read_options', [{'header': None}, {'header': None, 'thousands': ','}])
+def test_headerless_columns_are_named_like_pandas(tmp_path, read_options):
+    source = tmp_path / 'noheader.csv'
+    source.write_text('1,a\n2,b\n')
+    output = tmp_path / 'out.parquet'
+
+    stats, error = ConversionUtils.convert_csv_file(source, output, 'parquet', read_options=read_options)
+    assert error is None
+    assert stats['engine'] == ('pandas' if 'thousands' in read_options else 'pyarrow')
+    assert pd.read_parquet(output).columns.tolist() == ['0', '1']
+
+
+def test_headerless_dtypes_use_pandas_positions(tmp_path):
+    source = tmp_path / 'noheader.csv'
+    source.write_text('1,a\n2,b\n')
+    output = tmp_path / 'out.feather'
+
+    ArrowCSVHandler.convert(source, output, 'feather', {'header': None, 'dtype': {0: 'str'}})
+    assert pa.types.is_string(pa.ipc.open_file(output).schema.field('0').type)
+
+
+@pytest.mark.parametrize('read_options, reason', [
+    ({'thousands': ','}, 'thousands separator'),
+    ({'sep': '::'}, 'multi-character or regex delimiter'),
+    ({'dtype': {'a': 'category'}}, "dtype 'category'"),
+])
+def test_unsupported_options_fall_back_with_a_reason(read_options, reason):
+    assert ArrowCSVHandler.arrow_options(read_options) == (None, reason)
@@ -0,0 +1,22 @@
+import pandas as pd
+
+from utils.batch_scheduler import BatchScheduler, convert_file
+
+
+def test_tsv_inputs_are_read_tab_separated(tmp_path):
+    source = tmp_path / 'data.tsv'
+    source.write_text('a\tb\n1\t2\n')
+
+    result = convert_file(BatchScheduler.make_job(source, 'data.tsv', 'CSV', tmp_path))
+    assert result['error'] is None
+    assert list(pd.read_csv(result['output_path']).columns) == ['a', 'b']
+
+
+def test_summary_uses_wall_clock_time():
+    results = [{'rows': 100, 'bytes_in': 1024 * 1024, 'bytes_out': 10, 'seconds': 2.0, 'error': None}
+               for _ in range(4)]
+
+    summary = BatchScheduler.summarize(results, 2.0)
+    assert summary['seconds'] == 2.0
+    assert summary['rows_per_s'] == 200
+    assert summary['mb_per_s'] == 2
@@ -0,0 +1,94 @@
+import json
+
+import pandas as pd
+import pytest
+
+from benchmarks.datasets import SyntheticData
+from benchmarks.suite import ConversionBenchmark, main
+from utils.conversion_utils import ConversionUtils
+
+
+def test_frames_are_seeded_and_sized_exactly():
+    for shape in ('narrow', 'wide', 'strings', 'numeric'):
+        df = SyntheticData.frame(shape, 50, seed=3)
+        assert len(df) == 50
+        pd.testing.assert_frame_equal(df, SyntheticData.frame(shape, 50, seed=3))
+    assert not SyntheticData.frame('narrow', 50, seed=4).equals(SyntheticData.frame('narrow', 50, seed=3))
+    assert SyntheticData.frame('wide', 5).shape[1] == SyntheticData.WIDE_COLUMNS + 1
+    with pytest.raises(ValueError, match="'nested' is not a flat shape"):
+        SyntheticData.frame('nested', 5)
+
+
+def test_rows_scale_per_shape_but_never_reach_zero():
+    assert SyntheticData.rows_for('narrow', 1000) == 1000
+    assert SyntheticData.rows_for('wide', 1000) == 50
+    assert SyntheticData.rows_for('wide', 10) == 1
+
+
+@pytest.mark.parametrize('shape', ['narrow', 'nested', 'multisheet'])
+def test_write_produces_every_declared_format(tmp_path, shape):
+    paths = SyntheticData.write(shape, 40, tmp_path)
+    assert list(paths) == SyntheticData.SHAPES[shape]['formats']
+    assert all(path.exists() and path.stat().st_size for path in paths.values())
+
+    rows = SyntheticData.rows_for(shape, 40)
+    if shape == 'nested':
+        records = json.loads(paths['json'].read_text())
+        assert records == SyntheticData.records(rows)
+        assert len(paths['jsonl'].read_text().splitlines()) == rows
+    elif shape == 'multisheet':
+        sheets = pd.read_excel(paths['excel'], sheet_name=None)
+        assert len(sheets) == SyntheticData.SHEETS
+        assert sum(len(df) for df in sheets.values()) == rows
+    else:
+        assert len(pd.read_csv(paths['csv'])) == len(pd.read_parquet(paths['parquet'])) == rows
+
+
+def test_cases_follow_shape_and_kind_filters():
+    cases = ConversionBenchmark.cases(['nested'], ['stream'])
+    assert {c['target'] for c in cases} == {'JSONReader.iter_chunks'}
+    assert len(cases) == 4
+    assert ConversionBenchmark.cases(['nested'], ['convert', 'handler']) == []
+
+    names = [c['case'] for c in ConversionBenchmark.cases(['narrow'], ['convert'])]
+    assert 'convert/narrow/convert_format[csv]->parquet' in names
+    assert len(names) == len(set(names)) == 6 * 5
+
+
+def test_run_times_the_matching_cases(tmp_path):
+    results = ConversionBenchmark.run(rows=30, shapes=['narrow'], kinds=['stream'],
+                                      match='convert_csv_file', work_dir=tmp_path)
+    assert results['meta']['rows'] == 30
+    assert len(results['results']) == len(ConversionUtils.CHUNK_SINKS)
+    for result in results['results']:
+        assert result['error'] is None, result['case']
+        assert result['rows'] == 30 and result['seconds'] > 0 and result['bytes_out'] > 0
+    assert not list(tmp_path.glob('out_*'))
+
+
+def _result(case, seconds, peak=0, error=None):
+    return {'case': case, 'seconds': seconds, 'peak_rss_delta_bytes': peak, 'error': error}
+
+
+def test_compare_flags_slowdowns_above_threshold_and_noise():
+    baseline = {'results': [_result('slow', 1.0), _result('fast', 1.0), _result('same', 1.0),
+                            _result('noise', 0.01), _result('memory', 1.0, peak=10 * 1024 * 1024)]}
+    current = {'results': [_result('slow', 1.5), _result('fast', 0.5), _result('same', 1.05),
+                           _result('noise', 0.025), _result('memory', 1.0, peak=40 * 1024 * 1024),
+                           _result('added', 1.0), _result('broken', None, error='RuntimeError: boom')]}
+
+    status = {row['case']: row for row in ConversionBenchmark.compare(current, baseline)}
+    assert status['slow']['status'] == 'regression' and status['slow']['reasons'] == ['time +50%']
+    assert status['fast']['status'] == 'improved'
+    assert status['same']['status'] == 'ok'
+    assert status['noise']['status'] == 'ok'
+    assert status['memory']['reasons'] == ['peak RSS +30 MB']
+    assert status['added']['status'] == 'new'
+    assert status['broken']['status'] == 'error'
+    assert ConversionBenchmark.compare(current, baseline, threshold=0.6)[0]['status'] == 'ok'
+
+
+def test_list_prints_case_ids_without_running(capsys):
+    main(['--list', '--shapes', 'nested', '--kinds', 'stream'])
+    lines = capsys.readouterr().out.split()
+    assert 'stream/nested/JSONReader.iter_chunks[jsonl]->parquet' in lines
@@ -0,0 +1,50 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from utils.conversion_utils import ConversionUtils, FeatherChunkSink, ParquetChunkSink
+
+
+def chunks():
+    yield pd.DataFrame({'id': [1, 2, 3], 'price': [10, 20, 30]})
+    yield pd.DataFrame({'id': [4, 5], 'price': [1.5, None]})
+    yield pd.DataFrame({'id': [6], 'price': [7]})
+
+
+@pytest.mark.parametrize('sink_class,profile', [
+    (ParquetChunkSink, None), (ParquetChunkSink, {'row_group_rows': 2}), (FeatherChunkSink, None),
+])
+def test_int_column_is_widened_when_floats_arrive_later(tmp_path, sink_class, profile):
+    output = tmp_path / 'out.arrow'
+    sink = sink_class(output, profile=profile) if profile else sink_class(output)
+    for chunk in chunks():
+        sink.write(chunk)
+    sink.close()
+
+    df = pd.read_parquet(output) if sink_class is ParquetChunkSink else pd.read_feather(output)
+    assert df['id'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert df['price'].dtype == 'float64'
+    assert df['price'].fillna(-1).tolist() == [10, 20, 30, 1.5, -1, 7]
+    assert not (tmp_path / 'out.arrow.widen').exists()
+
+
+def test_other_type_changes_name_the_column(tmp_path):
+    sink = ParquetChunkSink(tmp_path / 'out.parquet')
+    sink.write(pd.DataFrame({'code': [1, 2]}))
+    with pytest.raises(ValueError, match="Column 'code' changed type from int64 to"):
+        sink.write(pd.DataFrame({'code': ['A1', 'B2']}))
+    sink.close()
+
+
+def test_pandas_engine_csv_widens_without_restarting(tmp_path):
+    source = tmp_path / 'prices.csv'
+    source.write_text('price\n' + '"1,000"\n' * 5 + '2.5\n')
+
+    # thousands= rules out the pyarrow engine
+    stats, error = ConversionUtils.convert_csv_file(
+        source, tmp_path / 'out.parquet', 'parquet', read_options={'thousands': ','}, chunksize=2,
+    )
+    assert error is None and stats['engine'] == 'pandas' and stats['chunks'] == 3
+    assert pd.read_parquet(tmp_path / 'out.parquet')['price'].tolist() == [1000] * 5 + [2.5]
+    assert pa.types.is_floating(pq.read_schema(tmp_path / 'out.parquet').field('price').type)
@@ -0,0 +1,25 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pytest
+
+from utils.columnar_reader import ColumnarReader
+
+
+@pytest.mark.parametrize('compression', ['lz4', 'zstd', 'uncompressed'])
+def test_feather_metadata_counts_rows_without_reading_batches(tmp_path, monkeypatch, compression):
+    path = tmp_path / 'data.feather'
+    feather.write_feather(pa.table({'a': range(10_000), 'b': ['x'] * 10_000}), path,
+                          compression=compression, chunksize=3_000)
+
+    def no_batches(*args):
+        raise AssertionError('metadata decompressed a record batch')
+
+    monkeypatch.setattr(pa.ipc.RecordBatchFileReader, 'get_batch', no_batches)
+    assert ColumnarReader.metadata(path, 'feather') == {'rows': 10_000, 'row_groups': 4, 'columns': 2}
+
+
+def test_parquet_metadata_comes_from_the_footer(tmp_path):
+    path = tmp_path / 'data.parquet'
+    pd.DataFrame({'a': range(10), 'b': range(10)}).to_parquet(path, row_group_size=4)
+    assert ColumnarReader.metadata(path, 'parquet') == {'rows': 10, 'row_groups': 3, 'columns': 2}
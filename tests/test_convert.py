@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from utils.convert import HeadlessConverter
+
+
+@pytest.mark.parametrize('output_fmt', ['csv', 'jsonl', 'parquet'])
+def test_columns_are_projected_for_every_output(tmp_path, output_fmt):
+    source = tmp_path / 'p.parquet'
+    pd.DataFrame({'a': [1, 2], 'b': [3, 4], 'c': [5, 6]}).to_parquet(source)
+    output = tmp_path / f"out.{output_fmt}"
+
+    result = HeadlessConverter.convert(source, output, read_options={'columns': ['a', 'c']})
+    assert result['error'] is None
+    reader = {'csv': pd.read_csv, 'parquet': pd.read_parquet,
+              'jsonl': lambda p: pd.read_json(p, lines=True)}[output_fmt]
+    assert list(reader(output).columns) == ['a', 'c']
+
+
+def test_tsv_defaults_to_tab(tmp_path):
+    source = tmp_path / 'data.tsv'
+    source.write_text('a\tb\tc\n1\t2\t3\n')
+
+    result = HeadlessConverter.convert(source, tmp_path / 'out.csv')
+    assert result['error'] is None and result['columns'] == 3
+    assert (tmp_path / 'out.csv').read_text().splitlines() == ['a,b,c', '1,2,3']
+
+    result = HeadlessConverter.convert(source, tmp_path / 'out.csv', read_options={'sep': ','})
+    assert result['columns'] == 1
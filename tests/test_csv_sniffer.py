@@ -0,0 +1,37 @@
+import pytest
+
+from utils.csv_sniffer import CSVSniffer
+
+
+@pytest.mark.parametrize('values', [
+    ['Jan', 'Feb'],
+    ['1.2.3', '1.2.4'],
+    ['12:30', '13:45'],
+    ['3/4', '1/2'],
+    ['2024', '2025'],
+    ['12:30:45', '10:00:00'],
+    ['2024-01-05', 'unknown'],
+])
+def test_non_dates_are_not_proposed(values):
+    assert CSVSniffer.date_format(values) is None
+
+
+@pytest.mark.parametrize('values, fmt', [
+    (['2024-01-05', '2024-02-01'], '%Y-%m-%d'),
+    (['5 Jan 2024', '16 Feb 2024'], '%d %b %Y'),
+    (['2024-01-05 10:00:00', '2024-01-06 11:30:00'], '%Y-%m-%d %H:%M:%S'),
+])
+def test_one_strict_format_is_required(values, fmt):
+    assert CSVSniffer.date_format(values) == fmt
+
+
+def test_sniff_only_marks_real_date_columns(tmp_path):
+    source = tmp_path / 'mixed.csv'
+    source.write_text(
+        'month,version,time,ratio,year,day\n'
+        'Jan,1.2.3,12:30,3/4,2024,2024-01-05\n'
+        'Feb,1.2.4,13:45,1/2,2025,2024-02-01\n'
+    )
+
+    sniffed = CSVSniffer.sniff(source)
+    assert sniffed['parse_dates'] == ['day']
@@ -0,0 +1,62 @@
+import chardet
+import pytest
+
+from utils.encoding_detector import EncodingDetector
+
+
+class ConfidentAfterTwoFeeds:
+    """Stands in for chardet's UniversalDetector, which version 5 stops early and 7 at a byte cap"""
+
+    def __init__(self):
+        self.feeds = 0
+
+    @property
+    def done(self):
+        return self.feeds >= 2
+
+    def feed(self, block):
+        self.feeds += 1
+
+    def close(self):
+        return {'encoding': 'utf-8', 'confidence': 0.99}
+
+
+def test_detection_stops_once_confident(tmp_path, monkeypatch):
+    monkeypatch.setattr(chardet, 'UniversalDetector', ConfidentAfterTwoFeeds)
+    source = tmp_path / 'big.csv'
+    source.write_bytes(b'id,name\n' + b'1,text\n' * 100_000)
+
+    report = EncodingDetector.detect_encoding_report(source)
+    assert report['bytes_scanned'] == 2 * EncodingDetector.FEED_SIZE
+
+
+def test_tail_sample_catches_late_non_ascii(tmp_path):
+    source = tmp_path / 'latin1.csv'
+    source.write_bytes(b'id,name\n' + b'1,plain ascii text\n' * 100_000
+                       + 'Café crème, naïve résumé\n'.encode('latin-1') * 20)
+
+    report = EncodingDetector.detect_encoding_report(source)
+    assert report['encoding'] != 'utf-8'
+    assert report['bytes_scanned'] <= 3 * EncodingDetector.SAMPLE_SIZE < report['file_size']
+
+
+def test_ascii_is_reported_as_utf8(tmp_path):
+    source = tmp_path / 'ascii.csv'
+    source.write_bytes(b'a,b\n1,2\n')
+    assert EncodingDetector.detect_encoding(source) == 'utf-8'
+
+
+@pytest.mark.parametrize('block_size', [1, 2, 3, 4, 1024])
+@pytest.mark.parametrize('data, offset', [
+    ('aé'.encode() * 10 + b'\xff' + b'zz', 30),
+    (b'a\xc3zzzz', 1),
+    ('aé'.encode() * 3 + 'é'.encode()[:1], 9),
+    ('aé'.encode() * 5, None),
+])
+def test_validation_reports_the_byte_offset_across_blocks(tmp_path, block_size, data, offset):
+    source = tmp_path / 'data.csv'
+    source.write_bytes(data)
+
+    report = EncodingDetector.validate_encoding_report(source, 'utf-8', block_size=block_size)
+    assert report['valid'] is (offset is None)
+    assert report['error_offset'] == offset
@@ -0,0 +1,64 @@
+import pandas as pd
+
+from utils.excel_reader import ExcelReader
+
+
+def test_dimensions_survive_a_parse(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']}).to_excel(writer, sheet_name='One', index=False)
+        pd.DataFrame({'a': range(5)}).to_excel(writer, sheet_name='Two', index=False)
+
+    reader = ExcelReader(str(path), 'book-hash')
+    try:
+        assert reader.dimensions('One') == (3, 2)
+        reader.preview('One', nrows=1)
+        reader.read_sheet('Two')
+        assert reader.dimensions('One') == (3, 2)
+        assert reader.dimensions('Two') == (6, 1)
+    finally:
+        reader.close()
+
+
+def _book(path, sheets):
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def test_merge_keeps_late_values_that_do_not_fit_the_first_rows(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    df = pd.DataFrame({'price': [1.5] * 150, 'day': pd.to_datetime(['2024-01-05'] * 150)})
+    df = df.astype(object)
+    df.loc[120, 'price'] = 'see note'
+    df.loc[130, 'day'] = 'unknown'
+    _book(path, {'Only': df})
+
+    reader = ExcelReader(str(path), 'late-hash')
+    try:
+        stats = reader.merge_to(['Only'], tmp_path / 'out.csv', 'csv')
+    finally:
+        reader.close()
+    assert stats['schema'] == {'price': 'string', 'day': 'string'}
+    out = pd.read_csv(tmp_path / 'out.csv', keep_default_na=False)
+    assert out.loc[120, 'price'] == 'see note' and out.loc[130, 'day'] == 'unknown'
+    assert (out['price'] != '').all() and (out['day'] != '').all()
+
+
+def test_merge_reconciles_kinds_across_whole_sheets(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    _book(path, {
+        'Ints': pd.DataFrame({'id': [1, 2], 'amount': [10, 20]}),
+        'Floats': pd.DataFrame({'id': [3, 4], 'amount': [1.5, None], 'note': ['a', 'b']}),
+        'Text': pd.DataFrame({'id': [5] * 200, 'code': [7] * 199 + ['X']}),
+    })
+
+    reader = ExcelReader(str(path), 'kinds-hash')
+    try:
+        stats = reader.merge_to(['Ints', 'Floats', 'Text'], tmp_path / 'out.parquet', 'parquet')
+    finally:
+        reader.close()
+    assert stats['rows'] == 204
+    assert stats['schema'] == {'id': 'int', 'amount': 'float', 'note': 'string', 'code': 'string'}
+    out = pd.read_parquet(tmp_path / 'out.parquet')
+    assert out['code'].iloc[-1] == 'X' and out['amount'].iloc[:3].tolist() == [10.0, 20.0, 1.5]
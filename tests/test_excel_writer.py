@@ -0,0 +1,43 @@
+import pandas as pd
+
+from utils.format_handlers import ExcelStreamWriter
+
+
+def test_chunks_roll_over_to_new_sheets_at_the_row_limit(tmp_path):
+    output = tmp_path / 'out.xlsx'
+    writer = ExcelStreamWriter(output, sheet_name='Data', max_rows=4)
+    writer.write(pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']}))
+    writer.write(pd.DataFrame({'a': [3, 4, 5, 6, 7], 'b': list('vwxyz')}))
+    writer.close()
+
+    sheets = pd.read_excel(output, sheet_name=None)
+    assert list(sheets) == ['Data', 'Data_2', 'Data_3']
+    # Each sheet repeats the header, so holds max_rows - 1 data rows
+    assert [len(df) for df in sheets.values()] == [3, 3, 1]
+    assert pd.concat(sheets.values())['a'].tolist() == [1, 2, 3, 4, 5, 6, 7]
+    assert writer.rows == 7 and writer.sheets == 3
+
+
+def test_cells_excel_cannot_hold_are_converted(tmp_path):
+    output = tmp_path / 'out.xlsx'
+    writer = ExcelStreamWriter(output)
+    writer.write(pd.DataFrame({
+        'when': pd.to_datetime(['2024-01-05 10:00']).tz_localize('Europe/Paris'),
+        'tags': [['a', 'b']],
+        'meta': [{'k': 1}],
+        'missing': [float('nan')],
+    }))
+    writer.close()
+
+    df = pd.read_excel(output)
+    assert df['when'].iloc[0] == pd.Timestamp('2024-01-05 10:00')
+    assert df['tags'].iloc[0] == '["a", "b"]'
+    assert df['meta'].iloc[0] == '{"k": 1}'
+    assert pd.isna(df['missing'].iloc[0])
+
+
+def test_no_chunks_still_writes_a_workbook(tmp_path):
+    output = tmp_path / 'out.xlsx'
+    writer = ExcelStreamWriter(output, sheet_name='Empty')
+    writer.close()
+    assert list(pd.read_excel(output, sheet_name=None)) == ['Empty']
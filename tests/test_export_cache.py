@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from utils.export_cache import ExportCache
+
+
+def test_concurrent_prepare_writes_once_and_never_exposes_partial_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(ExportCache, 'path_for', staticmethod(lambda key: tmp_path / f"{key[0]}.csv"))
+    cache = ExportCache()
+    calls = []
+    seen = []
+
+    def writer(path):
+        calls.append(path)
+        assert path != tmp_path / 'data.csv'
+        with open(path, 'w') as f:
+            f.write('a,b\n')
+            seen.append((tmp_path / 'data.csv').exists())
+            time.sleep(0.05)
+            f.write('1,2\n')
+        return {'rows': 1}
+
+    entries = []
+    threads = [threading.Thread(target=lambda: entries.append(cache.prepare('data', 'csv', writer)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert seen == [False]
+    assert {entry['path'] for entry in entries} == {tmp_path / 'data.csv'}
+    assert (tmp_path / 'data.csv').read_text() == 'a,b\n1,2\n'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['data.csv']
+    assert cache._key_locks == {}
+
+
+def test_failed_prepare_leaves_nothing_behind(tmp_path, monkeypatch):
+    monkeypatch.setattr(ExportCache, 'path_for', staticmethod(lambda key: tmp_path / f"{key[0]}.csv"))
+    cache = ExportCache()
+
+    def writer(path):
+        path.write_text('half')
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError, match='boom'):
+        cache.prepare('data', 'csv', writer)
+    assert list(tmp_path.iterdir()) == []
+    assert cache.get('data', 'csv') is None
+    assert cache._key_locks == {}
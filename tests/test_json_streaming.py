@@ -0,0 +1,80 @@
+import json
+
+import pandas as pd
+import pytest
+
+from utils.conversion_utils import ConversionUtils
+from utils.json_reader import JSONReader
+
+
+@pytest.fixture
+def sparse_jsonl(tmp_path):
+    """JSON Lines where some keys only appear after the first chunk"""
+    path = tmp_path / 'events.jsonl'
+    with open(path, 'w') as f:
+        for i in range(250):
+            record = {'id': i, 'user': {'name': f"u{i}"}}
+            if i >= 200:
+                record['late'] = i
+                record['user']['geo'] = {'city': 'x'}
+            f.write(json.dumps(record) + '\n')
+    return path
+
+
+def test_scan_columns_matches_json_normalize(sparse_jsonl):
+    records = [json.loads(line) for line in open(sparse_jsonl)]
+    assert JSONReader.scan_columns(sparse_jsonl) == list(pd.json_normalize(records).columns)
+
+
+@pytest.mark.parametrize('output_fmt', ['csv', 'parquet', 'excel'])
+def test_fixed_schema_outputs_keep_late_keys_with_a_scan(sparse_jsonl, tmp_path, output_fmt):
+    output = tmp_path / f"out.{output_fmt}"
+    stats, error = ConversionUtils.stream_convert_chunks(
+        JSONReader.iter_chunks(sparse_jsonl, chunksize=100), output, output_fmt,
+        columns=JSONReader.scan_columns(sparse_jsonl),
+    )
+    assert error is None and stats['dropped_columns'] == []
+    reader = {'csv': pd.read_csv, 'parquet': pd.read_parquet, 'excel': pd.read_excel}[output_fmt]
+    df = reader(output)
+    assert list(df.columns) == ['id', 'user.name', 'late', 'user.geo.city']
+    assert df['late'].notna().sum() == 50
+
+
+@pytest.mark.parametrize('output_fmt,sink_options', [
+    ('jsonl', None), ('json', {'orient': 'records'}), ('json', {'orient': 'records', 'backend': 'orjson'}),
+])
+def test_row_keyed_outputs_take_new_columns(sparse_jsonl, tmp_path, output_fmt, sink_options):
+    if (sink_options or {}).get('backend') == 'orjson':
+        pytest.importorskip('orjson')
+    output = tmp_path / f"out.{output_fmt}"
+    stats, error = ConversionUtils.stream_convert_chunks(
+        JSONReader.iter_chunks(sparse_jsonl, chunksize=100), output, output_fmt, sink_options=sink_options,
+    )
+    assert error is None and stats['dropped_columns'] == [] and stats['columns'] == 4
+    df = pd.read_json(output, lines=output_fmt == 'jsonl')
+    assert df['late'].notna().sum() == 50
+
+
+def test_fixed_schema_without_scan_still_reports_dropped_keys(sparse_jsonl, tmp_path):
+    stats, error = ConversionUtils.stream_convert_chunks(
+        JSONReader.iter_chunks(sparse_jsonl, chunksize=100), tmp_path / 'out.csv', 'csv',
+    )
+    assert error is None and stats['dropped_columns'] == ['late', 'user.geo.city']
+
+
+@pytest.mark.parametrize('output_fmt', ['parquet', 'feather'])
+def test_int_field_that_turns_float_later_is_widened(tmp_path, output_fmt):
+    source = tmp_path / 'prices.jsonl'
+    with open(source, 'w') as f:
+        for i in range(250):
+            f.write(json.dumps({'id': i, 'price': i + 0.5 if i >= 200 else i}) + '\n')
+
+    output = tmp_path / f"out.{output_fmt}"
+    stats, error = ConversionUtils.stream_convert_chunks(
+        JSONReader.iter_chunks(source, chunksize=100), output, output_fmt,
+    )
+    assert error is None and stats['rows'] == 250
+    df = pd.read_parquet(output) if output_fmt == 'parquet' else pd.read_feather(output)
+    assert df['price'].dtype == 'float64'
+    assert df['price'].iloc[[0, 199, 249]].tolist() == [0.0, 199.0, 249.5]
+    assert df['id'].dtype == 'int64'
@@ -0,0 +1,65 @@
+import json
+
+import pandas as pd
+import pytest
+
+from utils.conversion_utils import ConversionUtils, JSONChunkSink
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'name': ['a', None, 'c', 'd', 'e'],
+        'score': [1.5, 2.0, None, 4.25, 5.0],
+        'when': pd.to_datetime(['2024-01-05', '2024-01-06', None, '2024-01-08', '2024-01-09']),
+    })
+
+
+@pytest.mark.parametrize('orient', JSONChunkSink.ORIENTS)
+def test_chunked_orients_match_pandas(tmp_path, frame, orient):
+    output = tmp_path / 'out.json'
+    stats, error = ConversionUtils.write_json(frame, output, orient=orient, chunksize=2)
+    assert error is None and stats['chunks'] == 3
+
+    options = {'index': False} if orient == 'table' else {}
+    expected = json.loads(frame.to_json(orient=orient, date_format='iso', **options))
+    assert json.loads(output.read_text()) == expected
+
+
+@pytest.mark.parametrize('orient, empty', [('records', []), ('values', []), ('split', {}), ('columns', {})])
+def test_no_chunks_still_write_valid_json(tmp_path, orient, empty):
+    output = tmp_path / 'out.json'
+    JSONChunkSink(output, orient=orient).close()
+    assert json.loads(output.read_text()) == empty
+
+
+def test_unknown_orient_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported JSON orient 'rows'"):
+        JSONChunkSink(tmp_path / 'out.json', orient='rows')
+
+
+def test_missing_orjson_falls_back_to_pandas(tmp_path, frame, monkeypatch):
+    monkeypatch.setattr(ConversionUtils, 'json_backends', staticmethod(lambda: ['pandas']))
+    output = tmp_path / 'out.jsonl'
+    stats, error = ConversionUtils.write_json(frame, output, lines=True, backend='orjson')
+    assert error is None and stats['rows'] == 5
+    assert pd.read_json(output, lines=True)['id'].tolist() == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize('orient, lines', [('records', False), ('values', False), ('records', True)])
+def test_orjson_backend_matches_pandas(tmp_path, frame, orient, lines):
+    pytest.importorskip('orjson')
+    outputs = {}
+    for backend in ('pandas', 'orjson'):
+        outputs[backend] = tmp_path / f"{backend}.json"
+        _, error = ConversionUtils.write_json(frame, outputs[backend], orient=orient, lines=lines,
+                                              backend=backend, chunksize=2)
+        assert error is None
+
+    def load(path):
+        # Both write ISO 8601 dates, orjson without the milliseconds
+        df = pd.read_json(path, orient=orient, lines=lines, convert_dates=False)
+        return df.set_axis(frame.columns, axis=1).assign(when=lambda d: pd.to_datetime(d['when']))
+
+    pd.testing.assert_frame_equal(load(outputs['orjson']), load(outputs['pandas']), check_dtype=False)
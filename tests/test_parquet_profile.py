@@ -0,0 +1,48 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from utils.conversion_utils import ConversionUtils
+from utils.format_handlers import ArrowCSVHandler, ParquetHandler, ParquetProfile
+
+
+def test_presets_take_overrides_but_ignore_none():
+    profile = ParquetProfile.resolve('small file', compression_level=3, row_group_rows=None)
+    assert profile['compression'] == 'zstd' and profile['compression_level'] == 3
+    assert profile['row_group_rows'] == 1_000_000
+    with pytest.raises(ValueError, match="Unknown Parquet profile 'tiny'"):
+        ParquetProfile.resolve('tiny')
+
+
+def test_compression_level_only_goes_to_codecs_that_have_one():
+    assert 'compression_level' not in ParquetProfile.writer_options({'compression': 'snappy', 'compression_level': 5})
+    assert ParquetProfile.writer_options({'compression': None})['compression'] == 'none'
+    assert ParquetProfile.writer_options({'compression': 'zstd', 'compression_level': 5})['compression_level'] == 5
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({'id': range(10_000), 'group': ['a', 'b'] * 5_000})
+
+
+def test_row_groups_follow_the_profile_on_every_writer(tmp_path, frame):
+    profile = ParquetProfile.resolve('fast scan', row_group_rows=3_000, compression='zstd')
+
+    ParquetHandler.write(frame, tmp_path / 'frame.parquet', profile=profile, index=False)
+    frame.to_csv(tmp_path / 'in.csv', index=False)
+    ArrowCSVHandler.convert(tmp_path / 'in.csv', tmp_path / 'arrow.parquet', 'parquet', profile=profile)
+    ConversionUtils.convert_csv_file(tmp_path / 'in.csv', tmp_path / 'chunks.parquet', 'parquet',
+                                     read_options={'thousands': ','}, chunksize=1_000, profile=profile)
+
+    for name in ('frame', 'arrow', 'chunks'):
+        layout = ParquetProfile.describe(tmp_path / f"{name}.parquet")
+        assert layout['rows'] == 10_000
+        assert layout['row_groups'] == 4, name
+        assert layout['codecs'] == ['ZSTD'], name
+    assert pq.ParquetFile(tmp_path / 'chunks.parquet').metadata.row_group(3).num_rows == 1_000
+
+
+def test_statistics_can_be_turned_off(tmp_path, frame):
+    ParquetHandler.write(frame, tmp_path / 'out.parquet', profile=ParquetProfile.resolve('fast write'), index=False)
+    column = pq.ParquetFile(tmp_path / 'out.parquet').metadata.row_group(0).column(0)
+    assert not column.is_stats_set
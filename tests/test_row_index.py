@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.row_index import RowOffsetIndex
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'rows.csv'
+    lines = ['id,text,value']
+    for i in range(500):
+        text = f'"line {i}\nwith ""quotes"""' if i % 7 == 0 else f"plain {i}"
+        lines.append(f"{i},{text},{i * 1.5}")
+    path.write_bytes(('\n'.join(lines) + '\n').encode())
+    return path
+
+
+@pytest.fixture
+def index(csv_file):
+    data = csv_file.read_bytes()
+    return RowOffsetIndex(csv_file, RowOffsetIndex.build_offsets(data), len(data))
+
+
+@pytest.mark.parametrize('block_size', [7, 64, 16 * 1024 * 1024])
+def test_quoted_newlines_do_not_start_records_at_any_block_size(csv_file, monkeypatch, block_size):
+    monkeypatch.setattr(RowOffsetIndex, 'BLOCK_SIZE', block_size)
+    data = csv_file.read_bytes()
+    offsets = RowOffsetIndex.build_offsets(data)
+    assert len(offsets) == 501
+    assert offsets.dtype == np.uint32
+    assert all(data[o - 1:o] == b'\n' for o in offsets[1:])
+
+
+def test_last_record_without_newline_is_counted():
+    assert RowOffsetIndex.build_offsets(b'a\n1\n2').tolist() == [0, 2, 4]
+    assert RowOffsetIndex.build_offsets(b'a\n1\n2\n').tolist() == [0, 2, 4]
+    assert len(RowOffsetIndex.build_offsets(b'')) == 0
+
+
+def test_pages_tail_and_sample_match_a_full_parse(csv_file, index):
+    full = pd.read_csv(csv_file)
+    assert index.data_rows() == len(full) == 500
+
+    page = index.read_rows(140, 160)
+    pd.testing.assert_frame_equal(page.reset_index(drop=True), full.iloc[140:160].reset_index(drop=True))
+    assert page.index.tolist() == list(range(140, 160))
+
+    pd.testing.assert_frame_equal(index.tail(3).reset_index(drop=True), full.tail(3).reset_index(drop=True))
+
+    sample = index.sample(25, seed=1)
+    assert sample.index.is_monotonic_increasing and len(sample) == 25
+    pd.testing.assert_frame_equal(sample.reset_index(drop=True), full.iloc[sample.index].reset_index(drop=True))
+    assert index.sample(25, seed=1).index.tolist() == sample.index.tolist()
+
+
+def test_skiprows_and_out_of_range_pages(csv_file, index):
+    read_options = {'skiprows': 1, 'header': None}
+    assert index.data_rows(read_options) == 500
+    assert index.read_rows(0, 1, read_options).iloc[0].tolist()[0] == 0
+    assert index.read_rows(600, 700).empty
+    assert list(index.read_rows(600, 700).columns) == ['id', 'text', 'value']
+
+
+def test_non_ascii_compatible_encodings_are_refused():
+    with pytest.raises(ValueError, match="ASCII-compatible encoding, not 'utf-16'"):
+        RowOffsetIndex.for_upload(None, encoding='utf-16')
@@ -0,0 +1,150 @@
+import sqlite3
+from io import StringIO
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from utils.sql_exporter import SQLExporter
+
+
+class FakeCopy:
+    """psycopg 3's cursor.copy() context manager"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, data):
+        self.cursor.data += data
+
+
+class FakeCursor:
+    """Stand-in for a PostgreSQL cursor that records what COPY would load"""
+
+    def __init__(self, psycopg3=False):
+        self.sql = None
+        self.data = ''
+        if psycopg3:
+            self.copy = self._copy
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, file):
+        self.sql = sql
+        self.data = file.read()
+
+    def _copy(self, sql):
+        self.sql = sql
+        return FakeCopy(self)
+
+
+def _copy(cursor, rows, keys=('id', 'name'), schema=None):
+    conn = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+    table = SimpleNamespace(name='events', schema=schema)
+    SQLExporter.copy_from_stdin(table, conn, list(keys), iter(rows))
+    return cursor
+
+
+@pytest.mark.parametrize('psycopg3', [False, True])
+def test_copy_keeps_empty_strings_apart_from_null(psycopg3):
+    cursor = _copy(FakeCursor(psycopg3), [(1, ''), (2, None), (3, 'say "hi", bye')])
+    assert cursor.sql == 'COPY "events" ("id", "name") FROM STDIN WITH (FORMAT csv)'
+    assert cursor.data == '"1",""\n"2",\n"3","say ""hi"", bye"\n'
+
+
+def test_copy_quotes_schema_and_columns():
+    cursor = _copy(FakeCursor(), [], keys=('user id',), schema='raw')
+    assert cursor.sql == 'COPY "raw"."events" ("user id") FROM STDIN WITH (FORMAT csv)'
+    assert cursor.data == ''
+
+
+def test_copy_rows_round_trip_through_postgres_csv_rules():
+    # PostgreSQL reads an unquoted empty field as NULL and a quoted one as ''
+    line = SQLExporter.copy_csv_row([None, '', 'x', 1.5])
+    fields = line.rstrip('\n').split(',')
+    assert [None if f == '' else f.strip('"') for f in fields] == [None, '', 'x', '1.5']
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    url = SQLExporter.build_url('SQLite', str(tmp_path / 'target.db'))
+    yield url
+    SQLExporter.dispose_engines()
+
+
+def _count(url, table):
+    with sqlite3.connect(url.database) as db:
+        return db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+def test_failed_replace_keeps_existing_sqlite_table(sqlite_url):
+    stats, error = SQLExporter.export(pd.DataFrame({'a': range(50_000)}), sqlite_url, 't')
+    assert error is None and stats['rows'] == 50_000
+
+    def fail(rows, rate):
+        if rows > 1:
+            raise RuntimeError('load failed')
+
+    _, error = SQLExporter.export(pd.DataFrame({'a': [1, 2, 3]}), sqlite_url, 't', chunksize=1,
+                                  progress_callback=fail)
+    assert error == 'load failed'
+    assert _count(sqlite_url, 't') == 50_000
+
+
+def test_failed_stream_keeps_existing_sqlite_table(sqlite_url):
+    SQLExporter.export(pd.DataFrame({'a': range(1000)}), sqlite_url, 't')
+
+    def chunks():
+        yield pd.DataFrame({'a': range(10)})
+        raise ValueError('bad chunk')
+
+    _, error = SQLExporter.ingest_stream(chunks(), sqlite_url, 't')
+    assert error == 'bad chunk'
+    assert _count(sqlite_url, 't') == 1000
+
+    stats, error = SQLExporter.ingest_stream(iter([pd.DataFrame({'a': [1]})] * 3), sqlite_url, 't',
+                                             index_columns=['a'])
+    assert error is None and stats['rows'] == 3
+    assert _count(sqlite_url, 't') == 3
+
+
+def test_bulk_pragmas_are_restored(sqlite_url):
+    SQLExporter.export(pd.DataFrame({'a': [1]}), sqlite_url, 't')
+    with SQLExporter.bulk_connection(sqlite_url) as connection:
+        assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 0
+    with SQLExporter.get_engine(sqlite_url).connect() as connection:
+        assert connection.exec_driver_sql('PRAGMA synchronous').scalar() != 0
+
+
+def test_stats_report_the_method_that_ran(sqlite_url):
+    stats, error = SQLExporter.export(pd.DataFrame({'a': [1]}), sqlite_url, 't')
+    assert error is None and stats['method'] == 'executemany'
+    stats, error = SQLExporter.ingest_stream(iter([pd.DataFrame({'a': [1]})]), sqlite_url, 't', method='multi')
+    assert error is None and stats['method'] == 'multi'
+    assert SQLExporter.resolve_method('auto', 'postgresql') == 'copy'
+    assert SQLExporter.resolve_method('auto', 'mysql') == 'multi'
+
+
+def test_nested_jsonl_streams_into_flattened_columns(sqlite_url, tmp_path):
+    from utils.json_reader import JSONReader
+
+    source = tmp_path / 'events.jsonl'
+    source.write_text('{"id": 1, "user": {"name": "a", "geo": {"city": "x"}}}\n'
+                      '{"id": 2, "user": {"name": "b", "geo": {"city": "y"}}}\n')
+
+    stats, error = SQLExporter.ingest_stream(
+        JSONReader.iter_chunks(source, lines=True, chunksize=1, flatten=True), sqlite_url, 'events',
+    )
+    assert error is None and stats['rows'] == 2
+    with sqlite3.connect(sqlite_url.database) as db:
+        assert db.execute('SELECT "user.geo.city" FROM events ORDER BY id').fetchall() == [('x',), ('y',)]
@@ -0,0 +1,42 @@
+import sys
+
+import pytest
+
+from utils.startup import DEFAULT_BUDGET, HEAVY_MODULES, StartupProfiler
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    return StartupProfiler.baseline(repeat=3)
+
+
+@pytest.mark.parametrize('script', StartupProfiler.scripts())
+def test_cold_start_stays_within_budget_of_streamlit(script, baseline):
+    result = StartupProfiler.profile(script, repeat=3)
+    if result['error'] and 'SyntaxError' in result['error'] and sys.version_info < (3, 12):
+        pytest.skip(f"{script} needs Python 3.12: {result['error']}")
+
+    assert result['error'] is None
+    assert result['heavy'] == {}, f"{script} imports heavy libraries at startup"
+    assert StartupProfiler.over_budget([result], DEFAULT_BUDGET, baseline) == [], (
+        f"{script}: +{StartupProfiler.overhead(result, baseline):.3f}s over `import streamlit`"
+    )
+
+
+def test_over_budget_flags_failed_and_slow_scripts():
+    ok = {'script': 'ok.py', 'seconds': 1.1, 'error': None}
+    slow = {'script': 'slow.py', 'seconds': 1.5, 'error': None}
+    crashed = {'script': 'crashed.py', 'seconds': 0.01, 'error': 'AttributeError: boom'}
+    hung = {'script': 'hung.py', 'seconds': None, 'error': 'no output'}
+
+    assert StartupProfiler.over_budget([ok, slow, crashed, hung], 0.25, baseline=1.0) == [slow, crashed, hung]
+
+
+def test_heavy_module_regression_is_reported(tmp_path):
+    script = tmp_path / 'eager.py'
+    script.write_text('import streamlit as st\nimport pandas as pd\n')
+
+    result = StartupProfiler.profile(script)
+
+    assert result['heavy']['pandas'] == 'pandas'
+    assert set(result['heavy']) <= set(HEAVY_MODULES)
@@ -0,0 +1,41 @@
+import io
+import logging
+
+import pytest
+
+from utils.upload_spool import UploadSpool
+
+
+class Upload(io.BytesIO):
+    def __init__(self, data, name='data.csv'):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.file_id = name
+
+
+@pytest.fixture
+def lease(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    lease = UploadSpool.spool(Upload(b'a,b\n1,2\n'))
+    yield lease
+    lease.release()
+
+
+def test_closed_readers_let_the_mapping_close(lease, caplog):
+    for _ in range(3):
+        with lease.open() as reader:
+            assert reader.read() == b'a,b\n1,2\n'
+
+    with caplog.at_level(logging.WARNING, logger='utils.upload_spool'):
+        lease.upload.close()
+    assert caplog.records == []
+    assert lease.upload._mmap is None
+
+
+def test_open_reader_at_close_is_reported(lease, caplog):
+    reader = lease.open()
+    with caplog.at_level(logging.WARNING, logger='utils.upload_spool'):
+        lease.upload.close()
+    assert 'still mapped' in caplog.text
+    reader.close()
@@ -0,0 +1,201 @@
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+
+def _limit_memory(limit_bytes):
+    """Cap a worker's address space so one oversized file fails on its own"""
+    if not limit_bytes:
+        return
+    try:
+        import resource
+        import pandas  # noqa: F401  (count library mappings in the baseline, not the limit)
+
+        baseline = 0
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmSize:'):
+                    baseline = int(line.split()[1]) * 1024
+                    break
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        soft = baseline + limit_bytes
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    except (ImportError, OSError, ValueError):
+        # Not enforceable on this platform
+        pass
+
+
+def _read_input(input_path, read_options):
+    import pandas as pd
+
+    ext = Path(input_path).suffix.lower()
+    if ext in ('.xlsx', '.xls'):
+        return pd.read_excel(input_path, **read_options)
+    if ext in ('.json', '.jsonl'):
+        return pd.read_json(input_path, lines=ext == '.jsonl')
+    if ext == '.parquet':
+        return pd.read_parquet(input_path)
+    if ext == '.feather':
+        return pd.read_feather(input_path)
+    if ext == '.tsv' and 'sep' not in read_options:
+        read_options = {**read_options, 'sep': '\t'}
+    return pd.read_csv(input_path, **read_options)
+
+
+def _write_output(df, output_path, output_format):
+    if output_format == 'CSV':
+        df.to_csv(output_path, index=False)
+    elif output_format == 'Excel':
+        df.to_excel(output_path, index=False, engine='openpyxl')
+    elif output_format == 'JSON':
+        df.to_json(output_path, orient='records')
+    elif output_format == 'Parquet':
+        df.to_parquet(output_path, index=False)
+    else:
+        raise ValueError(f"Unsupported output format '{output_format}'")
+
+
+def _empty_result(job, error=None):
+    return {
+        'name': job['name'],
+        'output_format': job['output_format'],
+        'output_name': None,
+        'output_path': None,
+        'rows': 0,
+        'bytes_in': os.path.getsize(job['input_path']),
+        'bytes_out': 0,
+        'seconds': 0.0,
+        'error': error,
+    }
+
+
+def convert_file(job):
+    """Convert one file in a worker process and return its summary"""
+    start = time.perf_counter()
+    result = _empty_result(job)
+    try:
+        df = _read_input(job['input_path'], job.get('read_options') or {})
+        output_name = job.get('output_name') or BatchScheduler.output_name(job['name'], job['output_format'])
+        output_path = Path(job['output_dir']) / output_name
+        _write_output(df, output_path, job['output_format'])
+        result.update({
+            'output_name': output_name,
+            'output_path': str(output_path),
+            'rows': len(df),
+            'bytes_out': os.path.getsize(output_path),
+        })
+    except MemoryError:
+        result['error'] = 'MemoryError: file exceeds the per-file memory limit'
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class BatchScheduler:
+    """Fan batch conversions out to a process pool"""
+
+    OUTPUT_EXTENSIONS = {
+        'CSV': '.csv',
+        'Excel': '.xlsx',
+        'JSON': '.json',
+        'Parquet': '.parquet',
+    }
+
+    # Excel and Parquet are already compressed; deflating them again only costs CPU
+    ZIP_COMPRESSION = {
+        'CSV': zipfile.ZIP_DEFLATED,
+        'Excel': zipfile.ZIP_STORED,
+        'JSON': zipfile.ZIP_DEFLATED,
+        'Parquet': zipfile.ZIP_STORED,
+    }
+
+    def __init__(self, max_workers=None, memory_limit_mb=None):
+        self.max_workers = max_workers or BatchScheduler.default_workers()
+        self.memory_limit_mb = memory_limit_mb
+
+    @staticmethod
+    def default_workers():
+        return max(1, min(os.cpu_count() or 1, 4))
+
+    @staticmethod
+    def output_name(name, output_format, index=0):
+        suffix = f"_{index}" if index else ''
+        return Path(name).stem + suffix + BatchScheduler.OUTPUT_EXTENSIONS[output_format]
+
+    @staticmethod
+    def make_job(input_path, name, output_format, output_dir, read_options=None):
+        return {
+            'input_path': str(input_path),
+            'name': name,
+            'output_format': output_format,
+            'output_dir': str(output_dir),
+            'read_options': read_options or {},
+        }
+
+    def run(self, jobs):
+        """Yield each file's summary as soon as its worker finishes"""
+        limit_bytes = int(self.memory_limit_mb * 1024 * 1024) if self.memory_limit_mb else 0
+        # Spawned workers don't inherit the Streamlit server's threads and locks
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(
+            max_workers=min(self.max_workers, max(len(jobs), 1)),
+            mp_context=context,
+            initializer=_limit_memory,
+            initargs=(limit_bytes,),
+        ) as executor:
+            # Give inputs that share a stem distinct output names
+            taken = set()
+            for job in jobs:
+                index = 0
+                while BatchScheduler.output_name(job['name'], job['output_format'], index) in taken:
+                    index += 1
+                job['output_name'] = BatchScheduler.output_name(job['name'], job['output_format'], index)
+                taken.add(job['output_name'])
+
+            futures = {executor.submit(convert_file, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    yield future.result()
+                except BrokenProcessPool as e:
+                    yield _empty_result(job, f"Worker crashed: {e}")
+
+    def run_to_zip(self, jobs, zip_path):
+        """Like run(), but move each finished output into one ZIP archive on disk"""
+        with zipfile.ZipFile(zip_path, 'w', allowZip64=True) as archive:
+            for result in self.run(jobs):
+                if result['output_path']:
+                    archive.write(
+                        result['output_path'],
+                        arcname=result['output_name'],
+                        compress_type=BatchScheduler.ZIP_COMPRESSION[result['output_format']],
+                    )
+                    os.remove(result['output_path'])
+                    result['output_path'] = None
+                yield result
+
+    @staticmethod
+    def summarize(results, seconds):
+        """Totals across a finished batch; seconds is the batch's wall-clock time
+
+        Workers overlap, so per-file seconds don't add up to elapsed time.
+        """
+        rows = sum(r['rows'] for r in results)
+        bytes_in = sum(r['bytes_in'] for r in results)
+        return {
+            'files': len(results),
+            'failed': sum(1 for r in results if r['error']),
+            'rows': rows,
+            'bytes_in': bytes_in,
+            'bytes_out': sum(r['bytes_out'] for r in results),
+            'seconds': seconds,
+            'rows_per_s': rows / seconds if seconds else None,
+            'mb_per_s': bytes_in / 1024 / 1024 / seconds if seconds else None,
+        }
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+def _rss_bytes(field):
+    """VmRSS / VmHWM of this process in bytes, or None where /proc isn't available"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak-RSS mark (Linux only)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _measure(func, repeat):
+    """Best-of-repeat seconds and peak RSS growth of the first run"""
+    peak = None
+    best = None
+    for i in range(repeat):
+        if i == 0 and _reset_peak_rss():
+            before = _rss_bytes('VmRSS')
+        else:
+            before = None
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        if before is not None:
+            peak = max(_rss_bytes('VmHWM') - before, 0)
+        del result
+        best = seconds if best is None else min(best, seconds)
+    return best, peak
+
+
+def run_target(job):
+    """Write one codec and read it back; runs alone in a fresh worker process"""
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    table = feather.read_table(job['source'], memory_map=False)
+    path = job['output_path']
+    codec = job['codec']
+    if job['format'] == 'parquet':
+        def write():
+            pq.write_table(table, path, compression=codec)
+
+        def read():
+            return pq.read_table(path)
+    else:
+        def write():
+            feather.write_feather(table, path, compression=codec)
+
+        def read():
+            return feather.read_table(path, memory_map=False)
+
+    result = {'format': job['format'], 'codec': codec, 'error': None}
+    try:
+        result['write_seconds'], result['write_peak_bytes'] = _measure(write, job['repeat'])
+        result['bytes'] = os.path.getsize(path)
+        result['read_seconds'], result['read_peak_bytes'] = _measure(read, job['repeat'])
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    return result
+
+
+class CodecBenchmark:
+    """Measure write time, read-back time, size and peak memory per codec on real data
+
+    Every codec runs in its own spawned process so peak memory isn't skewed
+    by earlier runs; the data is handed over as an uncompressed Feather file.
+    """
+
+    TARGETS = [
+        ('parquet', 'snappy'),
+        ('parquet', 'gzip'),
+        ('parquet', 'brotli'),
+        ('parquet', 'zstd'),
+        ('parquet', 'none'),
+        ('feather', 'lz4'),
+        ('feather', 'zstd'),
+        ('feather', 'uncompressed'),
+    ]
+    DEFAULT_SAMPLE_ROWS = 1_000_000
+
+    @staticmethod
+    def load_csv_sample(input_path, read_options=None, max_rows=None):
+        """First max_rows rows of a CSV as an Arrow table"""
+        import pyarrow as pa
+        import pandas as pd
+        from utils.format_handlers import ArrowCSVHandler
+
+        max_rows = max_rows or CodecBenchmark.DEFAULT_SAMPLE_ROWS
+        options, _ = ArrowCSVHandler.arrow_options(read_options)
+        if options is None:
+            df = pd.read_csv(input_path, nrows=max_rows, **(read_options or {}))
+            return pa.Table.from_pandas(df, preserve_index=False)
+
+        reader = ArrowCSVHandler._open(input_path, options, options['column_types'])
+        batches, rows = [], 0
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= max_rows:
+                break
+        return pa.Table.from_batches(batches, schema=reader.schema).slice(0, max_rows)
+
+    @staticmethod
+    def run(table, targets=None, repeat=1, work_dir=None, progress_callback=None):
+        """Benchmark each (format, codec) target; returns one result dict per target"""
+        import pyarrow.feather as feather
+        from utils.file_manager import FileManager
+
+        targets = targets or CodecBenchmark.TARGETS
+        work_dir = Path(work_dir or FileManager.create_temp_directory() / "benchmarks")
+        work_dir.mkdir(parents=True, exist_ok=True)
+        source = work_dir / f"source_{os.getpid()}_{time.time_ns()}.feather"
+        feather.write_feather(table, source, compression='uncompressed')
+
+        jobs = [{
+            'source': str(source),
+            'output_path': str(work_dir / f"{source.stem}_{codec}.{fmt}"),
+            'format': fmt,
+            'codec': codec,
+            'repeat': repeat,
+        } for fmt, codec in targets]
+
+        results = []
+        try:
+            # One target at a time, each in a fresh process, so runs don't compete
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as executor:
+                for result in executor.map(run_target, jobs):
+                    result['memory_bytes'] = table.nbytes
+                    results.append(result)
+                    if progress_callback:
+                        progress_callback(len(results), len(jobs))
+        finally:
+            os.remove(source)
+        return results
+
+    @staticmethod
+    def summarize(results):
+        """Comparison table, smallest output first"""
+        import pandas as pd
+
+        rows = []
+        for r in results:
+            if r['error']:
+                rows.append({'Format': r['format'], 'Codec': r['codec'], 'Error': r['error']})
+                continue
+            rows.append({
+                'Format': r['format'],
+                'Codec': r['codec'],
+                'Size (MB)': r['bytes'] / 1024 / 1024,
+                'Ratio': r['memory_bytes'] / r['bytes'] if r['bytes'] else None,
+                'Write (s)': r['write_seconds'],
+                'Read (s)': r['read_seconds'],
+                'Write peak (MB)': r['write_peak_bytes'] / 1024 / 1024 if r['write_peak_bytes'] is not None else None,
+                'Read peak (MB)': r['read_peak_bytes'] / 1024 / 1024 if r['read_peak_bytes'] is not None else None,
+            })
+        df = pd.DataFrame(rows)
+        if 'Size (MB)' in df:
+            df = df.sort_values('Size (MB)', na_position='last').reset_index(drop=True)
+        return df
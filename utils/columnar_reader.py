@@ -0,0 +1,164 @@
+import time
+
+class ColumnarReader:
+    """Read Parquet/Feather inputs through pyarrow.dataset with column projection and filters
+
+    Only the selected columns are read, and row filters are pushed down so
+    Parquet row groups whose min/max statistics rule them out are skipped.
+    Schema and row counts come from the file footer.
+    """
+
+    FORMATS = {'.parquet': 'parquet', '.feather': 'feather', '.arrow': 'feather'}
+    OPERATORS = ['==', '!=', '<', '<=', '>', '>=', 'in', 'not in', 'is null', 'is not null']
+    PREVIEW_ROWS = 1000
+
+    @staticmethod
+    def input_format(name):
+        from pathlib import Path
+
+        return ColumnarReader.FORMATS.get(Path(name).suffix.lower())
+
+    @staticmethod
+    def dataset(path, input_fmt):
+        import pyarrow.dataset as ds
+
+        return ds.dataset(str(path), format='parquet' if input_fmt == 'parquet' else 'ipc')
+
+    @staticmethod
+    def schema(path, input_fmt):
+        """Column names and types from the footer, without reading data pages"""
+        return ColumnarReader.dataset(path, input_fmt).schema
+
+    @staticmethod
+    def metadata(path, input_fmt):
+        """Row count and layout from the footer and batch headers, without reading data"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if input_fmt == 'parquet':
+            metadata = pq.ParquetFile(path).metadata
+            return {'rows': metadata.num_rows, 'row_groups': metadata.num_row_groups,
+                    'columns': metadata.num_columns}
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            batches, columns = reader.num_record_batches, len(reader.schema)
+        # Counted from the record batch headers; get_batch() would decompress every batch
+        rows = ColumnarReader.dataset(path, input_fmt).count_rows()
+        return {'rows': rows, 'row_groups': batches, 'columns': columns}
+
+    @staticmethod
+    def _value(text, field_type):
+        """Typed scalar for a filter value typed in as text"""
+        import pyarrow as pa
+
+        if pa.types.is_timestamp(field_type) or pa.types.is_date(field_type):
+            import pandas as pd
+
+            value = pd.Timestamp(text)
+            if pa.types.is_timestamp(field_type) and field_type.tz and value.tz is None:
+                value = value.tz_localize(field_type.tz)
+            return pa.scalar(value.date() if pa.types.is_date(field_type) else value, type=field_type)
+        if pa.types.is_boolean(field_type):
+            return pa.scalar(str(text).strip().lower() in ('true', '1', 'yes'))
+        if pa.types.is_dictionary(field_type):
+            field_type = field_type.value_type
+        return pa.array([text]).cast(field_type)[0]
+
+    @staticmethod
+    def build_filter(schema, conditions):
+        """AND of (column, operator, value) conditions as a dataset expression, or None"""
+        import pyarrow.compute as pc
+
+        expression = None
+        for column, operator, value in conditions:
+            field = pc.field(column)
+            field_type = schema.field(column).type
+            if operator == 'is null':
+                condition = field.is_null()
+            elif operator == 'is not null':
+                condition = field.is_valid()
+            elif operator in ('in', 'not in'):
+                values = [ColumnarReader._value(v.strip(), field_type) for v in str(value).split(',') if v.strip()]
+                condition = field.isin(values)
+                if operator == 'not in':
+                    condition = ~condition
+            else:
+                scalar = ColumnarReader._value(value, field_type)
+                condition = {
+                    '==': field == scalar, '!=': field != scalar,
+                    '<': field < scalar, '<=': field <= scalar,
+                    '>': field > scalar, '>=': field >= scalar,
+                }[operator]
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    @staticmethod
+    def plan(path, input_fmt, filter_expression=None):
+        """How many row groups (Parquet) the filter leaves to read, judged from statistics"""
+        if input_fmt != 'parquet':
+            return None
+        dataset = ColumnarReader.dataset(path, input_fmt)
+        total = selected = 0
+        for fragment in dataset.get_fragments():
+            total += fragment.num_row_groups
+            if filter_expression is None:
+                selected += fragment.num_row_groups
+            else:
+                selected += len(fragment.split_by_row_group(filter=filter_expression))
+        return {'row_groups': total, 'row_groups_read': selected}
+
+    @staticmethod
+    def preview(path, input_fmt, columns=None, filter_expression=None, nrows=None):
+        """First nrows rows; without a filter only the first row group / batch is read"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        nrows = nrows or ColumnarReader.PREVIEW_ROWS
+        if filter_expression is not None:
+            dataset = ColumnarReader.dataset(path, input_fmt)
+            return dataset.head(nrows, columns=columns, filter=filter_expression).to_pandas()
+        if input_fmt == 'parquet':
+            parquet_file = pq.ParquetFile(path)
+            if parquet_file.metadata.num_row_groups == 0:
+                return parquet_file.schema_arrow.empty_table().select(columns or parquet_file.schema_arrow.names).to_pandas()
+            table = parquet_file.read_row_group(0, columns=columns)
+            return table.slice(0, nrows).to_pandas()
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            if reader.num_record_batches == 0:
+                table = reader.schema.empty_table()
+            else:
+                table = pa.Table.from_batches([reader.get_batch(0)])
+            if columns:
+                table = table.select(columns)
+            return table.slice(0, nrows).to_pandas()
+
+    @staticmethod
+    def read(path, input_fmt, columns=None, filter_expression=None, max_rows=None):
+        """Selected columns of the matching rows as an Arrow table"""
+        dataset = ColumnarReader.dataset(path, input_fmt)
+        if max_rows:
+            return dataset.head(max_rows, columns=columns, filter=filter_expression)
+        return dataset.to_table(columns=columns, filter=filter_expression)
+
+    @staticmethod
+    def convert(path, input_fmt, output_path, output_fmt, columns=None, filter_expression=None,
+                compression=None, profile=None):
+        """Stream the projected, filtered rows batch by batch into Parquet or Feather"""
+        import os
+        from utils.format_handlers import ArrowBatchWriter
+        from utils.instrumentation import Instrumentation
+
+        start = time.perf_counter()
+        scanner = ColumnarReader.dataset(path, input_fmt).scanner(columns=columns, filter=filter_expression)
+        stats = {'rows': 0, 'columns': len(scanner.projected_schema), 'engine': 'pyarrow'}
+        with ArrowBatchWriter(output_path, output_fmt, scanner.projected_schema, compression, profile) as writer:
+            for batch in Instrumentation.timed_iter(scanner.to_batches(), 'read'):
+                if batch.num_rows:
+                    writer.write_batch(batch)
+                    stats['rows'] += batch.num_rows
+        stats['seconds'] = time.perf_counter() - start
+        stats['bytes_out'] = os.path.getsize(output_path)
+        Instrumentation.record('read', bytes_in=os.path.getsize(path))
+        Instrumentation.record('serialize', bytes_out=stats['bytes_out'])
+        return stats
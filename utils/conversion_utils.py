@@ -1,13 +1,330 @@
-import pandas as pd
-import chardet
+import os
+import time
 from io import BytesIO
 
+from utils.encoding_detector import EncodingDetector
+from utils.format_handlers import ArrowCSVHandler, ExcelStreamWriter, ParquetProfile
+from utils.instrumentation import Instrumentation
+
+
+class CSVChunkSink:
+    """Append DataFrame chunks to a CSV file"""
+
+    def __init__(self, output_path, **kwargs):
+        self.file = open(output_path, 'w', encoding='utf-8', newline='')
+        self.kwargs = kwargs
+        self.header_written = False
+
+    def write(self, chunk):
+        chunk.to_csv(self.file, index=False, header=not self.header_written, **self.kwargs)
+        self.header_written = True
+
+    def close(self):
+        self.file.close()
+
+
+def _orjson_rows(chunk):
+    """Row tuples of plain Python values that orjson can serialize natively"""
+    import pandas as pd
+
+    columns = []
+    for col in chunk.columns:
+        series = chunk[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            # Timestamps are datetime subclasses, which orjson rejects
+            values = [None if pd.isna(v) else v.to_pydatetime() for v in series]
+        else:
+            values = series.astype(object).where(series.notna(), None).tolist()
+        columns.append(values)
+    return zip(*columns)
+
+
+def _orjson_dumps(value):
+    import orjson
+
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+class JSONLinesChunkSink:
+    """Append DataFrame chunks to a JSON Lines file"""
+
+    def __init__(self, output_path, backend='pandas', **kwargs):
+        self.file = open(output_path, 'w', encoding='utf-8')
+        self.backend = backend
+        self.kwargs = {'date_format': 'iso', **kwargs}
+
+    def write(self, chunk):
+        if chunk.empty:
+            return
+        if self.backend == 'orjson':
+            keys = [str(c) for c in chunk.columns]
+            text = '\n'.join(_orjson_dumps(dict(zip(keys, row))) for row in _orjson_rows(chunk))
+        else:
+            text = chunk.to_json(orient='records', lines=True, **self.kwargs)
+        self.file.write(text if text.endswith('\n') else text + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class JSONChunkSink:
+    """Write DataFrame chunks as one JSON document in any of pandas' orients
+
+    'records', 'values', 'split', 'index' and 'table' are written as the chunks
+    arrive. 'columns' is column-major, so each column is spooled to its own
+    temporary file and the document is assembled on close. Index labels are
+    global row numbers. backend='orjson' serializes records/values with
+    orjson when it is installed.
+    """
+
+    ORIENTS = ['records', 'values', 'split', 'index', 'columns', 'table']
+
+    def __init__(self, output_path, orient='records', backend='pandas', **kwargs):
+        if orient not in JSONChunkSink.ORIENTS:
+            raise ValueError(f"Unsupported JSON orient '{orient}'")
+        self.file = open(output_path, 'w', encoding='utf-8')
+        self.orient = orient
+        self.backend = backend if orient in ('records', 'values') else 'pandas'
+        self.kwargs = {'date_format': 'iso', **kwargs}
+        self.rows = 0
+        self.columns = None
+        self.spools = None
+        self.file.write('[' if orient in ('records', 'values') else '{')
+
+    def _start(self, chunk):
+        import json
+
+        self.columns = [str(c) for c in chunk.columns]
+        if self.orient == 'split':
+            self.file.write('"columns":' + json.dumps(self.columns) + ',"data":[')
+        elif self.orient == 'table':
+            from pandas.io.json import build_table_schema
+
+            schema = build_table_schema(chunk, index=False)
+            self.file.write('"schema":' + json.dumps(schema, default=str) + ',"data":[')
+        elif self.orient == 'columns':
+            import tempfile
+
+            self.spools = [tempfile.TemporaryFile('w+', encoding='utf-8') for _ in self.columns]
+
+    def _body(self, chunk, orient):
+        """Serialized chunk without its enclosing brackets"""
+        if self.backend == 'orjson':
+            rows = _orjson_rows(chunk)
+            if orient == 'records':
+                rows = [dict(zip(map(str, chunk.columns), row)) for row in rows]
+            return _orjson_dumps(list(rows))[1:-1]
+        return chunk.to_json(orient=orient, **self.kwargs)[1:-1]
+
+    def write(self, chunk):
+        if self.columns is None:
+            self._start(chunk)
+        if chunk.empty:
+            return
+        separator = ',' if self.rows else ''
+        chunk = chunk.set_axis(range(self.rows, self.rows + len(chunk)))
+        if self.orient == 'columns':
+            for spool, col in zip(self.spools, chunk.columns):
+                body = chunk[col].to_json(orient='index', **self.kwargs)[1:-1]
+                spool.write(separator + body)
+        elif self.orient == 'split':
+            body = chunk.to_json(orient='values', **self.kwargs)[1:-1]
+            self.file.write(separator + body)
+        else:
+            orient = 'records' if self.orient == 'table' else self.orient
+            self.file.write(separator + self._body(chunk, orient))
+        self.rows += len(chunk)
+
+    def close(self):
+        import json
+
+        try:
+            if self.orient in ('records', 'values'):
+                self.file.write(']')
+            elif self.columns is None:
+                self.file.write('}')
+            elif self.orient == 'split':
+                self.file.write('],"index":[')
+                for start in range(0, self.rows, 100_000):
+                    if start:
+                        self.file.write(',')
+                    self.file.write(','.join(map(str, range(start, min(start + 100_000, self.rows)))))
+                self.file.write(']}')
+            elif self.orient == 'table':
+                self.file.write(']}')
+            elif self.orient == 'index':
+                self.file.write('}')
+            else:
+                for i, (spool, col) in enumerate(zip(self.spools, self.columns)):
+                    self.file.write((',' if i else '') + json.dumps(col) + ':{')
+                    spool.seek(0)
+                    while True:
+                        block = spool.read(1024 * 1024)
+                        if not block:
+                            break
+                        self.file.write(block)
+                    self.file.write('}')
+                self.file.write('}')
+        finally:
+            for spool in self.spools or []:
+                spool.close()
+            self.file.close()
+
+
+class ParquetChunkSink:
+    """Write DataFrame chunks as Parquet row groups
+
+    With a ParquetProfile, chunks are regrouped into row groups of the
+    profile's row_group_rows; otherwise each chunk becomes one row group.
+    The first chunk fixes the schema; an integer column that gets floats
+    later is widened to float64 and the rows already written are copied
+    over with the new type.
+    """
+
+    def __init__(self, output_path, profile=None, **kwargs):
+        self.output_path = output_path
+        self.row_group_rows = (profile or {}).get('row_group_rows')
+        if profile is not None:
+            kwargs = {**ParquetProfile.writer_options(profile), **kwargs}
+        self.kwargs = kwargs
+        self.writer = None
+        self.schema = None
+        self.pending = []
+
+    def _open(self):
+        import pyarrow.parquet as pq
+
+        self.writer = pq.ParquetWriter(self.output_path, self.schema, **self.kwargs)
+
+    @staticmethod
+    def _written(path):
+        """Tables already written to path, one per row group"""
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for i in range(parquet_file.num_row_groups):
+            yield parquet_file.read_row_group(i)
+
+    def _write_table(self, table, final=False):
+        if not self.row_group_rows:
+            self.writer.write_table(table)
+            return
+        import pyarrow as pa
+
+        if self.pending:
+            table = pa.concat_tables(self.pending + [table])
+            self.pending = []
+        cut = table.num_rows if final else table.num_rows - table.num_rows % self.row_group_rows
+        if cut:
+            self.writer.write_table(table.slice(0, cut), row_group_size=self.row_group_rows)
+        if cut < table.num_rows:
+            self.pending.append(table.slice(cut))
+
+    def _widened_schema(self, table, error):
+        """The schema with int columns that now hold floats promoted to float64"""
+        import pyarrow as pa
+
+        fields = []
+        for field in self.schema:
+            new_type = table.column(field.name).type
+            if new_type == field.type or pa.types.is_null(new_type):
+                fields.append(field)
+                continue
+            try:
+                table.column(field.name).cast(field.type)
+                fields.append(field)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                if pa.types.is_integer(field.type) and (pa.types.is_floating(new_type) or pa.types.is_integer(new_type)):
+                    fields.append(field.with_type(pa.float64()))
+                    continue
+                raise ValueError(
+                    f"Column '{field.name}' changed type from {field.type} to {new_type} between chunks. "
+                    f"Specify its data type (e.g. {field.name}:str) or use a larger chunk size."
+                ) from error
+        schema = pa.schema(fields)
+        if schema.equals(self.schema):
+            raise ValueError(
+                f"Column types changed between chunks ({error}). "
+                "Specify column data types or use a larger chunk size."
+            ) from error
+        return schema
+
+    def _promote(self, schema):
+        """Reopen the output with schema and copy the rows written so far into it"""
+        self.writer.close()
+        previous = f"{self.output_path}.widen"
+        os.replace(self.output_path, previous)
+        try:
+            self.schema = schema
+            self._open()
+            for table in self._written(previous):
+                self.writer.write_table(table.cast(schema))
+            self.pending = [table.cast(schema) for table in self.pending]
+        finally:
+            os.remove(previous)
+
+    def write(self, chunk):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self.writer is None:
+            # All-null columns in the first chunk have no usable type yet
+            self.schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                for field in table.schema
+            ]).remove_metadata()
+            self._open()
+        if not table.schema.remove_metadata().equals(self.schema):
+            try:
+                table = table.cast(self.schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                self._promote(self._widened_schema(table, e))
+                table = table.cast(self.schema)
+        self._write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            if self.pending:
+                self._write_table(self.pending.pop(), final=True)
+            self.writer.close()
+
+
+class FeatherChunkSink(ParquetChunkSink):
+    """Write each DataFrame chunk as a record batch of a Feather (Arrow IPC) file"""
+
+    def _open(self):
+        import pyarrow as pa
+
+        self.writer = pa.ipc.new_file(str(self.output_path), self.schema, **self.kwargs)
+
+    @staticmethod
+    def _written(path):
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield pa.Table.from_batches([reader.get_batch(i)])
+
+
 class ConversionUtils:
     """Core utilities for format conversion"""
+
+    CHUNK_SINKS = {
+        'csv': CSVChunkSink,
+        'json': JSONChunkSink,
+        'jsonl': JSONLinesChunkSink,
+        'parquet': ParquetChunkSink,
+        'feather': FeatherChunkSink,
+        'excel': ExcelStreamWriter,
+    }
+    JSON_ORIENTS = JSONChunkSink.ORIENTS
     
     @staticmethod
     def read_csv_advanced(file_path, delimiter=',', encoding='utf-8', skip_rows=0, header=0, dtype_dict=None, na_values=None):
         """Read CSV with advanced options"""
+        import pandas as pd
+
         try:
             df = pd.read_csv(
                 file_path,
@@ -25,6 +342,8 @@ class ConversionUtils:
     @staticmethod
     def read_excel_advanced(file_path, sheet_name=0, header=0, skip_rows=0):
         """Read Excel with advanced options"""
+        import pandas as pd
+
         try:
             df = pd.read_excel(file_path, sheet_name=sheet_name, header=header, skiprows=skip_rows)
             return df, None
@@ -34,6 +353,8 @@ class ConversionUtils:
     @staticmethod
     def read_json_advanced(file_path, orient='records'):
         """Read JSON with advanced options"""
+        import pandas as pd
+
         try:
             df = pd.read_json(file_path, orient=orient)
             return df, None
@@ -46,29 +367,199 @@ class ConversionUtils:
         try:
             output = BytesIO()
             
-            if output_fmt == 'csv':
-                df.to_csv(output, index=False)
-            elif output_fmt == 'excel':
-                df.to_excel(output, index=False)
-            elif output_fmt == 'json':
-                df.to_json(output, orient='records')
-            elif output_fmt == 'parquet':
-                df.to_parquet(output)
-            elif output_fmt == 'feather':
-                df.to_feather(output)
+            with Instrumentation.stage('serialize', rows=len(df)) as stage:
+                if output_fmt == 'csv':
+                    df.to_csv(output, index=False)
+                elif output_fmt == 'excel':
+                    writer = ExcelStreamWriter(output)
+                    writer.write(df)
+                    writer.close()
+                elif output_fmt == 'json':
+                    df.to_json(output, orient='records')
+                elif output_fmt == 'parquet':
+                    df.to_parquet(output)
+                elif output_fmt == 'feather':
+                    df.to_feather(output)
+                stage['bytes_out'] = output.getbuffer().nbytes
             
             output.seek(0)
             return output, None
         except Exception as e:
             return None, str(e)
     
+    @staticmethod
+    def json_backends():
+        """JSON serializers available here; orjson is an optional dependency"""
+        backends = ['pandas']
+        try:
+            import orjson  # noqa: F401
+            backends.append('orjson')
+        except ImportError:
+            pass
+        return backends
+
+    @staticmethod
+    def write_json(data, output_path, orient='records', lines=False, backend='pandas',
+                   chunksize=100_000, **kwargs):
+        """Write a DataFrame or an iterable of chunks as JSON / JSON Lines, chunk by chunk"""
+        import pandas as pd
+
+        if backend not in ConversionUtils.json_backends():
+            backend = 'pandas'
+        if isinstance(data, pd.DataFrame):
+            df = data
+            data = (df.iloc[i:i + chunksize] for i in range(0, max(len(df), 1), chunksize))
+        sink_options = {'backend': backend, **kwargs}
+        if not lines:
+            sink_options['orient'] = orient
+        return ConversionUtils.stream_convert_chunks(
+            data, output_path, 'jsonl' if lines else 'json', sink_options=sink_options
+        )
+
+    @staticmethod
+    def iter_chunks(source, input_fmt, chunksize=100_000, read_options=None):
+        """Yield DataFrame chunks from a CSV or JSON Lines source"""
+        import pandas as pd
+
+        if input_fmt == 'csv':
+            reader = pd.read_csv(source, chunksize=chunksize, **(read_options or {}))
+        elif input_fmt == 'jsonl':
+            reader = pd.read_json(source, lines=True, chunksize=chunksize, **(read_options or {}))
+        else:
+            raise ValueError(f"Chunked reading not supported for '{input_fmt}'")
+        with reader:
+            yield from reader
+
+    @staticmethod
+    def fixed_columns(output_fmt, sink_options=None):
+        """Whether an output fixes its header or schema with the first chunk
+
+        JSON Lines and row-keyed JSON can take columns that appear later.
+        """
+        if output_fmt == 'jsonl':
+            return False
+        if output_fmt == 'json':
+            return (sink_options or {}).get('orient', 'records') not in ('records', 'index')
+        return True
+
+    @staticmethod
+    def _conform(chunk, columns):
+        """Reorder a chunk to columns, adding missing ones as all-None object columns
+
+        Arrow types those as null rather than float64, so they don't pin the
+        Parquet schema of a column whose values only come later.
+        """
+        import pandas as pd
+
+        missing = columns.difference(chunk.columns, sort=False)
+        chunk = chunk.reindex(columns=columns)
+        for col in missing:
+            chunk[col] = pd.Series(None, index=chunk.index, dtype=object)
+        return chunk
+
+    @staticmethod
+    def stream_convert_chunks(chunks, output_path, output_fmt, sink_options=None, preview_rows=0,
+                              progress_callback=None, columns=None):
+        """Write DataFrame chunks to one output file so memory is bounded by the chunk size
+
+        columns (e.g. from JSONReader.scan_columns) fixes the output columns
+        up front. Otherwise outputs that allow it take new columns as they
+        appear, and for the rest the first chunk fixes the columns: later
+        ones are dropped and listed in stats['dropped_columns'].
+        """
+        sink = None
+        try:
+            sink_class = ConversionUtils.CHUNK_SINKS.get(output_fmt)
+            if sink_class is None:
+                raise ValueError(f"Streaming output not supported for '{output_fmt}'")
+
+            start = time.perf_counter()
+            stats = {'rows': 0, 'chunks': 0, 'columns': 0, 'preview': None, 'dropped_columns': []}
+            sink = sink_class(output_path, **(sink_options or {}))
+            growable = columns is None and not ConversionUtils.fixed_columns(output_fmt, sink_options)
+            if columns is not None:
+                import pandas as pd
+
+                columns = pd.Index(columns)
+
+            for chunk in Instrumentation.timed_iter(chunks, 'read'):
+                with Instrumentation.stage('transform', rows=len(chunk)):
+                    if columns is None:
+                        columns = chunk.columns
+                    elif not chunk.columns.equals(columns):
+                        extra = chunk.columns.difference(columns, sort=False)
+                        if growable:
+                            columns = columns.append(extra)
+                        else:
+                            stats['dropped_columns'].extend(c for c in extra if c not in stats['dropped_columns'])
+                        chunk = ConversionUtils._conform(chunk, columns)
+                    if preview_rows and stats['preview'] is None:
+                        stats['preview'] = chunk.head(preview_rows).copy()
+                with Instrumentation.stage('serialize', rows=len(chunk)):
+                    sink.write(chunk)
+                stats['rows'] += len(chunk)
+                stats['chunks'] += 1
+                if progress_callback:
+                    progress_callback(stats['rows'])
+
+            with Instrumentation.stage('serialize'):
+                sink.close()
+            sink = None
+            stats['columns'] = len(columns) if columns is not None else 0
+            stats['seconds'] = time.perf_counter() - start
+            stats['bytes_out'] = os.path.getsize(output_path)
+            Instrumentation.record('serialize', bytes_out=stats['bytes_out'])
+            return stats, None
+        except Exception as e:
+            return None, str(e)
+        finally:
+            if sink is not None:
+                sink.close()
+
+    @staticmethod
+    def stream_convert_csv(source, output_path, output_fmt, chunksize=100_000, read_options=None,
+                           sink_options=None, preview_rows=0, progress_callback=None):
+        """Convert a CSV source chunk by chunk so memory is bounded by chunksize"""
+        Instrumentation.record('read', bytes_in=Instrumentation.size_of(source))
+        return ConversionUtils.stream_convert_chunks(
+            ConversionUtils.iter_chunks(source, 'csv', chunksize, read_options),
+            output_path, output_fmt, sink_options=sink_options,
+            preview_rows=preview_rows, progress_callback=progress_callback,
+        )
+
+    @staticmethod
+    def convert_csv_file(input_path, output_path, output_fmt, read_options=None, compression='snappy',
+                         chunksize=100_000, preview_rows=0, progress_callback=None, sink_options=None,
+                         profile=None):
+        """Convert a CSV file, using the pyarrow engine for Parquet/Feather when the options allow
+
+        profile is a ParquetProfile settings dict for Parquet output.
+        """
+        if output_fmt in ('parquet', 'feather'):
+            arrow_options, _ = ArrowCSVHandler.arrow_options(read_options)
+            if arrow_options is not None:
+                try:
+                    stats = ArrowCSVHandler.convert(
+                        input_path, output_path, output_fmt, read_options, compression,
+                        preview_rows=preview_rows, profile=profile,
+                    )
+                    return stats, None
+                except Exception:
+                    # Fall back to the pandas engine, which accepts more input quirks
+                    pass
+
+        sink_options = dict(sink_options or {})
+        if output_fmt == 'parquet':
+            sink_options['profile'] = {'compression': compression, **(profile or {})}
+        stats, error = ConversionUtils.stream_convert_csv(
+            input_path, output_path, output_fmt, chunksize=chunksize, read_options=read_options,
+            sink_options=sink_options, preview_rows=preview_rows, progress_callback=progress_callback,
+        )
+        if stats is not None:
+            stats['engine'] = 'pandas'
+        return stats, error
+
     @staticmethod
     def detect_encoding(file_path):
         """Auto-detect file encoding"""
-        try:
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-            result = chardet.detect(raw_data)
-            return result['encoding']
-        except:
-            return 'utf-8'
+        return EncodingDetector.detect_encoding(file_path)
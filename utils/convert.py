@@ -0,0 +1,410 @@
+"""Convert files without Streamlit
+
+    python -m utils.convert data.csv -o data.parquet
+    python -m utils.convert 'exports/**/*.csv' --to parquet --output-dir out --workers 4
+    python -m utils.convert big.tsv --to jsonl --sep '\\t' --encoding latin-1 --chunksize 200000
+
+Each input's result is printed as one JSON line (rows, bytes, seconds,
+throughput and the per-stage breakdown), followed by a summary line. Heavy
+libraries are imported only once a conversion starts.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+INPUT_FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'csv',
+    '.txt': 'csv',
+    '.dat': 'csv',
+    '.json': 'json',
+    '.jsonl': 'json',
+    '.ndjson': 'json',
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+}
+OUTPUT_EXTENSIONS = {
+    'csv': '.csv',
+    'excel': '.xlsx',
+    'json': '.json',
+    'jsonl': '.jsonl',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+
+
+def _convert_job(job):
+    """Worker entry point: one conversion described by a plain dict"""
+    return HeadlessConverter.convert(**job)
+
+
+class HeadlessConverter:
+    """Command-line and Python entry point over ConversionUtils and the format handlers"""
+
+    @staticmethod
+    def input_format(path):
+        input_fmt = INPUT_FORMATS.get(Path(path).suffix.lower())
+        if input_fmt is None:
+            raise ValueError(f"Unsupported input file '{path}'")
+        return input_fmt
+
+    @staticmethod
+    def output_format(output_path, output_fmt=None):
+        """Explicit format, else the one implied by the output extension"""
+        if output_fmt:
+            return output_fmt
+        for fmt, extension in OUTPUT_EXTENSIONS.items():
+            if str(output_path).lower().endswith(extension):
+                return fmt
+        raise ValueError(f"Can't tell the output format of '{output_path}'; pass --to")
+
+    @staticmethod
+    def expand(patterns):
+        """Input paths for a list of files and glob patterns, in order and without duplicates"""
+        paths = []
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+            paths.extend(p for p in matches if os.path.isfile(p))
+        return list(dict.fromkeys(paths))
+
+    @staticmethod
+    def output_paths(inputs, output_dir, output_fmt):
+        """One output path per input under output_dir; inputs sharing a stem get a numeric suffix"""
+        taken = set()
+        outputs = []
+        for input_path in inputs:
+            stem = Path(input_path).stem
+            name = stem + OUTPUT_EXTENSIONS[output_fmt]
+            index = 1
+            while name in taken:
+                name = f"{stem}_{index}{OUTPUT_EXTENSIONS[output_fmt]}"
+                index += 1
+            taken.add(name)
+            outputs.append(str(Path(output_dir) / name))
+        return outputs
+
+    @staticmethod
+    def sniff_options(input_path, read_options=None):
+        """CSV reader options detected the way the CSV page does, overridden by read_options"""
+        from utils.csv_sniffer import CSVSniffer
+        from utils.encoding_detector import EncodingDetector
+
+        encoding = (read_options or {}).get('encoding') or EncodingDetector.detect_encoding(input_path)
+        sniffed = CSVSniffer.sniff(input_path, encoding=encoding)
+        options = {
+            'sep': sniffed['delimiter'],
+            'encoding': encoding,
+            'header': sniffed['header'],
+            'quotechar': sniffed['quotechar'],
+            'thousands': sniffed['thousands'],
+            'decimal': sniffed['decimal'],
+        }
+        options = {**options, **(read_options or {})}
+        if 'parse_dates' not in options:
+            # Sniffed names no longer apply once sep, header or skiprows are overridden
+            parse_dates = CSVSniffer.header_columns(input_path, sniffed['parse_dates'], options)
+            if parse_dates:
+                options['parse_dates'] = parse_dates
+        return options
+
+    @staticmethod
+    def _chunks(input_path, input_fmt, chunksize, read_options):
+        """DataFrame chunks for inputs without a direct streaming converter"""
+        if input_fmt == 'json':
+            from utils.json_reader import JSONReader
+
+            return JSONReader.iter_chunks(input_path, chunksize=chunksize, **read_options)
+        from utils.columnar_reader import ColumnarReader
+
+        dataset = ColumnarReader.dataset(input_path, input_fmt)
+        batches = dataset.to_batches(columns=read_options.get('columns'), batch_size=chunksize)
+        return (batch.to_pandas() for batch in batches if batch.num_rows)
+
+    @staticmethod
+    def convert(input_path, output_path, output_fmt=None, read_options=None, sink_options=None,
+                compression='snappy', profile=None, chunksize=100_000, sniff=False, trace_memory=False):
+        """Convert one file and return a result dict; failures are reported in result['error']
+
+        read_options are pandas read_csv options for CSV inputs (as on the
+        CSV page), JSONReader.iter_chunks options for JSON inputs,
+        {'sheets': [...]} plus read_excel options for Excel inputs and
+        {'columns': [...]} for Parquet/Feather inputs. A .tsv input without
+        a sep is read tab-separated.
+        """
+        from utils.conversion_utils import ConversionUtils
+        from utils.instrumentation import Instrumentation
+
+        result = {
+            'input': str(input_path),
+            'output': str(output_path),
+            'format': None,
+            'engine': None,
+            'rows': 0,
+            'columns': 0,
+            'bytes_in': os.path.getsize(input_path) if os.path.exists(input_path) else 0,
+            'bytes_out': 0,
+            'seconds': 0.0,
+            'rows_per_s': None,
+            'mb_per_s': None,
+            'peak_bytes': None,
+            'stages': [],
+            'error': None,
+        }
+        read_options = dict(read_options or {})
+        trace = None
+        try:
+            output_fmt = result['format'] = HeadlessConverter.output_format(output_path, output_fmt)
+            input_fmt = HeadlessConverter.input_format(input_path)
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+            with Instrumentation.trace(str(input_path), memory=trace_memory) as trace:
+                if input_fmt == 'csv':
+                    if sniff:
+                        read_options = HeadlessConverter.sniff_options(input_path, read_options)
+                    elif 'sep' not in read_options and Path(input_path).suffix.lower() == '.tsv':
+                        read_options['sep'] = '\t'
+                    stats, error = ConversionUtils.convert_csv_file(
+                        input_path, output_path, output_fmt, read_options=read_options,
+                        compression=compression, chunksize=chunksize, sink_options=sink_options,
+                        profile=profile,
+                    )
+                elif input_fmt == 'excel':
+                    from utils.excel_reader import ExcelReader
+
+                    reader = ExcelReader(input_path, str(input_path))
+                    try:
+                        sheets = read_options.pop('sheets', None) or reader.sheet_names
+                        stats = reader.merge_to(sheets, output_path, output_fmt, **read_options)
+                    finally:
+                        reader.close()
+                    stats['engine'] = 'openpyxl'
+                    error = None
+                elif input_fmt in ('parquet', 'feather') and output_fmt in ('parquet', 'feather'):
+                    from utils.columnar_reader import ColumnarReader
+
+                    stats = ColumnarReader.convert(
+                        input_path, input_fmt, output_path, output_fmt,
+                        columns=read_options.get('columns'), compression=compression, profile=profile,
+                    )
+                    error = None
+                else:
+                    if output_fmt == 'parquet':
+                        sink_options = {**(sink_options or {}),
+                                        'profile': {'compression': compression, **(profile or {})}}
+                    columns = None
+                    if input_fmt == 'json' and ConversionUtils.fixed_columns(output_fmt, sink_options):
+                        from utils.json_reader import JSONReader
+
+                        # Keys first seen deep into the file still get a column
+                        columns = JSONReader.scan_columns(input_path, **read_options)
+                    stats, error = ConversionUtils.stream_convert_chunks(
+                        HeadlessConverter._chunks(input_path, input_fmt, chunksize, read_options),
+                        output_path, output_fmt, sink_options=sink_options, columns=columns,
+                    )
+                    if stats is not None:
+                        stats['engine'] = 'pandas'
+            if error:
+                raise ValueError(error)
+            result.update({
+                'engine': stats.get('engine'),
+                'rows': stats['rows'],
+                'columns': stats['columns'] if isinstance(stats['columns'], int) else len(stats['columns']),
+                'bytes_out': os.path.getsize(output_path),
+            })
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        if trace is not None:
+            result['seconds'] = trace.seconds
+            result['peak_bytes'] = trace.peak_bytes
+            result['stages'] = trace.summary()
+            if trace.seconds and not result['error']:
+                result['rows_per_s'] = result['rows'] / trace.seconds
+                result['mb_per_s'] = result['bytes_in'] / 1024 / 1024 / trace.seconds
+        return result
+
+    @staticmethod
+    def convert_many(jobs, workers=1):
+        """Yield a result per job (a dict of convert() arguments), in completion order when workers > 1"""
+        if workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                yield _convert_job(job)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            futures = [executor.submit(_convert_job, job) for job in jobs]
+            for future in as_completed(futures):
+                yield future.result()
+
+    @staticmethod
+    def summarize(results, seconds):
+        """Totals across a run; seconds is the wall-clock time of the whole run"""
+        rows = sum(r['rows'] for r in results)
+        bytes_in = sum(r['bytes_in'] for r in results)
+        return {
+            'files': len(results),
+            'failed': sum(1 for r in results if r['error']),
+            'rows': rows,
+            'bytes_in': bytes_in,
+            'bytes_out': sum(r['bytes_out'] for r in results),
+            'seconds': seconds,
+            'rows_per_s': rows / seconds if seconds else None,
+            'mb_per_s': bytes_in / 1024 / 1024 / seconds if seconds else None,
+        }
+
+
+def _header(value):
+    return None if value.lower() == 'none' else int(value)
+
+
+def _dtypes(values):
+    dtypes = {}
+    for value in values or []:
+        column, _, dtype = value.partition(':')
+        if not dtype:
+            raise argparse.ArgumentTypeError(f"Expected column:type, got '{value}'")
+        dtypes[column.strip()] = dtype.strip()
+    return dtypes
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.convert',
+        description='Convert CSV/JSON/Excel/Parquet/Feather files without the Streamlit UI.',
+    )
+    parser.add_argument('inputs', nargs='+', help='input files or glob patterns (quote them)')
+    parser.add_argument('-o', '--output', help='output file (single input only)')
+    parser.add_argument('--output-dir', help='directory for outputs (default: next to each input)')
+    parser.add_argument('--to', choices=list(OUTPUT_EXTENSIONS), help='output format (default: from --output)')
+    parser.add_argument('--workers', type=int, default=1, help='convert this many files in parallel')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='rows per chunk when streaming')
+    parser.add_argument('--trace-memory', action='store_true', help='record tracemalloc peaks per stage (slower)')
+
+    csv = parser.add_argument_group('CSV reader options (as on the CSV page)')
+    csv.add_argument('--sniff', action='store_true', help='detect encoding, delimiter, header, separators and dates')
+    csv.add_argument('--sep', help='delimiter, e.g. "," or "\\t"')
+    csv.add_argument('--encoding')
+    csv.add_argument('--header', type=_header, default=argparse.SUPPRESS, help='header row number, or "none"')
+    csv.add_argument('--skiprows', type=int)
+    csv.add_argument('--na-values', help='comma-separated values to treat as missing')
+    csv.add_argument('--dtype', action='append', metavar='COLUMN:TYPE', help='repeatable')
+    csv.add_argument('--thousands')
+    csv.add_argument('--decimal')
+    csv.add_argument('--quotechar')
+    csv.add_argument('--parse-dates', help='comma-separated date columns')
+
+    other = parser.add_argument_group('other inputs and outputs')
+    other.add_argument('--sheets', help='comma-separated Excel sheets to merge (default: all)')
+    other.add_argument('--columns', help='comma-separated Parquet/Feather columns to read')
+    other.add_argument('--json-orient', default='records', help='orient of JSON output')
+    other.add_argument('--json-backend', default='pandas', help='pandas or orjson')
+    other.add_argument('--compression', default='snappy', help='Parquet/Feather compression')
+    other.add_argument('--profile', help='Parquet writer profile preset, e.g. "small file"')
+    return parser
+
+
+def _read_options(args, input_fmt):
+    def split(value):
+        return [v.strip() for v in value.split(',') if v.strip()] if value else None
+
+    if input_fmt == 'excel':
+        return {'sheets': split(args.sheets)}
+    if input_fmt in ('parquet', 'feather'):
+        return {'columns': split(args.columns)}
+    if input_fmt != 'csv':
+        return {}
+    options = {
+        'sep': args.sep.encode().decode('unicode_escape') if args.sep else None,
+        'encoding': args.encoding,
+        'skiprows': args.skiprows,
+        'na_values': split(args.na_values),
+        'dtype': _dtypes(args.dtype) or None,
+        'thousands': args.thousands,
+        'decimal': args.decimal,
+        'quotechar': args.quotechar,
+        'parse_dates': split(args.parse_dates),
+    }
+    options = {k: v for k, v in options.items() if v is not None}
+    if args.na_values:
+        options['keep_default_na'] = False
+    # Only set when given: header=None means "no header row"
+    if hasattr(args, 'header'):
+        options['header'] = args.header
+    return options
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    inputs = HeadlessConverter.expand(args.inputs)
+    if not inputs:
+        parser.error('no input files matched')
+    if args.output:
+        if len(inputs) > 1:
+            parser.error('--output takes a single input; use --output-dir for several')
+        output_fmt = HeadlessConverter.output_format(args.output, args.to)
+        outputs = [args.output]
+    else:
+        if not args.to:
+            parser.error('pass --to (or --output) to choose the output format')
+        output_fmt = args.to
+        if args.output_dir:
+            outputs = HeadlessConverter.output_paths(inputs, args.output_dir, output_fmt)
+        else:
+            outputs = [str(Path(p).with_suffix(OUTPUT_EXTENSIONS[output_fmt])) for p in inputs]
+        clashes = [p for p, o in zip(inputs, outputs) if os.path.abspath(p) == os.path.abspath(o)]
+        if clashes:
+            parser.error(f"output would overwrite input '{clashes[0]}'; use --output-dir")
+
+    profile = None
+    if args.profile:
+        from utils.format_handlers import ParquetProfile
+
+        if args.profile not in ParquetProfile.PRESETS:
+            parser.error(f"unknown profile '{args.profile}'; choose from {', '.join(ParquetProfile.PRESETS)}")
+        profile = ParquetProfile.resolve(args.profile)
+
+    sink_options = {}
+    if output_fmt in ('json', 'jsonl'):
+        sink_options['backend'] = args.json_backend
+        if output_fmt == 'json':
+            sink_options['orient'] = args.json_orient
+
+    jobs = []
+    for input_path, output_path in zip(inputs, outputs):
+        input_fmt = INPUT_FORMATS.get(Path(input_path).suffix.lower())
+        jobs.append({
+            'input_path': input_path,
+            'output_path': output_path,
+            'output_fmt': output_fmt,
+            'read_options': _read_options(args, input_fmt),
+            'sink_options': sink_options,
+            'compression': args.compression,
+            'profile': profile,
+            'chunksize': args.chunksize,
+            'sniff': args.sniff,
+            'trace_memory': args.trace_memory,
+        })
+
+    start = time.perf_counter()
+    results = []
+    for result in HeadlessConverter.convert_many(jobs, workers=args.workers):
+        results.append(result)
+        print(json.dumps(result, default=str), flush=True)
+
+    summary = HeadlessConverter.summarize(results, time.perf_counter() - start)
+    print(json.dumps({'summary': summary}), flush=True)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
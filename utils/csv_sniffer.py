@@ -0,0 +1,198 @@
+import csv
+import re
+import threading
+from collections import OrderedDict
+from io import StringIO
+
+
+class CSVSniffer:
+    """Infer CSV reader options from the first few KB of a file"""
+
+    SAMPLE_KB = 64
+    CACHE_SIZE = 128
+    DELIMITERS = [',', '\t', ';', '|', ':']
+
+    THOUSANDS_COMMA = re.compile(r'^[-+]?\d{1,3}(,\d{3})+(\.\d+)?$')
+    THOUSANDS_DOT = re.compile(r'^[-+]?\d{1,3}(\.\d{3})+(,\d+)?$')
+    DECIMAL_COMMA = re.compile(r'^[-+]?\d+,\d+$')
+
+    MIN_DATE_LENGTH = 6
+    DATE_DIRECTIVES = [('%Y', '%y'), ('%m', '%b', '%B'), ('%d',)]
+
+    DEFAULTS = {
+        'delimiter': ',',
+        'quotechar': '"',
+        'header': 0,
+        'thousands': None,
+        'decimal': '.',
+        'dtypes': {},
+        'parse_dates': [],
+        'sample_rows': 0,
+        'sample_bytes': 0,
+    }
+
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def read_sample(file_path, encoding='utf-8', sample_kb=None):
+        """Read the first N KB and cut it back to the last complete line"""
+        sample_bytes = (sample_kb or CSVSniffer.SAMPLE_KB) * 1024
+        with open(file_path, 'rb') as f:
+            raw = f.read(sample_bytes)
+            complete = len(raw) < sample_bytes
+        if not complete:
+            newline = raw.rfind(b'\n')
+            raw = raw[:newline + 1] if newline != -1 else raw
+        return raw.decode(encoding, errors='replace')
+
+    @staticmethod
+    def sniff_dialect(sample):
+        """Delimiter and quoting via csv.Sniffer, falling back to the most consistent candidate"""
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=''.join(CSVSniffer.DELIMITERS))
+            return dialect.delimiter, dialect.quotechar or '"'
+        except csv.Error:
+            lines = [line for line in sample.splitlines()[:50] if line.strip()]
+            best, best_score = ',', -1
+            for delimiter in CSVSniffer.DELIMITERS:
+                counts = [line.count(delimiter) for line in lines]
+                if not counts or counts[0] == 0:
+                    continue
+                score = sum(1 for c in counts if c == counts[0])
+                if score > best_score:
+                    best, best_score = delimiter, score
+            return best, '"'
+
+    @staticmethod
+    def sniff_header(sample):
+        try:
+            return 0 if csv.Sniffer().has_header(sample) else None
+        except csv.Error:
+            return 0
+
+    @staticmethod
+    def sniff_separators(values):
+        """Guess thousands and decimal separators from string-typed sample values"""
+        values = [v.strip() for v in values if isinstance(v, str) and v.strip()]
+        if not values:
+            return None, '.'
+        if any(CSVSniffer.THOUSANDS_COMMA.match(v) for v in values):
+            return ',', '.'
+        if any(CSVSniffer.THOUSANDS_DOT.match(v) for v in values):
+            return '.', ','
+        if any(CSVSniffer.DECIMAL_COMMA.match(v) for v in values):
+            return None, ','
+        return None, '.'
+
+    @staticmethod
+    def dtype_name(series):
+        """Reader dtype for a sampled column; ints are nullable so later NAs still parse"""
+        import pandas as pd
+
+        if pd.api.types.is_bool_dtype(series):
+            return 'boolean'
+        if pd.api.types.is_integer_dtype(series):
+            return 'Int64'
+        if pd.api.types.is_float_dtype(series):
+            # Float columns that only hold whole numbers and NaN are still integers
+            non_null = series.dropna()
+            if len(non_null) and (non_null % 1 == 0).all():
+                return 'Int64'
+            return 'float64'
+        return 'str'
+
+    @staticmethod
+    def date_format(values):
+        """The one strict day-month-year format every sampled value parses with, else None
+
+        Bare numbers, short tokens ('Jan', '3/4', '12:30') and anything without a
+        full date are not dates, whatever a lenient parser makes of them.
+        """
+        import pandas as pd
+        from pandas.tseries.api import guess_datetime_format
+
+        values = pd.Series([str(v).strip() for v in values], dtype=object)
+        if values.empty or (values.str.len() < CSVSniffer.MIN_DATE_LENGTH).any():
+            return None
+        if values.str.fullmatch(r'[-+]?\d+([.,]\d+)?').any():
+            return None
+        fmt = guess_datetime_format(values.iloc[0])
+        if not fmt or not all(any(d in fmt for d in group) for group in CSVSniffer.DATE_DIRECTIVES):
+            return None
+        parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+        return fmt if parsed.notna().all() else None
+
+    @staticmethod
+    def header_columns(file_path, columns, read_options=None):
+        """The given columns that exist in the file's header under read_options, in order"""
+        import pandas as pd
+
+        if not columns:
+            return []
+        options = {k: v for k, v in (read_options or {}).items()
+                   if k in ('sep', 'encoding', 'header', 'skiprows', 'quotechar', 'names')}
+        if options.get('header', 0) is None and options.get('names') is None:
+            return []
+        try:
+            header = pd.read_csv(file_path, nrows=0, **options).columns
+        except Exception:
+            return []
+        return [col for col in columns if col in header]
+
+    @staticmethod
+    def sniff(file_path, encoding='utf-8', sample_kb=None, file_hash=None):
+        """Infer delimiter, quoting, header, separators and dtypes; cached per file hash"""
+        import pandas as pd
+
+        sample_kb = sample_kb or CSVSniffer.SAMPLE_KB
+        key = (file_hash or str(file_path), encoding, sample_kb)
+        with CSVSniffer._lock:
+            if key in CSVSniffer._cache:
+                CSVSniffer._cache.move_to_end(key)
+                return CSVSniffer._cache[key]
+
+        sample = CSVSniffer.read_sample(file_path, encoding, sample_kb)
+        delimiter, quotechar = CSVSniffer.sniff_dialect(sample)
+        header = CSVSniffer.sniff_header(sample)
+        read_options = {
+            'sep': delimiter,
+            'quotechar': quotechar,
+            'header': header,
+        }
+
+        raw = pd.read_csv(StringIO(sample), dtype=str, keep_default_na=False, **read_options)
+        candidates = [v for col in raw.columns for v in raw[col].head(200)]
+        thousands, decimal = CSVSniffer.sniff_separators(candidates)
+
+        typed = pd.read_csv(StringIO(sample), thousands=thousands, decimal=decimal, **read_options)
+        dtypes = {}
+        parse_dates = []
+        for col in typed.columns:
+            series = typed[col]
+            if not pd.api.types.is_numeric_dtype(series) and CSVSniffer.date_format(series.dropna()):
+                parse_dates.append(str(col))
+                continue
+            dtype = CSVSniffer.dtype_name(series)
+            if dtype in ('Int64', 'float64') and (thousands or decimal != '.'):
+                # Nullable dtypes ignore thousands/decimal, so leave these to inference
+                continue
+            dtypes[str(col)] = dtype
+
+        result = {
+            'delimiter': delimiter,
+            'quotechar': quotechar,
+            'header': header,
+            'thousands': thousands,
+            'decimal': decimal,
+            'dtypes': dtypes,
+            'parse_dates': parse_dates,
+            'sample_rows': len(typed),
+            'sample_bytes': len(sample.encode(encoding, errors='replace')),
+        }
+
+        with CSVSniffer._lock:
+            CSVSniffer._cache[key] = result
+            while len(CSVSniffer._cache) > CSVSniffer.CACHE_SIZE:
+                CSVSniffer._cache.popitem(last=False)
+        return result
@@ -1,41 +1,132 @@
-import chardet
+import codecs
+import os
+import time
 
 class EncodingDetector:
+    SAMPLE_SIZE = 64 * 1024
+    FEED_SIZE = 8 * 1024
+    VALIDATE_BLOCK_SIZE = 1024 * 1024
+
+    @staticmethod
+    def _sample_offsets(file_size, sample_size):
+        """Offsets of the head, middle and tail samples of a file"""
+        if file_size <= sample_size * 3:
+            return [0]
+        middle = (file_size - sample_size) // 2
+        return [0, middle, file_size - sample_size]
+
+    @staticmethod
+    def _trim_sample(sample, trim_start, trim_end):
+        """Cut a sample at line boundaries so joined samples don't split characters"""
+        if trim_start:
+            newline = sample.find(b'\n')
+            sample = sample[newline + 1:] if newline != -1 else sample
+        if trim_end:
+            newline = sample.rfind(b'\n')
+            sample = sample[:newline + 1] if newline != -1 else sample
+        return sample
+
+    @staticmethod
+    def detect_encoding_report(file_path, sample_size=None):
+        """Detect encoding from head/middle/tail samples, stopping once chardet is confident"""
+        from chardet import UniversalDetector
+
+        sample_size = sample_size or EncodingDetector.SAMPLE_SIZE
+        start = time.perf_counter()
+        detector = UniversalDetector()
+        bytes_scanned = 0
+
+        with open(file_path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            offsets = EncodingDetector._sample_offsets(file_size, sample_size)
+            for offset in offsets:
+                f.seek(offset)
+                sample = EncodingDetector._trim_sample(f.read(sample_size), offset > 0, len(offsets) > 1)
+                for i in range(0, len(sample), EncodingDetector.FEED_SIZE):
+                    block = sample[i:i + EncodingDetector.FEED_SIZE]
+                    detector.feed(block)
+                    bytes_scanned += len(block)
+                    if detector.done:
+                        break
+                if detector.done:
+                    break
+
+        result = detector.close()
+        encoding = result['encoding'] or 'utf-8'
+        if encoding == 'ascii':
+            # Unsampled regions may still hold non-ASCII text; UTF-8 is a superset
+            encoding = 'utf-8'
+
+        return {
+            'encoding': encoding,
+            'confidence': result['confidence'],
+            'bytes_scanned': bytes_scanned,
+            'file_size': file_size,
+            'seconds': time.perf_counter() - start,
+        }
+
     @staticmethod
     def detect_encoding(file_path):
         """Auto-detect file encoding"""
         try:
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-            result = chardet.detect(raw_data)
-            return result['encoding']
+            return EncodingDetector.detect_encoding_report(file_path)['encoding']
         except:
             return 'utf-8'
-    
+
     @staticmethod
     def suggest_encoding(file_path):
         """Suggest multiple encoding options"""
         try:
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-            result = chardet.detect(raw_data)
-            confidence = result['confidence']
-            encoding = result['encoding']
-            
+            report = EncodingDetector.detect_encoding_report(file_path)
+            confidence = report['confidence']
+            encoding = report['encoding']
+
             suggestions = [encoding]
             if confidence < 0.8:
                 suggestions.extend(['utf-8', 'latin-1', 'iso-8859-1'])
-            
-            return list(set(suggestions))
+
+            return list(dict.fromkeys(suggestions))
         except:
             return ['utf-8', 'latin-1', 'iso-8859-1']
-    
+
+    @staticmethod
+    def validate_encoding_report(file_path, encoding, block_size=None):
+        """Decode the file in fixed-size blocks without holding the text in memory"""
+        block_size = block_size or EncodingDetector.VALIDATE_BLOCK_SIZE
+        start = time.perf_counter()
+        decoder = codecs.getincrementaldecoder(encoding)()
+        bytes_scanned = 0
+        error = None
+        error_offset = None
+
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                # Error positions count from the bytes the decoder held back from the last block
+                pending = len(decoder.getstate()[0])
+                try:
+                    decoder.decode(block, final=not block)
+                except UnicodeDecodeError as e:
+                    error = str(e)
+                    error_offset = bytes_scanned - pending + e.start
+                    bytes_scanned += len(block)
+                    break
+                if not block:
+                    break
+                bytes_scanned += len(block)
+
+        return {
+            'valid': error is None,
+            'error': error,
+            'error_offset': error_offset,
+            'bytes_scanned': bytes_scanned,
+            'seconds': time.perf_counter() - start,
+        }
+
     @staticmethod
     def validate_encoding(file_path, encoding):
         """Validate if file can be read with specific encoding"""
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                f.read()
-            return True
+            return EncodingDetector.validate_encoding_report(file_path, encoding)['valid']
         except:
             return False
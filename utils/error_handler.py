@@ -1,3 +1,9 @@
+import logging
+
+from utils.instrumentation import Instrumentation
+
+logger = logging.getLogger(__name__)
+
 class ErrorHandler:
     ERROR_SOLUTIONS = {
         'UnicodeDecodeError': 'Try selecting a different encoding (UTF-8, Latin-1, ISO-8859-1)',
@@ -32,7 +38,10 @@ class ErrorHandler:
         error_type = type(error).__name__
         error_msg = str(error)
         
+        stage = Instrumentation.current_stage()
+        if stage:
+            context = f"{context} ({stage} stage)" if context else f"{stage} stage"
         log_message = f"[{error_type}] {context}: {error_msg}"
-        print(log_message)
+        logger.error(log_message, exc_info=error)
         
         return log_message
@@ -0,0 +1,182 @@
+import threading
+from collections import OrderedDict
+
+from utils.instrumentation import Instrumentation
+from utils.parse_cache import parse_cache
+
+class ExcelReader:
+    """Open a workbook once (read-only) and load its sheets on demand
+
+    Sheets are parsed from the already open workbook instead of re-reading
+    the file, and parsed sheets are cached by (file hash, sheet, options).
+    """
+
+    MAX_OPEN = 8
+
+    _readers = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, path, file_hash):
+        import pandas as pd
+
+        self.path = path
+        self.file_hash = file_hash
+        # pandas opens .xlsx through openpyxl with read_only=True, data_only=True
+        self.excel_file = pd.ExcelFile(path)
+        self.sheet_names = self.excel_file.sheet_names
+        # Read before any parse: pandas resets a read-only sheet's stored dimension when it parses it
+        self._dimensions = {sheet: self._stored_dimensions(sheet) for sheet in self.sheet_names}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def open(path, file_hash):
+        """Shared reader for a file, reused across reruns and sessions"""
+        with ExcelReader._lock:
+            reader = ExcelReader._readers.get(file_hash)
+            if reader is not None:
+                ExcelReader._readers.move_to_end(file_hash)
+                return reader
+            reader = ExcelReader(path, file_hash)
+            ExcelReader._readers[file_hash] = reader
+            while len(ExcelReader._readers) > ExcelReader.MAX_OPEN:
+                _, evicted = ExcelReader._readers.popitem(last=False)
+                evicted.close()
+            return reader
+
+    def dimensions(self, sheet):
+        """(rows, columns) from the sheet's stored dimension without parsing cells"""
+        return self._dimensions.get(sheet, (None, None))
+
+    def _stored_dimensions(self, sheet):
+        book = self.excel_file.book
+        if hasattr(book, 'sheet_by_name'):
+            ws = book.sheet_by_name(sheet)
+            return ws.nrows, ws.ncols
+        ws = book[sheet]
+        return ws.max_row, ws.max_column
+
+    def _parse(self, sheet, **options):
+        with self._lock, Instrumentation.stage('read') as stage:
+            df = self.excel_file.parse(sheet_name=sheet, **options)
+            stage['rows'] = len(df)
+            return df
+
+    def read_sheet(self, sheet, **options):
+        """Parse one full sheet, cached by (file hash, sheet, options)"""
+        return parse_cache.get_or_load(
+            self.file_hash, 'read_excel', {'sheet_name': sheet, **options},
+            lambda: self._parse(sheet, **options)
+        )
+
+    def preview(self, sheet, nrows=5, **options):
+        """Only the first nrows of a sheet; the rest of the sheet is never read"""
+        return self.read_sheet(sheet, nrows=nrows, **options)
+
+    def iter_sheets(self, sheets, **options):
+        """Yield (sheet, DataFrame) one sheet at a time"""
+        for sheet in sheets:
+            yield sheet, self.read_sheet(sheet, **options)
+
+    @staticmethod
+    def _kind(dtype):
+        import pandas as pd
+
+        if pd.api.types.is_bool_dtype(dtype):
+            return 'bool'
+        if pd.api.types.is_integer_dtype(dtype):
+            return 'int'
+        if pd.api.types.is_float_dtype(dtype):
+            return 'float'
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return 'datetime'
+        return 'string'
+
+    @staticmethod
+    def _merge_kinds(columns, df):
+        """Fold one sheet's column kinds into columns: int+float widens to float, any other clash is string"""
+        for col in df.columns:
+            kind = None if df[col].isna().all() else ExcelReader._kind(df[col].dtype)
+            previous = columns.get(col, kind)
+            if previous is None or previous == kind or kind is None:
+                columns[col] = previous or kind
+            elif {previous, kind} == {'int', 'float'}:
+                columns[col] = 'float'
+            else:
+                columns[col] = 'string'
+        return columns
+
+    def reconcile_schema(self, sheets, **options):
+        """Union of columns across sheets and one dtype kind per column
+
+        Kinds come from every row of each sheet (parsed one at a time), so a
+        value that doesn't fit, like text in a numeric column, makes the
+        column a string column instead of being coerced to null.
+        """
+        columns = {}
+        for sheet in sheets:
+            ExcelReader._merge_kinds(columns, self._parse(sheet, **options))
+        return {col: kind or 'string' for col, kind in columns.items()}
+
+    @staticmethod
+    def conform(df, schema):
+        """Reindex a sheet to the merged columns and cast it to the merged kinds
+
+        Casts are strict: with kinds from reconcile_schema every value fits,
+        and one that doesn't raises rather than turning into a null.
+        """
+        import pandas as pd
+
+        with Instrumentation.stage('transform', rows=len(df)):
+            df = df.reindex(columns=list(schema))
+            for col, kind in schema.items():
+                series = df[col]
+                if kind == 'string':
+                    df[col] = series.astype(object).where(series.isna(), series.astype(str))
+                elif kind == 'float':
+                    df[col] = pd.to_numeric(series).astype('float64')
+                elif kind == 'int' and series.isna().any():
+                    df[col] = series.astype('Int64')
+                elif kind == 'bool' and series.isna().any():
+                    df[col] = series.astype('boolean')
+                elif kind == 'datetime':
+                    df[col] = pd.to_datetime(series)
+        return df
+
+    def merge_to(self, sheets, output_path, output_fmt, progress_callback=None, **options):
+        """Stream the selected sheets, one at a time, into a single output file
+
+        Sheets are parsed twice, once for the schema and once to write, so
+        only one sheet is in memory at a time; a single sheet is parsed once.
+        """
+        from utils.conversion_utils import ConversionUtils
+
+        sink_class = ConversionUtils.CHUNK_SINKS.get(output_fmt)
+        if sink_class is None:
+            raise ValueError(f"Merged output not supported for '{output_fmt}'")
+
+        parsed = None
+        if len(sheets) == 1:
+            parsed = self._parse(sheets[0], **options)
+            schema = {col: kind or 'string' for col, kind in ExcelReader._merge_kinds({}, parsed).items()}
+        else:
+            schema = self.reconcile_schema(sheets, **options)
+        sink = sink_class(output_path)
+        rows = 0
+        try:
+            for sheet in sheets:
+                # Parsed outside the cache so only this one sheet is in memory
+                df = parsed if parsed is not None else self._parse(sheet, **options)
+                parsed = None
+                df = ExcelReader.conform(df, schema)
+                sink.write(df)
+                rows += len(df)
+                del df
+                if progress_callback:
+                    progress_callback(sheet, rows)
+        finally:
+            sink.close()
+        return {'rows': rows, 'columns': len(schema), 'schema': schema}
+
+    def close(self):
+        with self._lock:
+            self.excel_file.close()
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.file_manager import FileManager
+from utils.instrumentation import Instrumentation
+from utils.parse_cache import ParseCache
+
+class ExportCache:
+    """Output files generated on demand and reused per (data hash, format, options)
+
+    Nothing is encoded until a caller asks for a format; the result is written
+    once to temp/exports and handed back as a path, so downloads stream from
+    disk instead of holding payload bytes in memory.
+    """
+
+    MAX_ENTRIES = 64
+    EXTENSIONS = {
+        'csv': '.csv',
+        'excel': '.xlsx',
+        'json': '.json',
+        'jsonl': '.jsonl',
+        'parquet': '.parquet',
+        'feather': '.feather',
+    }
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or ExportCache.MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> [lock, sessions using it]; dropped when the last one is done
+        self._key_locks = {}
+
+    @staticmethod
+    def make_key(data_hash, output_fmt, options=None):
+        return ParseCache.make_key(data_hash, output_fmt, options)
+
+    @staticmethod
+    def path_for(key):
+        """Deterministic file name for a key under temp/exports"""
+        export_dir = FileManager.create_temp_directory() / "exports"
+        export_dir.mkdir(exist_ok=True)
+        digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32]
+        return export_dir / (digest + ExportCache.EXTENSIONS[key[1]])
+
+    @contextmanager
+    def _key_lock(self, key):
+        """Hold the lock for one key; it only exists while someone prepares that key"""
+        with self._lock:
+            held = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            held[1] += 1
+        try:
+            with held[0]:
+                yield
+        finally:
+            with self._lock:
+                held[1] -= 1
+                if not held[1]:
+                    del self._key_locks[key]
+
+    def get(self, data_hash, output_fmt, options=None):
+        """Entry for an already generated output, or None"""
+        key = ExportCache.make_key(data_hash, output_fmt, options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry['path'].exists():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def prepare(self, data_hash, output_fmt, writer, options=None):
+        """Generate the output with writer(path) unless it already exists
+
+        writer may return a stats dict, which is kept with the entry. Sessions
+        preparing the same key wait for each other, and the file only appears
+        under its final name once it is complete.
+        """
+        entry = self.get(data_hash, output_fmt, options)
+        if entry is not None:
+            return entry
+
+        key = ExportCache.make_key(data_hash, output_fmt, options)
+        with self._key_lock(key):
+            entry = self.get(data_hash, output_fmt, options)
+            if entry is not None:
+                return entry
+
+            path = ExportCache.path_for(key)
+            partial = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.part{path.suffix}")
+            start = time.perf_counter()
+            try:
+                with Instrumentation.stage('prepare') as stage:
+                    stats = writer(partial)
+                    stage['bytes_out'] = os.path.getsize(partial)
+                os.replace(partial, path)
+            except Exception:
+                if partial.exists():
+                    os.remove(partial)
+                raise
+            entry = {
+                'path': path,
+                'bytes': os.path.getsize(path),
+                'seconds': time.perf_counter() - start,
+                'stats': stats or {},
+            }
+            with self._lock:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    evicted_key, evicted = self._entries.popitem(last=False)
+                    if evicted['path'].exists():
+                        os.remove(evicted['path'])
+        return entry
+
+    @staticmethod
+    def write_frame(df, path, output_fmt, **options):
+        """Write a whole DataFrame in one of the supported formats"""
+        with Instrumentation.stage('serialize', rows=len(df)):
+            ExportCache._write_frame(df, path, output_fmt, **options)
+        return {'rows': len(df), 'columns': len(df.columns)}
+
+    @staticmethod
+    def _write_frame(df, path, output_fmt, **options):
+        if output_fmt == 'csv':
+            df.to_csv(path, index=False, **options)
+        elif output_fmt == 'excel':
+            from utils.format_handlers import ExcelStreamWriter
+
+            writer = ExcelStreamWriter(path)
+            try:
+                writer.write(df)
+            finally:
+                writer.close()
+        elif output_fmt in ('json', 'jsonl'):
+            from utils.conversion_utils import ConversionUtils
+
+            _, error = ConversionUtils.write_json(df, path, lines=output_fmt == 'jsonl', **options)
+            if error:
+                raise ValueError(error)
+        elif output_fmt == 'parquet':
+            df.to_parquet(path, index=False, **options)
+        elif output_fmt == 'feather':
+            df.reset_index(drop=True).to_feather(path, **options)
+        else:
+            raise ValueError(f"Unsupported output format '{output_fmt}'")
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                if entry['path'].exists():
+                    os.remove(entry['path'])
+            self._entries.clear()
+
+
+export_cache = ExportCache()
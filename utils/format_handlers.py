@@ -1,46 +1,492 @@
-import pandas as pd
+import json
+import os
+import re
+import time
+
+from utils.instrumentation import Instrumentation
 
 class CSVHandler:
     @staticmethod
+    @Instrumentation.reader
     def read(file_path, **kwargs):
+        import pandas as pd
+
         return pd.read_csv(file_path, **kwargs)
     
     @staticmethod
+    @Instrumentation.writer
     def write(df, output_path, **kwargs):
         df.to_csv(output_path, index=False, **kwargs)
 
 class ExcelHandler:
     @staticmethod
+    @Instrumentation.reader
     def read(file_path, **kwargs):
+        import pandas as pd
+
         return pd.read_excel(file_path, **kwargs)
     
     @staticmethod
+    @Instrumentation.writer
     def write(df, output_path, **kwargs):
         df.to_excel(output_path, index=False, **kwargs)
 
+    @staticmethod
+    def write_streaming(chunks, output_path, sheet_name='Sheet1'):
+        """Write an iterable of DataFrame chunks with constant memory"""
+        writer = ExcelStreamWriter(output_path, sheet_name=sheet_name)
+        for chunk in chunks:
+            writer.write(chunk)
+        writer.close()
+        return writer
+
+class ExcelStreamWriter:
+    """Write DataFrame chunks to .xlsx through openpyxl's write-only mode
+
+    Rows are serialized as they arrive instead of building the whole workbook
+    object graph, and output rolls over to a new sheet at Excel's row limit.
+    """
+
+    MAX_ROWS = 1_048_576
+
+    def __init__(self, output, sheet_name='Sheet1', max_rows=None):
+        from openpyxl import Workbook
+
+        self.output = output
+        self.sheet_name = sheet_name
+        self.max_rows = max_rows or ExcelStreamWriter.MAX_ROWS
+        self.workbook = Workbook(write_only=True)
+        self.sheet = None
+        self.sheet_rows = 0
+        self.sheets = 0
+        self.columns = None
+        self.rows = 0
+
+    def _new_sheet(self):
+        self.sheets += 1
+        title = self.sheet_name if self.sheets == 1 else f"{self.sheet_name}_{self.sheets}"
+        self.sheet = self.workbook.create_sheet(title=title[:31])
+        self.sheet.append(self.columns)
+        self.sheet_rows = 1
+
+    def write(self, chunk):
+        with Instrumentation.stage('serialize', rows=len(chunk)):
+            self._write(chunk)
+
+    def _write(self, chunk):
+        import pandas as pd
+
+        if self.columns is None:
+            self.columns = [str(c) for c in chunk.columns]
+            self._new_sheet()
+        if chunk.empty:
+            return
+        for col in chunk.columns:
+            if isinstance(chunk[col].dtype, pd.DatetimeTZDtype):
+                # Excel has no time zones
+                chunk = chunk.assign(**{col: chunk[col].dt.tz_localize(None)})
+            elif chunk[col].dtype == object and chunk[col].map(lambda v: isinstance(v, (list, dict))).any():
+                # Nested values (e.g. from JSON) don't fit in a cell; store them as JSON text
+                chunk = chunk.assign(**{col: chunk[col].map(
+                    lambda v: json.dumps(v, default=str) if isinstance(v, (list, dict)) else v
+                )})
+        values = chunk.astype(object).where(chunk.notna(), None).values.tolist()
+        start = 0
+        while start < len(values):
+            if self.sheet_rows >= self.max_rows:
+                self._new_sheet()
+            stop = start + self.max_rows - self.sheet_rows
+            for row in values[start:stop]:
+                self.sheet.append(row)
+            self.sheet_rows += len(values[start:stop])
+            start = stop
+        self.rows += len(values)
+
+    def close(self):
+        with Instrumentation.stage('serialize'):
+            if self.columns is None:
+                self.workbook.create_sheet(title=self.sheet_name)
+            self.workbook.save(self.output)
+
+
 class JSONHandler:
     @staticmethod
+    @Instrumentation.reader
     def read(file_path, **kwargs):
+        import pandas as pd
+
         return pd.read_json(file_path, **kwargs)
     
     @staticmethod
+    @Instrumentation.writer
     def write(df, output_path, **kwargs):
         df.to_json(output_path, **kwargs)
 
 class ParquetHandler:
     @staticmethod
+    @Instrumentation.reader
     def read(file_path, **kwargs):
+        import pandas as pd
+
         return pd.read_parquet(file_path, **kwargs)
     
     @staticmethod
-    def write(df, output_path, **kwargs):
+    @Instrumentation.writer
+    def write(df, output_path, profile=None, **kwargs):
+        if profile is not None:
+            kwargs = {**ParquetProfile.write_table_options(profile), **kwargs}
         df.to_parquet(output_path, **kwargs)
 
+class ParquetProfile:
+    """Parquet writer settings (row groups, pages, encodings, compression, statistics)
+
+    A profile is a plain dict of the keys in DEFAULTS, usually a preset with
+    a few overrides. use_dictionary and write_statistics take True/False or
+    a list of column names; bloom_filter_columns lists columns to index.
+    """
+
+    DEFAULTS = {
+        'compression': 'snappy',
+        'compression_level': None,
+        'row_group_rows': None,
+        'data_page_size': None,
+        'use_dictionary': True,
+        'write_statistics': True,
+        'write_page_index': False,
+        'bloom_filter_columns': [],
+    }
+
+    PRESETS = {
+        'default': {},
+        'fast write': {
+            'compression': 'lz4',
+            'use_dictionary': False,
+            'write_statistics': False,
+            'row_group_rows': 1_000_000,
+        },
+        'small file': {
+            'compression': 'zstd',
+            'compression_level': 9,
+            'row_group_rows': 1_000_000,
+            'data_page_size': 1024 * 1024,
+        },
+        'fast scan': {
+            'compression': 'snappy',
+            'row_group_rows': 128 * 1024,
+            'data_page_size': 256 * 1024,
+            'write_page_index': True,
+        },
+    }
+
+    @staticmethod
+    def resolve(preset='default', **overrides):
+        """Preset settings with any non-None overrides applied"""
+        if preset not in ParquetProfile.PRESETS:
+            raise ValueError(f"Unknown Parquet profile '{preset}'")
+        settings = {**ParquetProfile.DEFAULTS, **ParquetProfile.PRESETS[preset]}
+        settings.update({k: v for k, v in overrides.items() if v is not None})
+        return settings
+
+    @staticmethod
+    def supports(option):
+        """Whether the installed pyarrow's ParquetWriter accepts an option"""
+        import inspect
+        import pyarrow.parquet as pq
+
+        return option in inspect.signature(pq.ParquetWriter.__init__).parameters
+
+    @staticmethod
+    def writer_options(profile):
+        """Keyword arguments for pyarrow.parquet.ParquetWriter"""
+        settings = {**ParquetProfile.DEFAULTS, **(profile or {})}
+        compression = settings['compression'] or 'none'
+        options = {
+            'compression': compression,
+            'use_dictionary': settings['use_dictionary'],
+            'write_statistics': settings['write_statistics'],
+        }
+        if settings['compression_level'] is not None and compression not in ('none', 'snappy', 'lz4'):
+            options['compression_level'] = settings['compression_level']
+        if settings['data_page_size']:
+            options['data_page_size'] = settings['data_page_size']
+        if settings['write_page_index']:
+            options['write_page_index'] = True
+        if settings['bloom_filter_columns']:
+            if not ParquetProfile.supports('bloom_filter_options'):
+                raise ValueError("Bloom filters need a newer pyarrow")
+            options['bloom_filter_options'] = {col: True for col in settings['bloom_filter_columns']}
+        return options
+
+    @staticmethod
+    def write_table_options(profile):
+        """Keyword arguments for pyarrow.parquet.write_table / DataFrame.to_parquet"""
+        options = ParquetProfile.writer_options(profile)
+        row_group_rows = (profile or {}).get('row_group_rows')
+        if row_group_rows:
+            options['row_group_size'] = row_group_rows
+        return options
+
+    @staticmethod
+    def describe(path):
+        """Size and layout of a written Parquet file, read from its footer"""
+        import pyarrow.parquet as pq
+
+        metadata = pq.ParquetFile(path).metadata
+        codecs = {
+            metadata.row_group(0).column(i).compression for i in range(metadata.num_columns)
+        } if metadata.num_row_groups else set()
+        return {
+            'bytes': os.path.getsize(path),
+            'rows': metadata.num_rows,
+            'row_groups': metadata.num_row_groups,
+            'columns': metadata.num_columns,
+            'codecs': sorted(codecs),
+        }
+
 class FeatherHandler:
     @staticmethod
+    @Instrumentation.reader
     def read(file_path, **kwargs):
+        import pandas as pd
+
         return pd.read_feather(file_path, **kwargs)
     
     @staticmethod
+    @Instrumentation.writer
     def write(df, output_path, **kwargs):
         df.to_feather(output_path, **kwargs)
+
+class ArrowBatchWriter:
+    """Write Arrow record batches to Parquet or Feather, regrouping them into row groups
+
+    Parquet row groups hold profile['row_group_rows'] rows when set,
+    otherwise about ROW_GROUP_BYTES of data.
+    """
+
+    ROW_GROUP_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, output_path, output_fmt, schema, compression=None, profile=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.schema = schema
+        self.row_group_rows = None
+        if output_fmt == 'parquet':
+            options = ParquetProfile.writer_options({'compression': compression, **(profile or {})})
+            self.row_group_rows = (profile or {}).get('row_group_rows')
+            self.writer = pq.ParquetWriter(output_path, schema, **options)
+        elif output_fmt == 'feather':
+            if compression not in ('lz4', 'zstd'):
+                compression = None
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            self.writer = pa.ipc.new_file(str(output_path), schema, options=options)
+        else:
+            raise ValueError(f"Arrow output not supported for '{output_fmt}'")
+        self.pending = []
+        self.pending_bytes = 0
+        self.pending_rows = 0
+
+    def _flush(self, final=False):
+        import pyarrow as pa
+
+        table = pa.Table.from_batches(self.pending, schema=self.schema)
+        self.pending = []
+        if not self.row_group_rows:
+            self.writer.write_table(table)
+        else:
+            # Write whole row groups only; the remainder waits for the next batches
+            cut = table.num_rows if final else table.num_rows - table.num_rows % self.row_group_rows
+            if cut:
+                self.writer.write_table(table.slice(0, cut), row_group_size=self.row_group_rows)
+            if cut < table.num_rows:
+                self.pending = table.slice(cut).to_batches()
+        self.pending_bytes = sum(b.nbytes for b in self.pending)
+        self.pending_rows = sum(b.num_rows for b in self.pending)
+
+    def write_batch(self, batch):
+        with Instrumentation.stage('serialize', rows=batch.num_rows):
+            self._add(batch)
+
+    def _add(self, batch):
+        self.pending.append(batch)
+        self.pending_bytes += batch.nbytes
+        self.pending_rows += batch.num_rows
+        # Group small batches into reasonably sized row groups
+        if self.row_group_rows:
+            full = self.pending_rows >= self.row_group_rows
+        else:
+            full = self.pending_bytes >= ArrowBatchWriter.ROW_GROUP_BYTES
+        if full:
+            self._flush()
+
+    def close(self):
+        with Instrumentation.stage('serialize'):
+            if self.pending:
+                self._flush(final=True)
+            self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ArrowCSVHandler:
+    """Stream CSV straight into Parquet/Feather with pyarrow, skipping pandas"""
+
+    BLOCK_SIZE = 16 * 1024 * 1024
+
+    # Reader dtype names the page accepts, mapped to Arrow types
+    TYPE_ALIASES = {
+        'int64': 'int64', 'Int64': 'int64', 'int32': 'int32', 'Int32': 'int32',
+        'float64': 'float64', 'Float64': 'float64', 'float32': 'float32',
+        'bool': 'bool', 'boolean': 'bool',
+        'str': 'string', 'string': 'string', 'object': 'string',
+        'datetime64[ns]': 'timestamp[ns]', 'datetime64[us]': 'timestamp[us]',
+    }
+
+    _COLUMN_ERROR = re.compile(r'In CSV column #(\d+)')
+
+    @staticmethod
+    def arrow_options(read_options):
+        """Translate pandas read_csv options; returns (options, None) or (None, reason)"""
+        import pyarrow as pa
+
+        opts = dict(read_options or {})
+        sep = opts.pop('sep', ',')
+        if sep is None or len(sep) != 1:
+            return None, 'multi-character or regex delimiter'
+        if opts.pop('thousands', None):
+            return None, 'thousands separator'
+        if (opts.pop('decimal', '.') or '.') != '.':
+            return None, 'decimal separator'
+        header = opts.pop('header', 0)
+        if header not in (0, None, 'infer'):
+            return None, 'header row other than the first'
+        skip_rows = opts.pop('skiprows', 0) or 0
+        if not isinstance(skip_rows, int):
+            return None, 'skiprows list'
+
+        def arrow_name(col):
+            # Arrow reads header-less columns as f0, f1, ...; pandas (and these options) use 0, 1, ...
+            return f"f{col}" if header is None and str(col).isdigit() else str(col)
+
+        column_types = {}
+        for col, dtype in (opts.pop('dtype', None) or {}).items():
+            alias = ArrowCSVHandler.TYPE_ALIASES.get(str(dtype))
+            if alias is None:
+                return None, f"dtype '{dtype}'"
+            column_types[arrow_name(col)] = pa.type_for_alias(alias)
+        parse_dates = opts.pop('parse_dates', None) or []
+        if not isinstance(parse_dates, (list, tuple)):
+            return None, 'parse_dates'
+        for col in parse_dates:
+            column_types.setdefault(arrow_name(col), pa.timestamp('ns'))
+
+        na_values = opts.pop('na_values', None)
+        keep_default_na = opts.pop('keep_default_na', True)
+        encoding = opts.pop('encoding', None) or 'utf-8'
+        quotechar = opts.pop('quotechar', '"') or '"'
+        opts.pop('doublequote', None)
+        if opts:
+            return None, f"option(s) {', '.join(sorted(opts))}"
+
+        null_values = list(na_values or [])
+        if keep_default_na:
+            null_values += ['', 'NA', 'N/A', 'NaN', 'nan', 'NULL', 'null', 'None', '#N/A']
+
+        return {
+            'delimiter': sep,
+            'quote_char': quotechar,
+            'encoding': encoding,
+            'skip_rows': skip_rows,
+            'autogenerate_column_names': header is None,
+            'column_types': column_types,
+            'null_values': null_values,
+        }, None
+
+    @staticmethod
+    def _open(input_path, options, column_types):
+        import pyarrow.csv as pv
+
+        return pv.open_csv(
+            input_path,
+            read_options=pv.ReadOptions(
+                use_threads=True,
+                block_size=ArrowCSVHandler.BLOCK_SIZE,
+                skip_rows=options['skip_rows'],
+                autogenerate_column_names=options['autogenerate_column_names'],
+                encoding=options['encoding'],
+            ),
+            parse_options=pv.ParseOptions(delimiter=options['delimiter'], quote_char=options['quote_char']),
+            convert_options=pv.ConvertOptions(
+                column_types=column_types,
+                null_values=options['null_values'],
+                strings_can_be_null=True,
+            ),
+        )
+
+    @staticmethod
+    def _write_stream(input_path, output_path, output_fmt, options, column_types, compression, preview_rows=0,
+                      profile=None):
+        import pyarrow as pa
+
+        with Instrumentation.stage('read'):
+            # open_csv already reads and parses the first block
+            reader = ArrowCSVHandler._open(input_path, options, column_types)
+        schema = reader.schema
+        if options['autogenerate_column_names']:
+            # Name header-less columns 0, 1, ... like the pandas engine does
+            schema = pa.schema([field.with_name(str(i)) for i, field in enumerate(schema)])
+        stats = {'rows': 0, 'batches': 0, 'columns': len(schema), 'preview': None}
+        with ArrowBatchWriter(output_path, output_fmt, schema, compression, profile) as writer:
+            for batch in Instrumentation.timed_iter(reader, 'read'):
+                if options['autogenerate_column_names']:
+                    batch = pa.RecordBatch.from_arrays(batch.columns, schema=schema)
+                if preview_rows and stats['preview'] is None:
+                    stats['preview'] = batch.slice(0, preview_rows).to_pandas()
+                writer.write_batch(batch)
+                stats['rows'] += batch.num_rows
+                stats['batches'] += 1
+        return stats
+
+    @staticmethod
+    def convert(input_path, output_path, output_fmt, read_options=None, compression='snappy', preview_rows=0,
+                profile=None):
+        """Convert a CSV file to Parquet/Feather batch by batch
+
+        Arrow infers column types from the first block. If a later block
+        doesn't fit, the column is widened (int -> float -> string) and the
+        conversion restarts. profile holds ParquetProfile settings for
+        Parquet output; its compression takes precedence.
+        """
+        import pyarrow as pa
+
+        options, reason = ArrowCSVHandler.arrow_options(read_options)
+        if options is None:
+            raise ValueError(f"pyarrow CSV reader does not support {reason}")
+        column_types = dict(options['column_types'])
+        start = time.perf_counter()
+        while True:
+            try:
+                stats = ArrowCSVHandler._write_stream(
+                    input_path, output_path, output_fmt, options, column_types, compression, preview_rows, profile
+                )
+                break
+            except pa.ArrowInvalid as e:
+                match = ArrowCSVHandler._COLUMN_ERROR.search(str(e))
+                if not match:
+                    raise
+                schema = ArrowCSVHandler._open(input_path, options, column_types).schema
+                field = schema.field(int(match.group(1)))
+                if field.name in options['column_types'] or pa.types.is_string(field.type):
+                    raise
+                widened = pa.float64() if pa.types.is_integer(field.type) else pa.string()
+                column_types[field.name] = widened
+
+        stats['seconds'] = time.perf_counter() - start
+        stats['bytes_out'] = os.path.getsize(output_path)
+        stats['engine'] = 'pyarrow'
+        Instrumentation.record('read', bytes_in=Instrumentation.size_of(input_path))
+        Instrumentation.record('serialize', bytes_out=stats['bytes_out'])
+        return stats
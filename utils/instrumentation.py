@@ -0,0 +1,217 @@
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_active_trace = contextvars.ContextVar('conversion_trace', default=None)
+
+
+class ConversionTrace:
+    """Duration, rows, bytes in/out and memory peak of one conversion, per stage
+
+    Stage times are exclusive: while a nested stage runs the enclosing
+    stage's clock is paused, so the stages add up to the traced total.
+    Peaks come from tracemalloc, which sees numpy/pandas/Python allocations
+    but not Arrow's own memory pool, and are approximate when several
+    conversions trace at the same time.
+    """
+
+    STAGES = ['read', 'transform', 'serialize', 'prepare']
+
+    def __init__(self, label='', memory=False):
+        self.label = label
+        self.memory = memory
+        self.stages = {}
+        self.seconds = None
+        self.peak_bytes = None
+        self._peak = 0
+        self._stack = []
+        self._start = time.perf_counter()
+
+    def add(self, stage, seconds=0.0, rows=0, bytes_in=0, bytes_out=0, peak_bytes=None, calls=0):
+        entry = self.stages.setdefault(stage, {
+            'stage': stage, 'calls': 0, 'seconds': 0.0, 'rows': 0,
+            'bytes_in': 0, 'bytes_out': 0, 'peak_bytes': None,
+        })
+        entry['calls'] += calls
+        entry['seconds'] += seconds
+        entry['rows'] += rows or 0
+        entry['bytes_in'] += bytes_in or 0
+        entry['bytes_out'] += bytes_out or 0
+        if peak_bytes is not None:
+            entry['peak_bytes'] = max(entry['peak_bytes'] or 0, peak_bytes)
+
+    def summary(self):
+        """Stage dicts in pipeline order, plus 'other' for time outside any stage"""
+        order = {stage: i for i, stage in enumerate(ConversionTrace.STAGES)}
+        rows = sorted(self.stages.values(), key=lambda e: order.get(e['stage'], len(order)))
+        rows = [dict(e) for e in rows]
+        if self.seconds is not None:
+            other = self.seconds - sum(e['seconds'] for e in rows)
+            if other > 0.0005:
+                rows.append({'stage': 'other', 'calls': 0, 'seconds': other, 'rows': 0,
+                             'bytes_in': 0, 'bytes_out': 0, 'peak_bytes': None})
+        return rows
+
+
+class Instrumentation:
+    """Stage hooks for conversions; they cost next to nothing outside an active trace"""
+
+    _tracing = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def current():
+        return _active_trace.get()
+
+    @staticmethod
+    def current_stage():
+        trace = _active_trace.get()
+        return trace._stack[-1]['stage'] if trace is not None and trace._stack else None
+
+    @staticmethod
+    def size_of(target):
+        """Size in bytes of a file path or an in-memory buffer, 0 if unknown"""
+        if isinstance(target, (str, os.PathLike)):
+            try:
+                return os.path.getsize(target)
+            except OSError:
+                return 0
+        getbuffer = getattr(target, 'getbuffer', None)
+        return getbuffer().nbytes if getbuffer else 0
+
+    @staticmethod
+    @contextmanager
+    def trace(label='', memory=False):
+        """Collect the stages run inside this block into a ConversionTrace
+
+        memory=True turns on tracemalloc, which slows allocation-heavy
+        writers such as to_csv several times over.
+        """
+        trace = ConversionTrace(label, memory)
+        if memory:
+            with Instrumentation._lock:
+                if Instrumentation._tracing == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    Instrumentation._tracing = 1
+                elif Instrumentation._tracing:
+                    Instrumentation._tracing += 1
+                else:
+                    # Someone else started tracemalloc; leave it to them
+                    trace.memory = tracemalloc.is_tracing()
+            if trace.memory:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                trace._peak = base
+        token = _active_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _active_trace.reset(token)
+            trace.seconds = time.perf_counter() - trace._start
+            if trace.memory:
+                trace.peak_bytes = max(max(trace._peak, tracemalloc.get_traced_memory()[1]) - base, 0)
+                with Instrumentation._lock:
+                    if Instrumentation._tracing:
+                        Instrumentation._tracing -= 1
+                        if Instrumentation._tracing == 0:
+                            tracemalloc.stop()
+            logger.info(
+                "%s: %.3fs (%s)", label or 'conversion', trace.seconds,
+                ', '.join(f"{e['stage']} {e['seconds']:.3f}s" for e in trace.summary()),
+            )
+
+    @staticmethod
+    @contextmanager
+    def stage(name, rows=0, bytes_in=0, bytes_out=0):
+        """Time a stage; the yielded dict takes 'rows', 'bytes_in' and 'bytes_out'
+
+        A stage nested directly in one of the same name is folded into it.
+        """
+        trace = _active_trace.get()
+        if trace is None or (trace._stack and trace._stack[-1]['stage'] == name):
+            yield {}
+            return
+
+        memory = trace.memory
+        now = time.perf_counter()
+        if trace._stack:
+            parent = trace._stack[-1]
+            parent['seconds'] += now - parent['resumed']
+            if memory:
+                parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+        elif memory:
+            trace._peak = max(trace._peak, tracemalloc.get_traced_memory()[1])
+        frame = {'stage': name, 'rows': rows, 'bytes_in': bytes_in, 'bytes_out': bytes_out,
+                 'seconds': 0.0, 'peak': 0, 'base': 0}
+        if memory:
+            tracemalloc.reset_peak()
+            frame['base'] = tracemalloc.get_traced_memory()[0]
+        trace._stack.append(frame)
+        frame['resumed'] = time.perf_counter()
+        try:
+            yield frame
+        finally:
+            now = time.perf_counter()
+            trace._stack.pop()
+            frame['seconds'] += now - frame['resumed']
+            peak = None
+            if memory:
+                top = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                peak = max(top - frame['base'], 0)
+            trace.add(name, frame['seconds'], frame['rows'], frame['bytes_in'], frame['bytes_out'], peak, calls=1)
+            if trace._stack:
+                parent = trace._stack[-1]
+                parent['resumed'] = now
+                if memory:
+                    parent['peak'] = max(parent['peak'], top)
+            elif memory:
+                trace._peak = max(trace._peak, top)
+
+    @staticmethod
+    def record(stage, rows=0, bytes_in=0, bytes_out=0):
+        """Add counts to a stage without timing anything"""
+        trace = _active_trace.get()
+        if trace is not None:
+            trace.add(stage, rows=rows, bytes_in=bytes_in, bytes_out=bytes_out)
+
+    @staticmethod
+    def timed_iter(iterable, stage='read'):
+        """Yield from iterable, timing each next() as the given stage"""
+        iterator = iter(iterable)
+        while True:
+            with Instrumentation.stage(stage) as frame:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                frame['rows'] = getattr(item, 'num_rows', None) or len(item)
+            yield item
+
+    @staticmethod
+    def reader(func):
+        """Decorate read(file_path, ...) as a 'read' stage"""
+        @functools.wraps(func)
+        def wrapper(file_path, *args, **kwargs):
+            with Instrumentation.stage('read', bytes_in=Instrumentation.size_of(file_path)) as frame:
+                df = func(file_path, *args, **kwargs)
+                frame['rows'] = len(df) if hasattr(df, '__len__') else 0
+            return df
+        return wrapper
+
+    @staticmethod
+    def writer(func):
+        """Decorate write(df, output_path, ...) as a 'serialize' stage"""
+        @functools.wraps(func)
+        def wrapper(df, output_path, *args, **kwargs):
+            with Instrumentation.stage('serialize', rows=len(df)) as frame:
+                result = func(df, output_path, *args, **kwargs)
+                frame['bytes_out'] = Instrumentation.size_of(output_path)
+            return result
+        return wrapper
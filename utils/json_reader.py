@@ -0,0 +1,228 @@
+import json
+import re
+from itertools import islice
+from pathlib import Path
+
+from utils.instrumentation import Instrumentation
+
+class JSONReader:
+    """Read JSON and JSON Lines in chunks, flattening nested records into columns
+
+    JSON Lines files and top-level arrays ('records' / 'values' orient) are
+    parsed incrementally, so only one chunk of rows is in memory at a time.
+    The other orients describe the whole table in one object and are read
+    with pandas in one go.
+    """
+
+    CHUNK_ROWS = 50_000
+    BLOCK_SIZE = 1024 * 1024
+    LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+    STREAMING_ORIENTS = ('records', 'values')
+    ORIENTS = ['records', 'split', 'index', 'columns', 'values']
+
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    @staticmethod
+    def is_lines(path):
+        """JSON Lines by extension, otherwise by whether the first line is a complete value"""
+        if Path(path).suffix.lower() in JSONReader.LINES_EXTENSIONS:
+            return True
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            first = ''
+            for line in f:
+                if line.strip():
+                    first = line.strip()
+                    break
+            rest = f.read(JSONReader.BLOCK_SIZE).strip()
+        if not first.startswith('{') or not rest:
+            return False
+        try:
+            json.loads(first)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def iter_lines(path, chunksize=None):
+        """Yield lists of parsed JSON Lines records, chunksize records at a time"""
+        chunksize = chunksize or JSONReader.CHUNK_ROWS
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            lines = (line for line in f if line.strip())
+            while True:
+                batch = list(islice(lines, chunksize))
+                if not batch:
+                    return
+                # One decoder call per chunk instead of one per line
+                yield json.loads('[' + ','.join(batch) + ']')
+
+    @staticmethod
+    def iter_array(path, block_size=None):
+        """Yield the items of a top-level JSON array without loading the whole document"""
+        block_size = block_size or JSONReader.BLOCK_SIZE
+        decoder = json.JSONDecoder()
+        whitespace = JSONReader.WHITESPACE
+
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            buffer = f.read(block_size)
+            pos = whitespace.match(buffer).end()
+            if not buffer[pos:pos + 1] == '[':
+                raise ValueError("Top-level JSON value is not an array")
+            pos += 1
+            eof = False
+            expect_item = True
+            while True:
+                pos = whitespace.match(buffer, pos).end()
+                if pos == len(buffer):
+                    if eof:
+                        raise ValueError("Unterminated JSON array")
+                    more = f.read(block_size)
+                    buffer, pos, eof = buffer[pos:] + more, 0, not more
+                    continue
+
+                char = buffer[pos]
+                if char == ']':
+                    return
+                if char == ',' and not expect_item:
+                    pos += 1
+                    expect_item = True
+                    continue
+                if not expect_item:
+                    raise ValueError(f"Expected ',' or ']' in JSON array, found {char!r}")
+
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                    # A number cut off by the block boundary may continue in the next block
+                    complete = eof or (end < len(buffer) and buffer[end] in ', \t\n\r]')
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    complete = False
+                if not complete:
+                    # Grow the read size so very large items aren't re-parsed block by block
+                    more = f.read(max(block_size, len(buffer) - pos))
+                    buffer, pos, eof = buffer[pos:] + more, 0, not more
+                    continue
+
+                yield item
+                pos = end
+                expect_item = False
+
+    @staticmethod
+    def to_frame(records, orient='records', flatten=True, sep='.'):
+        """Build one DataFrame from a batch of parsed items"""
+        import pandas as pd
+
+        with Instrumentation.stage('transform', rows=len(records)):
+            if orient == 'values':
+                return pd.DataFrame(records)
+            if flatten:
+                return pd.json_normalize(records, sep=sep)
+            return pd.DataFrame.from_records(records)
+
+    @staticmethod
+    def flatten_frame(df, sep='.'):
+        """Expand columns holding dicts into one column per nested key"""
+        import pandas as pd
+
+        for col in list(df.columns):
+            values = df[col]
+            if values.dtype != object or not values.map(lambda v: isinstance(v, dict)).any():
+                continue
+            nested = pd.json_normalize(
+                [v if isinstance(v, dict) else {} for v in values], sep=sep
+            )
+            nested.columns = [f"{col}{sep}{c}" for c in nested.columns]
+            nested.index = df.index
+            position = df.columns.get_loc(col)
+            df = pd.concat([df.iloc[:, :position], nested, df.iloc[:, position + 1:]], axis=1)
+        return df
+
+    @staticmethod
+    def iter_chunks(path, orient='records', lines=None, chunksize=None, flatten=True, sep='.'):
+        """Yield DataFrames of up to chunksize rows in the requested orient"""
+        import pandas as pd
+
+        chunksize = chunksize or JSONReader.CHUNK_ROWS
+        if lines is None:
+            lines = JSONReader.is_lines(path)
+
+        if lines:
+            for batch in JSONReader.iter_lines(path, chunksize):
+                yield JSONReader.to_frame(batch, 'records', flatten, sep)
+            return
+
+        if orient in JSONReader.STREAMING_ORIENTS:
+            items = JSONReader.iter_array(path)
+            while True:
+                batch = list(islice(items, chunksize))
+                if not batch:
+                    return
+                yield JSONReader.to_frame(batch, orient, flatten, sep)
+
+        # split / index / columns need the whole document
+        df = pd.read_json(path, orient=orient)
+        if flatten:
+            df = JSONReader.flatten_frame(df, sep)
+        for start in range(0, max(len(df), 1), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+    @staticmethod
+    def _record_keys(record, keys, sep, prefix=''):
+        """Add a record's columns to keys in json_normalize's order: scalars first, then nested keys"""
+        nested = []
+        for key, value in record.items():
+            name = f"{prefix}{sep}{key}" if prefix else key
+            if isinstance(value, dict):
+                nested.append((name, value))
+            else:
+                keys[name] = None
+        for name, value in nested:
+            JSONReader._record_keys(value, keys, sep, name)
+
+    @staticmethod
+    def scan_columns(path, orient='records', lines=None, flatten=True, sep='.'):
+        """Every column iter_chunks will produce, from a pass over the raw records
+
+        Needed by outputs that fix their header or schema with the first
+        chunk. Returns None for orients read in one piece, whose chunks all
+        share the same columns anyway.
+        """
+        if lines is None:
+            lines = JSONReader.is_lines(path)
+        if lines:
+            items = (record for batch in JSONReader.iter_lines(path) for record in batch)
+        elif orient in JSONReader.STREAMING_ORIENTS:
+            items = JSONReader.iter_array(path)
+        else:
+            return None
+
+        with Instrumentation.stage('read'):
+            if orient == 'values' and not lines:
+                return list(range(max((len(item) for item in items), default=0)))
+            keys = {}
+            for record in items:
+                if not isinstance(record, dict):
+                    continue
+                if flatten:
+                    JSONReader._record_keys(record, keys, sep)
+                else:
+                    keys.update(dict.fromkeys(record))
+            return list(keys)
+
+    @staticmethod
+    def read(path, orient='records', lines=None, nrows=None, flatten=True, sep='.'):
+        """Read into one DataFrame, stopping after nrows when given"""
+        import pandas as pd
+
+        chunksize = min(nrows, JSONReader.CHUNK_ROWS) if nrows else None
+        chunks = []
+        rows = 0
+        for chunk in JSONReader.iter_chunks(path, orient, lines, chunksize, flatten, sep):
+            chunks.append(chunk)
+            rows += len(chunk)
+            if nrows and rows >= nrows:
+                break
+        if not chunks:
+            return pd.DataFrame()
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        return df.head(nrows) if nrows else df
@@ -0,0 +1,127 @@
+from utils.instrumentation import Instrumentation
+
+class MemoryOptimizer:
+    """Shrink loaded DataFrames: downcast numerics, compact repeated strings
+
+    Settings are a plain dict (see DEFAULTS) so they can be part of cache
+    keys. The per-column before/after report is kept in
+    df.attrs['memory_report'].
+    """
+
+    DEFAULTS = {
+        'downcast': True,
+        'categories': True,
+        'arrow_strings': False,
+        'category_ratio': 0.5,
+    }
+
+    # pandas readers that accept dtype_backend
+    ARROW_READERS = ('read_csv', 'read_json', 'read_excel', 'read_parquet', 'read_feather')
+
+    @staticmethod
+    def from_settings(user_settings):
+        """Optimizer settings from the app's user_settings, or None when disabled"""
+        user_settings = user_settings or {}
+        if not user_settings.get('optimize_memory'):
+            return None
+        return {
+            **MemoryOptimizer.DEFAULTS,
+            'arrow_strings': bool(user_settings.get('arrow_dtypes')),
+            'category_ratio': user_settings.get('category_ratio', MemoryOptimizer.DEFAULTS['category_ratio']),
+        }
+
+    @staticmethod
+    def reader_options(reader, settings):
+        """Extra reader kwargs, i.e. dtype_backend='pyarrow' when Arrow dtypes are on"""
+        if settings and settings.get('arrow_strings') and reader in MemoryOptimizer.ARROW_READERS:
+            return {'dtype_backend': 'pyarrow'}
+        return {}
+
+    @staticmethod
+    def downcast(series):
+        """Smallest integer type that holds the values; float32 only when lossless"""
+        import numpy as np
+        import pandas as pd
+
+        if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+            return series
+        if isinstance(series.dtype, pd.ArrowDtype):
+            return series
+        if pd.api.types.is_integer_dtype(series):
+            return pd.to_numeric(series, downcast='integer')
+        if pd.api.types.is_float_dtype(series):
+            narrowed = series.astype('float32' if series.dtype == np.float64 else 'Float32')
+            if narrowed.astype(series.dtype).equals(series):
+                return narrowed
+        return series
+
+    @staticmethod
+    def compact_strings(series, category_ratio, arrow_strings=False):
+        """Low-cardinality text becomes categorical; the rest optionally Arrow strings"""
+        import numpy as np
+        import pandas as pd
+
+        if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            return series
+        if isinstance(series.dtype, pd.CategoricalDtype) or len(series) == 0:
+            return series
+        try:
+            unique = series.nunique(dropna=True)
+        except TypeError:
+            # Lists / dicts (e.g. nested JSON) aren't hashable
+            return series
+        if unique / len(series) <= category_ratio:
+            return series.astype('category')
+        if arrow_strings and pd.api.types.is_object_dtype(series):
+            if series.map(lambda v: isinstance(v, str) or v is None or v is np.nan).all():
+                return series.astype('string[pyarrow]')
+        return series
+
+    @staticmethod
+    def optimize(df, downcast=True, categories=True, arrow_strings=False, category_ratio=None):
+        """Return (optimized DataFrame, per-column report DataFrame)"""
+        with Instrumentation.stage('transform', rows=len(df)):
+            return MemoryOptimizer._optimize(df, downcast, categories, arrow_strings, category_ratio)
+
+    @staticmethod
+    def _optimize(df, downcast, categories, arrow_strings, category_ratio):
+        import pandas as pd
+
+        category_ratio = MemoryOptimizer.DEFAULTS['category_ratio'] if category_ratio is None else category_ratio
+        report = []
+        columns = {}
+        for col in df.columns:
+            series = df[col]
+            before = int(series.memory_usage(deep=True, index=False))
+            optimized = series
+            if downcast:
+                optimized = MemoryOptimizer.downcast(optimized)
+            if categories:
+                optimized = MemoryOptimizer.compact_strings(optimized, category_ratio, arrow_strings)
+            elif arrow_strings:
+                optimized = MemoryOptimizer.compact_strings(optimized, -1, arrow_strings)
+            after = int(optimized.memory_usage(deep=True, index=False)) if optimized is not series else before
+            columns[col] = optimized
+            report.append({
+                'column': str(col),
+                'dtype_before': str(series.dtype),
+                'dtype_after': str(optimized.dtype),
+                'bytes_before': before,
+                'bytes_after': after,
+            })
+
+        optimized_df = pd.DataFrame(columns, index=df.index) if len(df.columns) else df.copy()
+        optimized_df.attrs = {**df.attrs, 'memory_report': report}
+        return optimized_df, MemoryOptimizer.report_frame(optimized_df)
+
+    @staticmethod
+    def report_frame(df):
+        """The report attached by optimize() as a DataFrame, or None"""
+        import pandas as pd
+
+        report = df.attrs.get('memory_report') if isinstance(df, pd.DataFrame) else None
+        if not report:
+            return None
+        frame = pd.DataFrame(report)
+        frame['saved'] = 1 - frame['bytes_after'] / frame['bytes_before'].where(frame['bytes_before'] > 0)
+        return frame
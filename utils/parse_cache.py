@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+
+from utils.memory_optimizer import MemoryOptimizer
+
+class ParseCache:
+    """LRU cache of parsed DataFrames keyed by content hash and reader options
+
+    Entries are bounded by their total deep memory usage rather than by count.
+    Cached frames are shared between reruns and sessions, so callers must not
+    modify them in place.
+    """
+
+    DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes or ParseCache.DEFAULT_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _freeze(value):
+        """Turn reader options into a hashable key"""
+        if isinstance(value, dict):
+            return tuple(sorted((str(k), ParseCache._freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple, set)):
+            return tuple(ParseCache._freeze(v) for v in value)
+        return value
+
+    @staticmethod
+    def make_key(content_hash, reader, options=None):
+        return (content_hash, reader, ParseCache._freeze(options or {}))
+
+    @staticmethod
+    def size_of(value):
+        """Deep memory usage of a DataFrame, or of a dict of DataFrames"""
+        import pandas as pd
+
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(deep=True).sum())
+        if isinstance(value, pd.Series):
+            return int(value.memory_usage(deep=True))
+        if isinstance(value, dict):
+            return sum(ParseCache.size_of(v) for v in value.values())
+        return 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = ParseCache.size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def get_or_load(self, content_hash, reader, options, loader, optimize=None):
+        """Return the cached result for (hash, reader, options) or call loader()
+
+        optimize holds MemoryOptimizer settings; loaded DataFrames are shrunk
+        before they are cached, and the settings become part of the key.
+        """
+        import pandas as pd
+
+        key_options = {**(options or {}), '_optimize': optimize} if optimize else options
+        key = ParseCache.make_key(content_hash, reader, key_options)
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if optimize and isinstance(value, pd.DataFrame):
+                value, _ = MemoryOptimizer.optimize(value, **optimize)
+            value = self.put(key, value)
+        return value
+
+    def read(self, upload, reader, optimize=None, **options):
+        """Parse a spooled upload with pd.<reader>, reusing an earlier parse when possible"""
+        import pandas as pd
+
+        read_func = getattr(pd, reader)
+        options.update(MemoryOptimizer.reader_options(reader, optimize))
+        return self.get_or_load(
+            upload.sha256, reader, options,
+            lambda: read_func(upload.path, **options),
+            optimize=optimize,
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+parse_cache = ParseCache()
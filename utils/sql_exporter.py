@@ -0,0 +1,284 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+
+class SQLExporter:
+    """Bulk-load DataFrames into SQL databases over pooled SQLAlchemy engines"""
+
+    DEFAULT_CHUNKSIZE = 10_000
+    DRIVERS = {
+        'SQLite': 'sqlite',
+        'PostgreSQL': 'postgresql+psycopg2',
+        'MySQL': 'mysql+pymysql',
+    }
+    METHODS = ['auto', 'multi', 'executemany', 'copy']
+
+    # Fastest method per dialect: SQLite's executemany beats multi-row VALUES,
+    # which SQLAlchemy has to compile per statement
+    AUTO_METHODS = {
+        'sqlite': 'executemany',
+        'postgresql': 'copy',
+    }
+
+    # Applied for the duration of a SQLite bulk load, then restored
+    SQLITE_BULK_PRAGMAS = {
+        'journal_mode': 'MEMORY',
+        'synchronous': 'OFF',
+        'cache_size': '-200000',
+        'temp_store': 'MEMORY',
+    }
+
+    _engines = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def build_url(db_type, database, host=None, port=None, username=None, password=None):
+        """SQLAlchemy URL for one of the page's database types"""
+        from sqlalchemy.engine import URL
+
+        if db_type == 'SQLite':
+            return URL.create('sqlite', database=database)
+        return URL.create(
+            SQLExporter.DRIVERS[db_type],
+            username=username or None,
+            password=password or None,
+            host=host or None,
+            port=int(port) if port else None,
+            database=database,
+        )
+
+    @staticmethod
+    def get_engine(url):
+        """One pooled engine per target URL, shared across reruns and sessions"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.engine import URL
+
+        key = url.render_as_string(hide_password=False) if isinstance(url, URL) else str(url)
+        with SQLExporter._lock:
+            engine = SQLExporter._engines.get(key)
+            if engine is None:
+                engine = create_engine(url, pool_pre_ping=True)
+                if engine.dialect.name == 'sqlite':
+                    SQLExporter._sqlite_transactional_ddl(engine)
+                SQLExporter._engines[key] = engine
+            return engine
+
+    @staticmethod
+    def _sqlite_transactional_ddl(engine):
+        """SQLAlchemy's pysqlite recipe: emit BEGIN ourselves so DROP/CREATE roll back too
+
+        pysqlite only opens a transaction before DML, so the DROP and CREATE of
+        if_exists='replace' would otherwise autocommit and a failed load would
+        leave an empty table behind.
+        """
+        from sqlalchemy import event
+
+        @event.listens_for(engine, 'connect')
+        def _autocommit_driver(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, 'begin')
+        def _begin(connection):
+            connection.exec_driver_sql('BEGIN')
+
+    @staticmethod
+    def dispose_engines():
+        with SQLExporter._lock:
+            for engine in SQLExporter._engines.values():
+                engine.dispose()
+            SQLExporter._engines.clear()
+
+    @staticmethod
+    def max_variables(dialect):
+        """Bind-parameter limit per statement, which caps multi-row INSERT size"""
+        if dialect == 'sqlite':
+            return 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+        return 65535
+
+    @staticmethod
+    def rows_per_statement(dialect, n_columns, chunksize):
+        limit = SQLExporter.max_variables(dialect) // max(n_columns, 1)
+        return max(1, min(chunksize, limit))
+
+    @staticmethod
+    @contextmanager
+    def sqlite_bulk_pragmas(connection):
+        """Relax SQLite durability for a bulk load
+
+        The PRAGMAs go straight to the driver connection, which is in
+        autocommit mode, so they run outside the load's transaction.
+        """
+        dbapi_connection = connection.connection.driver_connection
+        previous = {}
+        for name, value in SQLExporter.SQLITE_BULK_PRAGMAS.items():
+            previous[name] = dbapi_connection.execute(f"PRAGMA {name}").fetchone()[0]
+            dbapi_connection.execute(f"PRAGMA {name} = {value}")
+        try:
+            yield
+        finally:
+            if connection.in_transaction():
+                # Uncommitted work is discarded anyway when the connection is returned
+                connection.rollback()
+            for name, value in previous.items():
+                dbapi_connection.execute(f"PRAGMA {name} = {value}")
+
+    @staticmethod
+    def copy_csv_row(row):
+        """One COPY CSV line: NULL is an unquoted empty field and every value is quoted, so '' stays ''"""
+        return ','.join('' if value is None else '"' + str(value).replace('"', '""') + '"' for value in row) + '\n'
+
+    @staticmethod
+    def copy_from_stdin(table, conn, keys, data_iter):
+        """pandas to_sql method that loads rows with PostgreSQL COPY ... FROM STDIN"""
+        dbapi_conn = conn.connection
+        with dbapi_conn.cursor() as cursor:
+            buffer = StringIO()
+            buffer.writelines(SQLExporter.copy_csv_row(row) for row in data_iter)
+            buffer.seek(0)
+
+            columns = ', '.join(f'"{k}"' for k in keys)
+            table_name = f'"{table.schema}"."{table.name}"' if table.schema else f'"{table.name}"'
+            sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)"
+            if hasattr(cursor, 'copy_expert'):
+                cursor.copy_expert(sql=sql, file=buffer)
+            else:
+                # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        return None
+
+    @staticmethod
+    def resolve_method(method, dialect):
+        """The method that actually runs for a dialect ('auto' picks the fastest)"""
+        if method == 'auto':
+            return SQLExporter.AUTO_METHODS.get(dialect, 'multi')
+        return method
+
+    @staticmethod
+    def _to_sql_method(method, dialect):
+        method = SQLExporter.resolve_method(method, dialect)
+        if method == 'copy':
+            if dialect != 'postgresql':
+                raise ValueError("COPY is only available for PostgreSQL")
+            return SQLExporter.copy_from_stdin
+        if method == 'executemany':
+            return None
+        return 'multi'
+
+    @staticmethod
+    def _load(connection, frames, table_name, if_exists, index, method, chunksize, progress_callback):
+        """Write DataFrame chunks into one table inside the caller's transaction"""
+        dialect = connection.dialect.name
+        to_sql_method = SQLExporter._to_sql_method(method, dialect)
+        start = time.perf_counter()
+        rows = 0
+        for i, frame in enumerate(frames):
+            statement_rows = chunksize
+            if to_sql_method == 'multi':
+                n_columns = len(frame.columns) + (frame.index.nlevels if index else 0)
+                statement_rows = SQLExporter.rows_per_statement(dialect, n_columns, chunksize)
+            frame.to_sql(
+                table_name,
+                connection,
+                if_exists=if_exists if i == 0 else 'append',
+                index=index,
+                chunksize=statement_rows,
+                method=to_sql_method,
+            )
+            rows += len(frame)
+            if progress_callback:
+                elapsed = time.perf_counter() - start
+                progress_callback(rows, rows / elapsed if elapsed else 0.0)
+        return rows
+
+    @staticmethod
+    @contextmanager
+    def bulk_connection(url):
+        """Pooled connection prepared for bulk loading (SQLite PRAGMAs applied)"""
+        engine = SQLExporter.get_engine(url)
+        with engine.connect() as connection:
+            if connection.dialect.name == 'sqlite':
+                with SQLExporter.sqlite_bulk_pragmas(connection):
+                    yield connection
+            else:
+                yield connection
+
+    @staticmethod
+    def export(df, url, table_name, if_exists='replace', index=False, method='auto',
+               chunksize=None, progress_callback=None):
+        """Load a DataFrame in batches inside a single transaction
+
+        A failed load rolls back completely on SQLite and PostgreSQL,
+        including the DROP/CREATE of if_exists='replace'. MySQL commits DDL
+        implicitly, so there a failure can leave the table replaced.
+        """
+        from sqlalchemy.engine import make_url
+
+        try:
+            chunksize = chunksize or SQLExporter.DEFAULT_CHUNKSIZE
+            start = time.perf_counter()
+            frames = (df.iloc[i:i + chunksize] for i in range(0, max(len(df), 1), chunksize))
+            with SQLExporter.bulk_connection(url) as connection:
+                with connection.begin():
+                    rows = SQLExporter._load(
+                        connection, frames, table_name, if_exists, index, method, chunksize, progress_callback
+                    )
+            seconds = time.perf_counter() - start
+            return {
+                'rows': rows,
+                'seconds': seconds,
+                'rows_per_second': rows / seconds if seconds else 0.0,
+                'dialect': make_url(url).get_backend_name(),
+                'method': SQLExporter.resolve_method(method, make_url(url).get_backend_name()),
+            }, None
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    def create_indexes(connection, table_name, columns):
+        """Create one index per column; run after the load so inserts don't maintain them"""
+        quote = connection.dialect.identifier_preparer.quote
+        if_not_exists = '' if connection.dialect.name == 'mysql' else 'IF NOT EXISTS '
+        for column in columns:
+            index_name = f"ix_{table_name}_{column}"
+            connection.exec_driver_sql(
+                f"CREATE INDEX {if_not_exists}{quote(index_name)} ON {quote(table_name)} ({quote(column)})"
+            )
+
+    @staticmethod
+    def ingest_stream(chunks, url, table_name, if_exists='replace', method='auto',
+                      chunksize=None, index_columns=None, progress_callback=None):
+        """Stream DataFrame chunks into a table without holding more than one chunk
+
+        The first chunk creates the table (so its dtypes define the schema);
+        index_columns are indexed only after every row has been loaded. A
+        failing chunk rolls the whole load back, as in export().
+        """
+        from sqlalchemy.engine import make_url
+
+        try:
+            chunksize = chunksize or SQLExporter.DEFAULT_CHUNKSIZE
+            start = time.perf_counter()
+            with SQLExporter.bulk_connection(url) as connection:
+                with connection.begin():
+                    rows = SQLExporter._load(
+                        connection, chunks, table_name, if_exists, False, method, chunksize, progress_callback
+                    )
+                    load_seconds = time.perf_counter() - start
+                    if index_columns:
+                        SQLExporter.create_indexes(connection, table_name, index_columns)
+            seconds = time.perf_counter() - start
+            return {
+                'rows': rows,
+                'seconds': seconds,
+                'load_seconds': load_seconds,
+                'index_seconds': seconds - load_seconds,
+                'rows_per_second': rows / load_seconds if load_seconds else 0.0,
+                'dialect': make_url(url).get_backend_name(),
+                'method': SQLExporter.resolve_method(method, make_url(url).get_backend_name()),
+            }, None
+        except Exception as e:
+            return None, str(e)
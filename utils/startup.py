@@ -0,0 +1,182 @@
+"""Cold-start profile of app.py and the page scripts
+
+Each script runs once in a fresh interpreter under `python -X importtime`,
+in Streamlit's bare mode (no server, no uploads), which is what a pod pays
+for the first load of that page. The budget is time on top of a bare
+`import streamlit` measured the same way, so it holds on slow and fast
+machines alike:
+
+    python -m utils.startup
+    python -m utils.startup app.py pages/*.py --top 10
+    python -m utils.startup --all --budget 0.3 --repeat 3
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'openpyxl', 'chardet', 'sqlalchemy', 'orjson']
+DEFAULT_BUDGET = 0.25  # seconds over the Streamlit baseline; pandas alone costs more
+
+_MARKER = '__startup__ '
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)')
+_RUNNER = f"""
+import json, logging, runpy, sys, time
+logging.disable(logging.WARNING)
+start = time.perf_counter()
+error = None
+try:
+    if sys.argv[1:]:
+        runpy.run_path(sys.argv[1], run_name='__main__')
+    else:
+        import streamlit
+except BaseException as e:
+    error = f'{{type(e).__name__}}: {{e}}'
+print({_MARKER!r} + json.dumps({{'seconds': time.perf_counter() - start, 'error': error}}), flush=True)
+"""
+
+
+class StartupProfiler:
+    """Import-time report and startup budget for the Streamlit scripts"""
+
+    @staticmethod
+    def scripts():
+        return ['app.py'] + sorted(str(p.relative_to(ROOT)) for p in (ROOT / 'pages').glob('*.py'))
+
+    @staticmethod
+    def parse_importtime(stderr):
+        """Rows of -X importtime output after interpreter startup, each tagged with the top-level import it ran under
+
+        Python prints a module after everything it imported, so a module's
+        top-level ancestor is the next depth-0 row below it.
+        """
+        rows = []
+        for line in stderr.splitlines():
+            match = _IMPORT_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, module = match.groups()
+                rows.append({'module': module, 'depth': (len(indent) - 1) // 2,
+                             'self_s': int(self_us) / 1e6, 'cumulative_s': int(cumulative_us) / 1e6})
+        # Everything up to the runner's own runpy import is interpreter startup
+        starts = [i for i, row in enumerate(rows) if row['module'] == 'runpy' and row['depth'] == 0]
+        if starts:
+            rows = rows[starts[0] + 1:]
+        via = None
+        for row in reversed(rows):
+            if row['depth'] == 0:
+                via = row['module']
+            row['via'] = via
+        return rows
+
+    @staticmethod
+    def profile(script, repeat=1, top=15):
+        """Fastest of `repeat` cold runs of a script, with its slowest top-level imports
+
+        script=None profiles a bare `import streamlit`, the baseline every page pays.
+        """
+        best = None
+        for _ in range(max(repeat, 1)):
+            proc = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', _RUNNER] + ([str(script)] if script is not None else []),
+                cwd=ROOT, capture_output=True, text=True,
+            )
+            run = None
+            for line in proc.stdout.splitlines():
+                if line.startswith(_MARKER):
+                    run = json.loads(line[len(_MARKER):])
+            if run is None:
+                run = {'seconds': None, 'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'no output'}
+            run['imports'] = StartupProfiler.parse_importtime(proc.stderr)
+            if best is None or (run['seconds'] or float('inf')) < (best['seconds'] or float('inf')):
+                best = run
+
+        imports = best.pop('imports')
+        loaded = {row['module']: row['via'] for row in imports}
+        top_level = sorted((r for r in imports if r['depth'] == 0), key=lambda r: -r['cumulative_s'])
+        return {
+            'script': str(script) if script is not None else 'import streamlit',
+            'seconds': best['seconds'],
+            'import_seconds': sum(r['self_s'] for r in imports),
+            'modules': len(imports),
+            'heavy': {m: loaded[m] for m in HEAVY_MODULES if m in loaded},
+            'top': [{'module': r['module'], 'seconds': r['cumulative_s']} for r in top_level[:top]],
+            'error': best['error'],
+        }
+
+    @staticmethod
+    def baseline(repeat=1):
+        """Cold start of a bare `import streamlit`, in seconds"""
+        result = StartupProfiler.profile(None, repeat=repeat, top=0)
+        if result['error'] or result['seconds'] is None:
+            raise RuntimeError(f"Could not measure the Streamlit baseline: {result['error']}")
+        return result['seconds']
+
+    @staticmethod
+    def overhead(result, baseline):
+        """Seconds a script's cold start spends beyond the Streamlit baseline, or None if it did not finish"""
+        return None if result['seconds'] is None else result['seconds'] - baseline
+
+    @staticmethod
+    def over_budget(results, budget, baseline=0.0):
+        """Results that failed, never finished, or spent more than budget seconds beyond the baseline"""
+        return [r for r in results
+                if r['error'] or r['seconds'] is None or StartupProfiler.overhead(r, baseline) > budget]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m utils.startup', description=__doc__.splitlines()[0])
+    parser.add_argument('scripts', nargs='*', help='scripts relative to the repo root (default: app.py)')
+    parser.add_argument('--all', action='store_true', help='profile app.py and every page')
+    parser.add_argument('--repeat', type=int, default=1, help='cold runs per script; the fastest is kept')
+    parser.add_argument('--top', type=int, default=10, help='slowest top-level imports to list')
+    parser.add_argument('--budget', type=float, nargs='?', const=DEFAULT_BUDGET,
+                        help=f"exit 1 when a script fails or spends more than this many seconds beyond a bare "
+                             f"`import streamlit` (default {DEFAULT_BUDGET})")
+    parser.add_argument('--json', action='store_true', help='print one JSON line per script')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    scripts = StartupProfiler.scripts() if args.all else (args.scripts or ['app.py'])
+
+    baseline = StartupProfiler.baseline(repeat=args.repeat) if args.budget is not None else 0.0
+    if args.budget is not None and not args.json:
+        print(f"import streamlit: {baseline:.3f}s (baseline)")
+
+    results = []
+    for script in scripts:
+        result = StartupProfiler.profile(script, repeat=args.repeat, top=args.top)
+        results.append(result)
+        if args.json:
+            print(json.dumps(result), flush=True)
+            continue
+        seconds = f"{result['seconds']:.3f}s" if result['seconds'] is not None else 'n/a'
+        extra = ''
+        if args.budget is not None and result['seconds'] is not None:
+            extra = f", {StartupProfiler.overhead(result, baseline):+.3f}s over baseline"
+        print(f"{result['script']}: {seconds} ({result['import_seconds']:.3f}s in {result['modules']} imports{extra})")
+        for row in result['top']:
+            print(f"    {row['seconds']:8.3f}s  {row['module']}")
+        for module, via in result['heavy'].items():
+            print(f"    loads {module} via {via}")
+        if result['error']:
+            print(f"    error: {result['error']}")
+
+    if args.budget is None:
+        return 0
+    slow = StartupProfiler.over_budget(results, args.budget, baseline)
+    for result in slow:
+        if result['error'] or result['seconds'] is None:
+            print(f"OVER BUDGET {result['script']}: failed ({result['error']})", file=sys.stderr)
+        else:
+            overhead = StartupProfiler.overhead(result, baseline)
+            print(f"OVER BUDGET {result['script']}: {overhead:+.3f}s over baseline > {args.budget}s", file=sys.stderr)
+    return 1 if slow else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import hashlib
+import io
+import logging
+import mmap
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+
+from utils.file_manager import FileManager
+
+logger = logging.getLogger(__name__)
+
+
+class MmapReader(io.RawIOBase):
+    """Read-only file object over a shared memory map with its own position
+
+    The reader holds a view on the mapping until it is closed, so use it in a
+    `with` block.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._buffer) + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return self._pos
+
+    def readinto(self, b):
+        data = self._buffer[self._pos:self._pos + len(b)]
+        n = len(data)
+        b[:n] = data
+        self._pos += n
+        return n
+
+    def read(self, size=-1):
+        end = len(self._buffer) if size is None or size < 0 else self._pos + size
+        data = bytes(self._buffer[self._pos:end])
+        self._pos += len(data)
+        return data
+
+    def close(self):
+        if isinstance(self._buffer, memoryview):
+            self._buffer.release()
+        self._buffer = b''
+        super().close()
+
+
+class SpooledUpload:
+    """An upload written once to the temp area and mapped read-only on demand"""
+
+    def __init__(self, path, name, size, sha256):
+        self.path = Path(path)
+        self.name = name
+        self.size = size
+        self.sha256 = sha256
+        self.refs = 0
+        self.last_access = time.time()
+        self._file = None
+        self._mmap = None
+        self._lock = threading.Lock()
+
+    def buffer(self):
+        """Zero-copy view over the mapped file, mapped once and reused; release() it when done"""
+        self.last_access = time.time()
+        with self._lock:
+            if self.size == 0:
+                return memoryview(b'')
+            if self._mmap is None:
+                self._file = open(self.path, 'rb')
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return memoryview(self._mmap)
+
+    def open(self):
+        """Open an independent reader over the shared mapping"""
+        return MmapReader(self.buffer())
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                try:
+                    self._mmap.close()
+                except BufferError:
+                    # The mapping goes away with the last view, but an open view here is a leak
+                    logger.warning("Upload '%s' is still mapped by an open reader or buffer", self.name)
+                self._mmap = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class UploadLease:
+    """Session-held handle on a spooled upload, released when dropped"""
+
+    def __init__(self, upload, file_id):
+        self.upload = upload
+        self.file_id = file_id
+        self._finalizer = weakref.finalize(self, UploadSpool.release, upload)
+
+    @property
+    def name(self):
+        return self.upload.name
+
+    @property
+    def size(self):
+        return self.upload.size
+
+    @property
+    def path(self):
+        return self.upload.path
+
+    @property
+    def sha256(self):
+        return self.upload.sha256
+
+    def is_available(self):
+        return self._finalizer.alive and UploadSpool.get(self.sha256) is self.upload
+
+    def buffer(self):
+        return self.upload.buffer()
+
+    def open(self):
+        return self.upload.open()
+
+    def release(self):
+        self._finalizer()
+
+
+class UploadSpool:
+    """Process-wide store of uploads spooled to disk and shared by content hash"""
+
+    TTL_SECONDS = 3600
+    COPY_CHUNK = 8 * 1024 * 1024
+
+    _uploads = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def spool_directory():
+        spool_dir = FileManager.create_temp_directory() / 'uploads'
+        spool_dir.mkdir(exist_ok=True)
+        return spool_dir
+
+    @staticmethod
+    def spool(uploaded_file, previous=None):
+        """Spool an uploaded file to disk once, reusing the previous lease on reruns"""
+        file_id = getattr(uploaded_file, 'file_id', None) or f"{uploaded_file.name}:{uploaded_file.size}"
+        if previous is not None and previous.file_id == file_id and previous.is_available():
+            previous.upload.last_access = time.time()
+            return previous
+
+        UploadSpool.sweep()
+        spool_dir = UploadSpool.spool_directory()
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = spool_dir / f".{os.getpid()}-{threading.get_ident()}-{time.time_ns()}.part"
+
+        uploaded_file.seek(0)
+        with open(tmp_path, 'wb') as f:
+            while True:
+                block = uploaded_file.read(UploadSpool.COPY_CHUNK)
+                if not block:
+                    break
+                digest.update(block)
+                f.write(block)
+                size += len(block)
+        uploaded_file.seek(0)
+
+        sha256 = digest.hexdigest()
+        with UploadSpool._lock:
+            upload = UploadSpool._uploads.get(sha256)
+            if upload is None:
+                path = spool_dir / (sha256 + Path(uploaded_file.name).suffix.lower())
+                os.replace(tmp_path, path)
+                upload = SpooledUpload(path, uploaded_file.name, size, sha256)
+                UploadSpool._uploads[sha256] = upload
+            else:
+                tmp_path.unlink(missing_ok=True)
+            upload.refs += 1
+            upload.last_access = time.time()
+
+        lease = UploadLease(upload, file_id)
+        if previous is not None:
+            previous.release()
+        return lease
+
+    @staticmethod
+    def get(sha256):
+        return UploadSpool._uploads.get(sha256)
+
+    @staticmethod
+    def release(upload):
+        """Drop one reference and delete the spooled file once unused"""
+        with UploadSpool._lock:
+            if UploadSpool._uploads.get(upload.sha256) is not upload:
+                # Already evicted by the TTL sweep
+                return
+            upload.refs -= 1
+            if upload.refs > 0:
+                return
+            del UploadSpool._uploads[upload.sha256]
+        UploadSpool._evict(upload)
+
+    @staticmethod
+    def sweep(ttl_seconds=None):
+        """Evict uploads idle longer than the TTL and orphaned spool files"""
+        ttl = UploadSpool.TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        cutoff = time.time() - ttl
+        with UploadSpool._lock:
+            expired = [sha for sha, upload in UploadSpool._uploads.items() if upload.last_access < cutoff]
+            evicted = [UploadSpool._uploads.pop(sha) for sha in expired]
+            known = {upload.path.name for upload in UploadSpool._uploads.values()}
+        for upload in evicted:
+            UploadSpool._evict(upload)
+
+        spool_dir = FileManager.create_temp_directory() / 'uploads'
+        if spool_dir.exists():
+            for path in spool_dir.iterdir():
+                try:
+                    if path.name not in known and path.stat().st_mtime < cutoff:
+                        path.unlink()
+                except OSError:
+                    pass
+        return len(evicted)
+
+    @staticmethod
+    def _evict(upload):
+        upload.close()
+        try:
+            upload.path.unlink(missing_ok=True)
+        except OSError:
+            # Still mapped on platforms that lock mapped files; sweep retries later
+            pass